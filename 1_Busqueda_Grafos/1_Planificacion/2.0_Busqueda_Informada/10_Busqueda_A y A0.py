@@ -1,6 +1,7 @@
 # Algoritmo de búsqueda A* y AO* explicado paso a paso
 
 import heapq  # Biblioteca para manejar colas de prioridad (min-heaps)
+import time  # Para controlar el plazo de la búsqueda anytime
 
 # Algoritmo de búsqueda A*
 def busqueda_a_estrella(grafo, inicio, objetivo, heuristica):
@@ -88,6 +89,131 @@ objetivo_a_estrella = 'F'
 print("Camino A*:", busqueda_a_estrella(grafo_a_estrella, inicio_a_estrella, objetivo_a_estrella, heuristica_a_estrella))
 
 
+# Algoritmo A* anytime con peso (ARA*)
+def busqueda_ara_estrella(grafo, inicio, objetivo, heuristica, peso_inicial=3.0, decremento=0.5, tiempo_max=None):
+    """
+    Algoritmo ARA* (Anytime Repairing A*).
+    Encuentra rápidamente un camino w-subóptimo usando f(n) = g(n) + w·h(n) y,
+    mientras quede tiempo, reduce el peso w y mejora la solución reutilizando
+    los costos g y los nodos inconsistentes de las búsquedas anteriores.
+
+    Es un generador: cada vez que encuentra una solución mejor la devuelve junto
+    con la cota de suboptimalidad demostrada, es decir, el costo de la solución
+    dividido entre la menor cota inferior g(n) + h(n) de los nodos pendientes.
+
+    :param grafo: Diccionario de adyacencia; los vecinos pueden ser una lista (costo 1)
+                  o un diccionario vecino -> costo.
+    :param inicio: Nodo inicial.
+    :param objetivo: Nodo objetivo.
+    :param heuristica: Diccionario con valores heurísticos admisibles para cada nodo.
+    :param peso_inicial: Peso w de la primera búsqueda.
+    :param decremento: Cantidad que se resta a w en cada mejora.
+    :param tiempo_max: Plazo en segundos (None para ejecutar hasta w = 1).
+    :return: Genera tuplas (camino, costo, cota de suboptimalidad).
+    """
+    limite = time.perf_counter() + tiempo_max if tiempo_max is not None else float('inf')
+    peso = peso_inicial
+    costos_g = {inicio: 0}
+    padres = {inicio: None}
+    cerrados = set()
+    inconsistentes = set()  # Nodos mejorados tras cerrarse; se reabren en la siguiente búsqueda
+    conjunto_abierto = [(peso * heuristica[inicio], 0, inicio)]
+
+    def vecinos(nodo):
+        adyacentes = grafo[nodo]
+        if isinstance(adyacentes, dict):
+            return adyacentes.items()
+        return ((vecino, 1) for vecino in adyacentes)
+
+    def mejorar_camino():
+        """
+        Expande nodos mientras alguno pueda mejorar la solución actual con el peso actual.
+        Devuelve False si se agotó el tiempo.
+        """
+        while conjunto_abierto:
+            f_valor, g_entrada, actual = conjunto_abierto[0]
+            if actual in cerrados or g_entrada != costos_g[actual]:
+                heapq.heappop(conjunto_abierto)  # Entrada obsoleta
+                continue
+            if costos_g.get(objetivo, float('inf')) <= f_valor:
+                return True
+            if time.perf_counter() > limite:
+                return False
+            heapq.heappop(conjunto_abierto)
+            cerrados.add(actual)
+            for vecino, costo in vecinos(actual):
+                costo_tentativo = costos_g[actual] + costo
+                if costo_tentativo < costos_g.get(vecino, float('inf')):
+                    costos_g[vecino] = costo_tentativo
+                    padres[vecino] = actual
+                    if vecino in cerrados:
+                        inconsistentes.add(vecino)
+                    else:
+                        heapq.heappush(conjunto_abierto, (costo_tentativo + peso * heuristica[vecino], costo_tentativo, vecino))
+        return True
+
+    def cota_suboptimalidad():
+        """
+        Cota demostrada: costo(solución) / min(g + h) de los nodos abiertos e inconsistentes.
+        """
+        pendientes = [costos_g[n] + heuristica[n] for _, g_entrada, n in conjunto_abierto
+                      if n not in cerrados and g_entrada == costos_g[n]]
+        pendientes += [costos_g[n] + heuristica[n] for n in inconsistentes]
+        if not pendientes:
+            return 1.0
+        return max(1.0, min(peso, costos_g[objetivo] / min(pendientes)))
+
+    def reconstruir_camino():
+        camino = []
+        actual = objetivo
+        while actual is not None:
+            camino.append(actual)
+            actual = padres[actual]
+        return camino[::-1]
+
+    mejor_costo = float('inf')
+    while True:
+        completado = mejorar_camino()
+        if costos_g.get(objetivo, float('inf')) < mejor_costo:
+            mejor_costo = costos_g[objetivo]
+            yield reconstruir_camino(), mejor_costo, cota_suboptimalidad()
+        if not completado or peso <= 1 or time.perf_counter() > limite:
+            return
+        # Reducir el peso y reabrir los nodos abiertos e inconsistentes con las nuevas prioridades
+        peso = max(1.0, peso - decremento)
+        pendientes = {n for _, g_entrada, n in conjunto_abierto if n not in cerrados and g_entrada == costos_g[n]}
+        pendientes |= inconsistentes
+        conjunto_abierto = [(costos_g[n] + peso * heuristica[n], costos_g[n], n) for n in pendientes]
+        heapq.heapify(conjunto_abierto)
+        inconsistentes.clear()
+        cerrados.clear()
+        if not conjunto_abierto:
+            return
+
+
+# Ejemplo práctico para ARA*: rejilla con costos variables y un plazo de 200 ms
+def generar_rejilla(tamano, semilla=0):
+    """
+    Genera una rejilla 4-conectada con costos aleatorios y su heurística Manhattan admisible.
+    """
+    import random
+    generador = random.Random(semilla)
+    grafo, heuristica = {}, {}
+    for i in range(tamano):
+        for j in range(tamano):
+            grafo[(i, j)] = {(i + di, j + dj): generador.choice((1, 1, 1, 5))
+                             for di, dj in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                             if 0 <= i + di < tamano and 0 <= j + dj < tamano}
+            heuristica[(i, j)] = (tamano - 1 - i) + (tamano - 1 - j)
+    return grafo, heuristica
+
+grafo_ara, heuristica_ara = generar_rejilla(150)
+inicio_reloj = time.perf_counter()
+for camino, costo, cota in busqueda_ara_estrella(grafo_ara, (0, 0), (149, 149), heuristica_ara, tiempo_max=0.2):
+    print(f"ARA*: costo {costo}, cota de suboptimalidad {cota:.3f}, "
+          f"longitud {len(camino)}, {1000 * (time.perf_counter() - inicio_reloj):.1f} ms")
+
+
 # Algoritmo AO* (para grafos AND-OR)
 def busqueda_ao_estrella(grafo, inicio, objetivo, heuristica):
     """
@@ -1,91 +1,191 @@
+import heapq
+import json
 import math
+import os
 import random
-from collections import defaultdict
+import time
+from collections import defaultdict, OrderedDict
 
 class Nodo:
     """
-    Clase que representa un nodo en el árbol de búsqueda MCTS.
-    Cada nodo contiene información sobre el estado del juego, su nodo padre,
-    sus nodos hijos, y estadísticas de simulaciones (victorias y visitas).
+    Clase que representa un nodo en el grafo de búsqueda MCTS.
+    Gracias a la tabla de transposición, un mismo estado alcanzado por distintos
+    órdenes de jugadas comparte un único nodo, por lo que el árbol se convierte
+    en un grafo dirigido acíclico (DAG). Cada nodo contiene el estado del juego,
+    el jugador al que le toca mover, sus aristas hacia los hijos y estadísticas
+    de simulaciones (victorias y visitas).
     """
-    def __init__(self, estado, padre=None):
+    def __init__(self, estado, jugador):
         self.estado = estado  # Estado actual del tablero (ejemplo: [['X', ' ', 'O'], ...])
-        self.padre = padre  # Nodo padre en el árbol (None si es la raíz)
-        self.hijos = []  # Lista de nodos hijos (estados derivados del actual)
-        self.victorias = 0  # Número de victorias acumuladas en simulaciones
+        self.jugador = jugador  # Jugador al que le toca mover en este estado
+        self.clave = clave_estado(estado, jugador)  # Clave hash del nodo en la tabla de transposición
+        self.hijos = {}  # Aristas: movimiento -> clave del nodo hijo
+        self.visitas_arista = {}  # Visitas de cada arista (movimiento -> n), necesarias para UCT en un DAG
+        self.movimientos_sin_probar = obtener_movimientos_legales(estado)  # Movimientos aún no expandidos
+        random.shuffle(self.movimientos_sin_probar)
+        self.victorias = 0  # Suma de resultados (perspectiva de 'X') acumulada en simulaciones
         self.visitas = 0  # Número de veces que este nodo fue visitado
 
-def mcts(estado_inicial, jugador, simulaciones=1000):
+def clave_estado(estado, jugador):
     """
-    Algoritmo principal de Monte Carlo Tree Search (MCTS).
+    Calcula una clave hashable para un estado: el tablero como tupla de tuplas
+    junto con el jugador al que le toca mover.
+    """
+    return (tuple(tuple(fila) for fila in estado), jugador)
+
+class TablaTransposicion:
+    """
+    Tabla hash que asocia cada estado (clave) con su único nodo compartido.
+    La memoria queda acotada por `capacidad`: al superarla se reemplaza el nodo
+    usado menos recientemente (política LRU). Las aristas guardan claves y no
+    referencias, por lo que un nodo reemplazado se libera y, si vuelve a
+    alcanzarse, se expande de nuevo.
+    """
+    def __init__(self, capacidad=100000):
+        self.capacidad = capacidad  # Número máximo de nodos almacenados
+        self.nodos = OrderedDict()  # clave -> Nodo, ordenado del menos al más reciente
+
+    def buscar(self, clave):
+        """
+        Devuelve el nodo asociado a la clave (o None) y lo marca como usado recientemente.
+        """
+        nodo = self.nodos.get(clave)
+        if nodo is not None:
+            self.nodos.move_to_end(clave)
+        return nodo
+
+    def obtener_o_crear(self, estado, jugador):
+        """
+        Devuelve el nodo compartido del estado, creándolo si no existe.
+        """
+        clave = clave_estado(estado, jugador)
+        nodo = self.buscar(clave)
+        if nodo is None:
+            nodo = Nodo(estado, jugador)
+            self.insertar(nodo)
+        return nodo
+
+    def insertar(self, nodo):
+        """
+        Inserta (o refresca) un nodo y aplica la política de reemplazo LRU.
+        """
+        self.nodos[nodo.clave] = nodo
+        self.nodos.move_to_end(nodo.clave)
+        while len(self.nodos) > self.capacidad:
+            self.nodos.popitem(last=False)
+
+    def __len__(self):
+        return len(self.nodos)
+
+def siguiente_jugador(jugador):
+    """
+    Devuelve el jugador contrario.
+    """
+    return 'O' if jugador == 'X' else 'X'
+
+def mcts(estado_inicial, jugador, simulaciones=1000, tabla=None):
+    """
+    Algoritmo principal de Monte Carlo Tree Search (MCTS) sobre un DAG.
     Este algoritmo busca el mejor movimiento posible desde un estado inicial
     utilizando simulaciones aleatorias para explorar el espacio de búsqueda.
+    Los estados repetidos (transposiciones) comparten nodo y estadísticas.
 
     Parámetros:
     - estado_inicial: El estado inicial del tablero (matriz 3x3).
     - jugador: El jugador actual ('X' o 'O').
     - simulaciones: Número de simulaciones a realizar.
+    - tabla: Tabla de transposición a reutilizar entre llamadas (opcional).
 
     Retorna:
     - El mejor estado del tablero después de las simulaciones.
     """
-    # Crear el nodo raíz con el estado inicial
-    raiz = Nodo(estado_inicial)
+    if tabla is None:
+        tabla = TablaTransposicion()
+    # Obtener (o reutilizar) el nodo raíz con el estado inicial
+    raiz = tabla.obtener_o_crear(estado_inicial, jugador)
 
     # Realizar el número especificado de simulaciones
     for _ in range(simulaciones):
-        # 1. Selección: Elegir un nodo hasta llegar a uno no expandido
-        nodo = seleccionar_nodo(raiz, jugador)
+        # La raíz se refresca en cada iteración para que nunca sea reemplazada
+        tabla.insertar(raiz)
 
-        # 2. Expansión: Añadir un hijo si el juego no ha terminado
+        # 1. Selección: Bajar por el DAG hasta un nodo con movimientos sin probar
+        camino = seleccionar_nodo(raiz, tabla)
+        nodo = camino[-1][0]
+
+        # 2. Expansión: Añadir una arista si el juego no ha terminado
         if not es_terminal(nodo.estado):
-            nodo = expandir(nodo, jugador)
+            camino[-1] = (nodo, nodo.movimientos_sin_probar[-1])
+            nodo = expandir(nodo, tabla)
+            camino.append((nodo, None))
 
         # 3. Simulación: Jugar aleatoriamente hasta el final
-        resultado = simular(nodo.estado, jugador)
+        resultado = simular(nodo.estado, nodo.jugador)
 
-        # 4. Retropropagación: Actualizar estadísticas desde el nodo hasta la raíz
-        retropropagar(nodo, resultado)
+        # 4. Retropropagación: Actualizar estadísticas a lo largo del camino recorrido
+        retropropagar(camino, resultado)
 
     # Elegir el mejor movimiento basado en el número de visitas
-    return mejor_hijo(raiz).estado
+    return aplicar_movimiento(estado_inicial, mejor_hijo(raiz), jugador)
 
-def seleccionar_nodo(nodo, jugador):
+def seleccionar_nodo(nodo, tabla, c=math.sqrt(2)):
     """
-    Selección de un nodo utilizando la fórmula UCB1 (balance entre exploración y explotación).
-    Este paso recorre el árbol de búsqueda hasta encontrar un nodo no expandido.
+    Selección de un nodo utilizando la fórmula UCB1 adaptada a un DAG.
+    Como un nodo puede tener varios padres, sus visitas no coinciden con las de
+    la arista por la que se llega: el término de exploración usa las visitas de
+    cada arista y el total de visitas salientes del padre, mientras que el de
+    explotación usa la media compartida del hijo, vista desde el jugador que mueve.
 
     Parámetros:
     - nodo: Nodo actual desde el cual se inicia la selección.
-    - jugador: El jugador actual ('X' o 'O').
+    - tabla: Tabla de transposición con los nodos compartidos.
+    - c: Constante de exploración.
 
     Retorna:
-    - El nodo seleccionado para expansión o simulación.
+    - El camino recorrido como lista de pares (nodo, movimiento elegido).
     """
-    while nodo.hijos:
-        # Si hay hijos no visitados, seleccionar uno de ellos
-        if not all(hijo.visitas > 0 for hijo in nodo.hijos):
-            return next(hijo for hijo in nodo.hijos if hijo.visitas == 0)
-        # Aplicar la fórmula UCB1 para seleccionar el mejor hijo
-        nodo = max(nodo.hijos, key=lambda h: h.victorias/h.visitas + math.sqrt(2 * math.log(nodo.visitas) / h.visitas))
-    return nodo
+    camino = []
+    while not es_terminal(nodo.estado) and not nodo.movimientos_sin_probar:
+        total = sum(nodo.visitas_arista.values())
+        signo = 1 if nodo.jugador == 'X' else -1  # Los resultados están en perspectiva de 'X'
+        mejor_valor, mejor_movimiento, mejor_nodo = -math.inf, None, None
+        for movimiento, clave in list(nodo.hijos.items()):
+            hijo = tabla.buscar(clave)
+            if hijo is None:
+                # El hijo fue reemplazado en la tabla: la arista vuelve a estar sin probar
+                del nodo.hijos[movimiento]
+                del nodo.visitas_arista[movimiento]
+                nodo.movimientos_sin_probar.append(movimiento)
+                continue
+            n_arista = max(nodo.visitas_arista[movimiento], 1)
+            valor = signo * hijo.victorias / max(hijo.visitas, 1) + c * math.sqrt(math.log(max(total, 1)) / n_arista)
+            if valor > mejor_valor:
+                mejor_valor, mejor_movimiento, mejor_nodo = valor, movimiento, hijo
+        if mejor_nodo is None:
+            break
+        camino.append((nodo, mejor_movimiento))
+        nodo = mejor_nodo
+    camino.append((nodo, None))
+    return camino
 
-def expandir(nodo, jugador):
+def expandir(nodo, tabla):
     """
-    Expande un nodo añadiendo un nuevo estado hijo.
-    Esto simula un movimiento posible desde el estado actual.
+    Expande un nodo añadiendo una arista hacia un nuevo estado.
+    Si el estado resultante ya existe en la tabla de transposición (se alcanzó
+    por otro orden de jugadas), se enlaza el nodo existente en lugar de crear uno nuevo.
 
     Parámetros:
     - nodo: Nodo actual que se desea expandir.
-    - jugador: El jugador actual ('X' o 'O').
+    - tabla: Tabla de transposición con los nodos compartidos.
 
     Retorna:
-    - El nuevo nodo hijo creado.
+    - El nodo hijo (nuevo o compartido).
     """
-    movimientos_posibles = obtener_movimientos_legales(nodo.estado)
-    nuevo_estado = aplicar_movimiento(nodo.estado, random.choice(movimientos_posibles), jugador)
-    hijo = Nodo(nuevo_estado, padre=nodo)
-    nodo.hijos.append(hijo)
+    movimiento = nodo.movimientos_sin_probar.pop()
+    nuevo_estado = aplicar_movimiento(nodo.estado, movimiento, nodo.jugador)
+    hijo = tabla.obtener_o_crear(nuevo_estado, siguiente_jugador(nodo.jugador))
+    nodo.hijos[movimiento] = hijo.clave
+    nodo.visitas_arista[movimiento] = 0
     return hijo
 
 def simular(estado, jugador):
@@ -108,39 +208,238 @@ def simular(estado, jugador):
         jugador_actual = 'O' if jugador_actual == 'X' else 'X'
     return obtener_resultado(estado_actual)
 
-def retropropagar(nodo, resultado):
+def retropropagar(camino, resultado):
     """
-    Actualiza las estadísticas de victorias y visitas desde el nodo hasta la raíz.
-    Este paso permite que los nodos padres aprendan de los resultados de sus hijos.
+    Actualiza las estadísticas de victorias y visitas a lo largo del camino recorrido.
+    En un DAG no existe un único padre, así que se actualizan los nodos y las
+    aristas realmente usados en esta simulación.
 
     Parámetros:
-    - nodo: Nodo desde el cual se inicia la retropropagación.
+    - camino: Lista de pares (nodo, movimiento) devuelta por la selección y expansión.
     - resultado: Resultado de la simulación (1, -1 o 0).
     """
-    while nodo:
+    for nodo, movimiento in camino:
         nodo.visitas += 1
         nodo.victorias += resultado
-        nodo = nodo.padre
+        if movimiento is not None:
+            nodo.visitas_arista[movimiento] += 1
 
 def mejor_hijo(nodo):
     """
-    Selecciona el hijo con el mayor número de visitas.
+    Selecciona el movimiento cuya arista tiene el mayor número de visitas.
     Este paso determina el mejor movimiento basado en las simulaciones realizadas.
 
     Parámetros:
-    - nodo: Nodo padre cuyos hijos se evaluarán.
+    - nodo: Nodo padre cuyas aristas se evaluarán.
 
     Retorna:
-    - El nodo hijo con el mayor número de visitas.
+    - El movimiento con el mayor número de visitas.
+    """
+    return max(nodo.visitas_arista, key=nodo.visitas_arista.get)
+
+# Búsqueda exacta para juegos deterministas de dos jugadores:
+# Negamax con poda alfa-beta, profundización iterativa con presupuesto de tiempo,
+# tabla de transposición con hash de Zobrist y ordenación de movimientos
+# mediante movimientos asesinos (killer) y heurística de historia.
+
+VICTORIA = 1000  # Valor de una victoria; se le resta la profundidad para preferir las más rápidas
+EXACTO, COTA_INFERIOR, COTA_SUPERIOR = 0, 1, 2  # Tipos de entrada en la tabla de transposición
+
+class TiempoAgotado(Exception):
+    """
+    Se lanza cuando la búsqueda supera el presupuesto de tiempo disponible.
+    """
+
+class Zobrist:
+    """
+    Hash de Zobrist: a cada par (casilla, ficha) y al turno se les asigna un
+    número aleatorio de 64 bits. El hash de un estado es el XOR de los números
+    de sus fichas, y puede actualizarse en O(1) al aplicar un movimiento.
+    """
+    def __init__(self, filas=3, columnas=3, fichas=('X', 'O'), semilla=0):
+        generador = random.Random(semilla)
+        self.tabla = {(i, j, ficha): generador.getrandbits(64)
+                      for i in range(filas) for j in range(columnas) for ficha in fichas}
+        self.turno_o = generador.getrandbits(64)  # Se aplica cuando mueve 'O'
+
+    def calcular(self, estado, jugador):
+        """
+        Calcula el hash completo de un estado (solo se usa en la raíz).
+        """
+        h = self.turno_o if jugador == 'O' else 0
+        for i, fila in enumerate(estado):
+            for j, celda in enumerate(fila):
+                if celda != ' ':
+                    h ^= self.tabla[(i, j, celda)]
+        return h
+
+    def actualizar(self, h, movimiento, jugador):
+        """
+        Hash incremental tras colocar la ficha de `jugador` en `movimiento` y cambiar el turno.
+        """
+        return h ^ self.tabla[(movimiento[0], movimiento[1], jugador)] ^ self.turno_o
+
+class BuscadorAlfaBeta:
+    """
+    Buscador Negamax con poda alfa-beta sobre la interfaz de juego del módulo
+    (`es_terminal`, `obtener_movimientos_legales`, `aplicar_movimiento`,
+    `obtener_resultado`). Conserva la tabla de transposición y la historia
+    entre iteraciones de la profundización y entre jugadas.
+    """
+    def __init__(self, zobrist=None, capacidad_tabla=1000000, evaluar=None):
+        self.zobrist = zobrist or Zobrist()
+        self.capacidad_tabla = capacidad_tabla  # Límite de entradas de la tabla de transposición
+        self.tabla = {}  # hash -> (profundidad, valor, tipo, mejor movimiento)
+        self.historia = defaultdict(int)  # movimiento -> puntuación de historia
+        self.asesinos = defaultdict(list)  # ply -> hasta dos movimientos asesinos
+        self.evaluar = evaluar or evaluar_estado  # Evaluación heurística en la frontera
+        self.nodos = 0  # Nodos visitados en la última búsqueda
+        self.limite_tiempo = math.inf
+
+    def buscar(self, estado, jugador, tiempo_max=1.0, profundidad_max=None):
+        """
+        Profundización iterativa: realiza búsquedas de profundidad 1, 2, ...
+        hasta agotar el tiempo o llegar a la profundidad máxima, y devuelve el
+        resultado de la última iteración completada.
+
+        :param estado: Estado actual del tablero.
+        :param jugador: Jugador al que le toca mover.
+        :param tiempo_max: Presupuesto de tiempo en segundos.
+        :param profundidad_max: Profundidad máxima (por defecto, número de casillas libres).
+        :return: Tupla (mejor movimiento, valor desde la perspectiva de `jugador`, profundidad alcanzada).
+        """
+        if profundidad_max is None:
+            profundidad_max = len(obtener_movimientos_legales(estado))
+        self.nodos = 0
+        self.asesinos.clear()
+        self.limite_tiempo = time.perf_counter() + tiempo_max
+        h = self.zobrist.calcular(estado, jugador)
+        mejor = (None, 0, 0)
+        for profundidad in range(1, profundidad_max + 1):
+            try:
+                valor = self.negamax(estado, jugador, h, profundidad, -math.inf, math.inf, 0)
+            except TiempoAgotado:
+                break  # Se descarta la iteración incompleta
+            mejor = (self.tabla[h][3], valor, profundidad)
+            if abs(valor) >= VICTORIA - profundidad_max:
+                break  # Resultado forzado: no hace falta profundizar más
+        return mejor
+
+    def negamax(self, estado, jugador, h, profundidad, alfa, beta, ply):
+        """
+        Negamax con poda alfa-beta. El valor se expresa siempre desde la
+        perspectiva del jugador que mueve en `estado`.
+        """
+        self.nodos += 1
+        if self.nodos & 1023 == 0 and time.perf_counter() > self.limite_tiempo:
+            raise TiempoAgotado()
+
+        signo = 1 if jugador == 'X' else -1
+        if es_terminal(estado):
+            resultado = obtener_resultado(estado) * signo
+            return resultado * (VICTORIA - ply)
+        if profundidad == 0:
+            return self.evaluar(estado, jugador)
+
+        # Consulta de la tabla de transposición
+        alfa_original = alfa
+        entrada = self.tabla.get(h)
+        movimiento_tabla = None
+        if entrada is not None:
+            prof_entrada, valor_entrada, tipo, movimiento_tabla = entrada
+            valor_entrada = valor_desde_tabla(valor_entrada, ply)
+            if prof_entrada >= profundidad:
+                if tipo == EXACTO:
+                    return valor_entrada
+                if tipo == COTA_INFERIOR:
+                    alfa = max(alfa, valor_entrada)
+                elif tipo == COTA_SUPERIOR:
+                    beta = min(beta, valor_entrada)
+                if alfa >= beta:
+                    return valor_entrada
+
+        rival = siguiente_jugador(jugador)
+        mejor_valor, mejor_movimiento = -math.inf, None
+        for movimiento in self.ordenar_movimientos(obtener_movimientos_legales(estado), movimiento_tabla, ply):
+            hijo = aplicar_movimiento(estado, movimiento, jugador)
+            h_hijo = self.zobrist.actualizar(h, movimiento, jugador)
+            valor = -self.negamax(hijo, rival, h_hijo, profundidad - 1, -beta, -alfa, ply + 1)
+            if valor > mejor_valor:
+                mejor_valor, mejor_movimiento = valor, movimiento
+            alfa = max(alfa, valor)
+            if alfa >= beta:
+                # Corte beta: el movimiento se recuerda como asesino y en la historia
+                asesinos = self.asesinos[ply]
+                if movimiento not in asesinos:
+                    asesinos.insert(0, movimiento)
+                    del asesinos[2:]
+                self.historia[movimiento] += profundidad * profundidad
+                break
+
+        # Almacenar en la tabla de transposición (reemplazo por profundidad)
+        if mejor_valor <= alfa_original:
+            tipo = COTA_SUPERIOR
+        elif mejor_valor >= beta:
+            tipo = COTA_INFERIOR
+        else:
+            tipo = EXACTO
+        if entrada is None and len(self.tabla) >= self.capacidad_tabla:
+            self.tabla.clear()
+        if entrada is None or entrada[0] <= profundidad:
+            self.tabla[h] = (profundidad, valor_a_tabla(mejor_valor, ply), tipo, mejor_movimiento)
+        return mejor_valor
+
+    def ordenar_movimientos(self, movimientos, movimiento_tabla, ply):
+        """
+        Ordena los movimientos: primero el de la tabla de transposición, después
+        los asesinos del mismo ply y el resto según la heurística de historia.
+        """
+        asesinos = self.asesinos.get(ply, ())
+        def prioridad(movimiento):
+            if movimiento == movimiento_tabla:
+                return (3, 0)
+            if movimiento in asesinos:
+                return (2, -asesinos.index(movimiento))
+            return (1, self.historia[movimiento])
+        return sorted(movimientos, key=prioridad, reverse=True)
+
+def valor_a_tabla(valor, ply):
+    """
+    Las victorias se puntúan según su distancia a la raíz; en la tabla se guardan
+    relativas al propio nodo para que sigan siendo válidas desde otra raíz.
+    """
+    if valor > VICTORIA // 2:
+        return valor + ply
+    if valor < -VICTORIA // 2:
+        return valor - ply
+    return valor
+
+def valor_desde_tabla(valor, ply):
+    """
+    Operación inversa de `valor_a_tabla`.
     """
-    return max(nodo.hijos, key=lambda h: h.visitas)
+    if valor > VICTORIA // 2:
+        return valor - ply
+    if valor < -VICTORIA // 2:
+        return valor + ply
+    return valor
+
+def evaluar_estado(estado, jugador):
+    """
+    Evaluación heurística de un estado no terminal desde la perspectiva de
+    `jugador`: líneas aún ganables por él menos líneas ganables por el rival.
+    """
+    rival = siguiente_jugador(jugador)
+    abiertas_propias = sum(1 for linea in obtener_lineas(estado) if rival not in linea)
+    abiertas_rival = sum(1 for linea in obtener_lineas(estado) if jugador not in linea)
+    return abiertas_propias - abiertas_rival
 
 # Funciones auxiliares para el juego Tres en Raya:
-def es_terminal(estado):
+def obtener_lineas(estado):
     """
-    Verifica si el juego ha terminado (victoria o empate).
+    Devuelve las ocho líneas del tablero (filas, columnas y diagonales).
     """
-    lineas = [
+    return [
         # Filas
         estado[0], estado[1], estado[2],
         # Columnas
@@ -151,7 +450,12 @@ def es_terminal(estado):
         [estado[0][0], estado[1][1], estado[2][2]],
         [estado[0][2], estado[1][1], estado[2][0]],
     ]
-    for linea in lineas:
+
+def es_terminal(estado):
+    """
+    Verifica si el juego ha terminado (victoria o empate).
+    """
+    for linea in obtener_lineas(estado):
         if len(set(linea)) == 1 and linea[0] != ' ':
             return True
     return all(celda != ' ' for fila in estado for celda in fila)
@@ -174,12 +478,147 @@ def obtener_resultado(estado):
     """
     Evalúa el resultado del juego (1 para victoria de X, -1 para O, 0 para empate).
     """
-    if any(len(set(linea)) == 1 and linea[0] == 'X' for linea in estado):
+    lineas = obtener_lineas(estado)
+    if any(len(set(linea)) == 1 and linea[0] == 'X' for linea in lineas):
         return 1  # Victoria de X
-    if any(len(set(linea)) == 1 and linea[0] == 'O' for linea in estado):
+    if any(len(set(linea)) == 1 and linea[0] == 'O' for linea in lineas):
         return -1  # Victoria de O
     return 0  # Empate
 
+# Agente de búsqueda en tiempo real (LRTA* / RTAA*):
+# en cada paso realiza una búsqueda A* acotada alrededor de su posición,
+# actualiza una tabla de heurística aprendida y ejecuta una única acción.
+# Como la búsqueda por paso está limitada en expansiones y en tiempo, la
+# latencia de cada paso no depende del tamaño del mapa.
+
+class AgenteLRTA:
+    """
+    Agente RTAA* sobre un mapa de rejilla (lista de cadenas, '#' = obstáculo).
+    La heurística aprendida se guarda en `self.h` (casilla -> valor) y puede
+    persistirse en disco para que ensayos repetidos converjan más rápido.
+    """
+    def __init__(self, mapa, objetivo, expansiones_max=50, tiempo_paso=0.005, archivo_heuristica=None):
+        self.mapa = mapa
+        self.objetivo = objetivo
+        self.expansiones_max = expansiones_max  # Tamaño máximo de la búsqueda por paso
+        self.tiempo_paso = tiempo_paso  # Tiempo máximo de planificación por paso (segundos)
+        self.archivo_heuristica = archivo_heuristica
+        self.h = {}  # Heurística aprendida (solo casillas actualizadas)
+        if archivo_heuristica and os.path.exists(archivo_heuristica):
+            self.cargar_heuristica(archivo_heuristica)
+
+    def heuristica(self, casilla):
+        """
+        Valor heurístico de una casilla: el aprendido o, si no existe, la distancia Manhattan.
+        """
+        valor = self.h.get(casilla)
+        if valor is None:
+            valor = abs(casilla[0] - self.objetivo[0]) + abs(casilla[1] - self.objetivo[1])
+        return valor
+
+    def vecinos(self, casilla):
+        """
+        Casillas libres adyacentes (4-conectividad) con coste unitario.
+        """
+        i, j = casilla
+        for di, dj in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            ni, nj = i + di, j + dj
+            if 0 <= ni < len(self.mapa) and 0 <= nj < len(self.mapa[ni]) and self.mapa[ni][nj] != '#':
+                yield (ni, nj)
+
+    def paso(self, actual):
+        """
+        Realiza un paso del agente: búsqueda A* acotada desde `actual`,
+        actualización RTAA* de la heurística de las casillas expandidas y
+        elección de la siguiente casilla del camino hacia el mejor nodo frontera.
+
+        :param actual: Casilla en la que se encuentra el agente.
+        :return: La siguiente casilla, o None si no hay camino.
+        """
+        limite = time.perf_counter() + self.tiempo_paso
+        g = {actual: 0}
+        padres = {actual: None}
+        abiertos = [(self.heuristica(actual), 0, actual)]
+        cerrados = []
+        while abiertos and len(cerrados) < self.expansiones_max:
+            f, _, casilla = heapq.heappop(abiertos)
+            if casilla == self.objetivo:
+                heapq.heappush(abiertos, (f, g[casilla], casilla))  # El objetivo es la mejor frontera
+                break
+            if f > g[casilla] + self.heuristica(casilla):
+                continue  # Entrada obsoleta de la cola
+            cerrados.append(casilla)
+            for vecino in self.vecinos(casilla):
+                costo = g[casilla] + 1
+                if costo < g.get(vecino, math.inf):
+                    g[vecino] = costo
+                    padres[vecino] = casilla
+                    heapq.heappush(abiertos, (costo + self.heuristica(vecino), costo, vecino))
+            if time.perf_counter() > limite:
+                break
+
+        # Descartar entradas obsoletas hasta encontrar el mejor nodo frontera
+        while abiertos and abiertos[0][0] > g[abiertos[0][2]] + self.heuristica(abiertos[0][2]):
+            heapq.heappop(abiertos)
+        if not abiertos:
+            return None
+        f_mejor, _, mejor = abiertos[0]
+
+        # Actualización RTAA*: h(s) = f(mejor) - g(s) para cada casilla expandida
+        for casilla in cerrados:
+            self.h[casilla] = f_mejor - g[casilla]
+
+        # Retroceder desde el mejor nodo frontera hasta la primera acción
+        siguiente = mejor
+        while padres[siguiente] is not None and padres[siguiente] != actual:
+            siguiente = padres[siguiente]
+        return siguiente
+
+    def ensayo(self, inicio, pasos_max=10000):
+        """
+        Ejecuta un ensayo completo desde `inicio` hasta el objetivo.
+
+        :return: Lista de casillas recorridas.
+        """
+        camino = [inicio]
+        actual = inicio
+        while actual != self.objetivo and len(camino) <= pasos_max:
+            actual = self.paso(actual)
+            if actual is None:
+                break
+            camino.append(actual)
+        if self.archivo_heuristica:
+            self.guardar_heuristica(self.archivo_heuristica)
+        return camino
+
+    def guardar_heuristica(self, archivo):
+        """
+        Guarda la heurística aprendida en un archivo JSON.
+        """
+        with open(archivo, 'w') as f:
+            json.dump([[i, j, valor] for (i, j), valor in self.h.items()], f)
+
+    def cargar_heuristica(self, archivo):
+        """
+        Carga la heurística aprendida desde un archivo JSON.
+        """
+        with open(archivo) as f:
+            self.h = {(i, j): valor for i, j, valor in json.load(f)}
+
+def generar_mapa(filas, columnas, densidad=0.2, semilla=0):
+    """
+    Genera un mapa de rejilla aleatorio con una pared central que obliga a rodearla.
+    """
+    generador = random.Random(semilla)
+    mapa = []
+    for i in range(filas):
+        fila = ['#' if generador.random() < densidad else '.' for _ in range(columnas)]
+        if 0 < i < filas - 2:
+            fila[columnas // 2] = '#'
+        mapa.append(fila)
+    mapa[0][0] = mapa[filas - 1][columnas - 1] = '.'
+    return [''.join(fila) for fila in mapa]
+
 # Ejemplo práctico:
 estado_inicial = [[' ', ' ', ' '], [' ', ' ', ' '], [' ', ' ', ' ']]
 print("Estado inicial del tablero:")
@@ -187,8 +626,46 @@ for fila in estado_inicial:
     print(fila)
 
 # Ejecutar MCTS para encontrar el mejor movimiento para el jugador 'X'
-mejor_estado = mcts(estado_inicial, jugador='X', simulaciones=1000)
+# La tabla de transposición hace que los estados repetidos compartan nodo;
+# su capacidad limita la memoria usada
+tabla = TablaTransposicion(capacidad=5000)
+mejor_estado = mcts(estado_inicial, jugador='X', simulaciones=1000, tabla=tabla)
+print(f"\nNodos distintos en la tabla de transposición: {len(tabla)}")
 
 print("\nMejor estado encontrado después de aplicar MCTS:")
 for fila in mejor_estado:
-    print(fila)
\ No newline at end of file
+    print(fila)
+
+# Búsqueda exacta con Negamax alfa-beta y profundización iterativa
+buscador = BuscadorAlfaBeta()
+movimiento, valor, profundidad = buscador.buscar(estado_inicial, 'X', tiempo_max=2.0)
+print(f"\nAlfa-beta: mejor movimiento {movimiento}, valor {valor}, "
+      f"profundidad {profundidad}, nodos visitados {buscador.nodos}")
+
+# En una posición con victoria forzada, la búsqueda la encuentra de forma exacta
+estado_tactico = [['X', 'O', ' '], [' ', 'X', ' '], ['O', ' ', ' ']]
+movimiento, valor, profundidad = buscador.buscar(estado_tactico, 'X', tiempo_max=1.0)
+print(f"Posición táctica: mejor movimiento {movimiento}, valor {valor}")
+
+# Agente LRTA* en tiempo real: ensayos repetidos con la heurística guardada en disco
+archivo_h = 'heuristica_lrta.json'
+if os.path.exists(archivo_h):
+    os.remove(archivo_h)
+mapa = generar_mapa(40, 40)
+for ensayo in range(1, 6):
+    agente = AgenteLRTA(mapa, objetivo=(39, 39), archivo_heuristica=archivo_h)
+    inicio_ensayo = time.perf_counter()
+    camino = agente.ensayo((0, 0))
+    duracion = time.perf_counter() - inicio_ensayo
+    print(f"Ensayo {ensayo}: {len(camino) - 1} pasos, "
+          f"{1000 * duracion / max(len(camino) - 1, 1):.3f} ms por paso")
+os.remove(archivo_h)
+
+# La latencia por paso se mantiene constante aunque el mapa crezca
+for tamano in (50, 200, 800):
+    mapa = generar_mapa(tamano, tamano, densidad=0.1)
+    agente = AgenteLRTA(mapa, objetivo=(tamano - 1, tamano - 1))
+    inicio_ensayo = time.perf_counter()
+    for _ in range(200):
+        agente.paso((0, 0))
+    print(f"Mapa {tamano}x{tamano}: {1000 * (time.perf_counter() - inicio_ensayo) / 200:.3f} ms por paso")
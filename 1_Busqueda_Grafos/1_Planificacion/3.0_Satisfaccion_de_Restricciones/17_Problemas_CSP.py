@@ -1,16 +1,26 @@
+import random  # Para generar instancias grandes de coloreo de grafos
+import time  # Para medir el tiempo de resolución
+
+
 # Clase que representa un Problema de Satisfacción de Restricciones (CSP)
 class CSP:
-    def __init__(self, variables, dominios, restricciones):
+    def __init__(self, variables, dominios, restricciones, vecinos=None):
         """
         Inicializa el problema CSP.
 
         :param variables: Lista de variables del problema. Ejemplo: ['X', 'Y']
         :param dominios: Diccionario que asocia cada variable con sus valores posibles. Ejemplo: {'X': [1, 2, 3], 'Y': [2, 4]}
         :param restricciones: Función que define las restricciones entre variables. Debe retornar True si se cumple, False si no.
+        :param vecinos: Grafo de restricciones: diccionario que asocia cada variable con las variables con las que
+                        comparte una restricción. Si se omite, se supone que todas las variables están relacionadas.
         """
         self.variables = variables  # Lista de variables
         self.dominios = dominios    # Dominios de cada variable
         self.restricciones = restricciones  # Restricciones entre variables
+        # Grafo de restricciones: la consistencia solo se comprueba contra los vecinos
+        if vecinos is None:
+            vecinos = {v: [otra for otra in variables if otra != v] for v in variables}
+        self.vecinos = {v: list(vecinos.get(v, ())) for v in variables}
 
     def es_consistente(self, variable, valor, asignacion):
         """
@@ -21,20 +31,23 @@ class CSP:
         :param asignacion: Asignación actual de valores a variables.
         :return: True si es consistente, False si no.
         """
-        # Recorre todas las variables ya asignadas
-        for otra_variable in asignacion:
+        # Recorre solo los vecinos ya asignados en el grafo de restricciones
+        for otra_variable in self.vecinos[variable]:
             # Si la restricción entre la variable actual y otra no se cumple, retorna False
-            if not self.restricciones(variable, valor, otra_variable, asignacion[otra_variable]):
+            if otra_variable in asignacion and not self.restricciones(variable, valor, otra_variable, asignacion[otra_variable]):
                 return False
         return True
 
-    def busqueda_retroceso(self, asignacion={}):
+    def busqueda_retroceso(self, asignacion=None):
         """
         Realiza una búsqueda con retroceso (backtracking) para encontrar una solución al problema CSP.
 
         :param asignacion: Asignación actual de valores a variables.
         :return: Una asignación completa que satisface todas las restricciones, o None si no hay solución.
         """
+        if asignacion is None:
+            asignacion = {}
+
         # Si todas las variables están asignadas, retorna la asignación
         if len(asignacion) == len(self.variables):
             return asignacion
@@ -58,6 +71,129 @@ class CSP:
         # Si no se encuentra solución, retorna None
         return None
 
+    def resolver(self):
+        """
+        Búsqueda con retroceso sobre el grafo de restricciones, con comprobación hacia
+        adelante y heurísticas MRV (mínimos valores restantes) y de grado como desempate.
+
+        Los tamaños de los dominios y los grados (vecinos sin asignar) se mantienen de forma
+        incremental en cubetas indexadas por la clave (tamaño, -grado), por lo que elegir la
+        siguiente variable es O(1) amortizado. Los cambios se registran en una pila (trail)
+        y se deshacen al retroceder, sin copiar diccionarios. La búsqueda es iterativa, así
+        que no está limitada por la profundidad de recursión.
+
+        :return: Una asignación completa que satisface todas las restricciones, o None si no hay solución.
+        """
+        self._preparar()
+        variable = self._elegir_variable()
+        if variable is None:
+            return {}
+        pila = [[variable, iter(list(self._dominios[variable])), None]]
+        while pila:
+            marco = pila[-1]
+            variable, valores, marca = marco
+            if marca is not None:
+                # Deshacer el valor probado anteriormente en este nivel
+                self._deshacer(marca)
+                marco[2] = None
+            avanzado = False
+            for valor in valores:
+                marca = self._asignar(variable, valor)
+                if marca is None:
+                    continue  # Algún vecino se quedó sin valores
+                marco[2] = marca
+                siguiente = self._elegir_variable()
+                if siguiente is None:
+                    return dict(self._asignacion)
+                pila.append([siguiente, iter(list(self._dominios[siguiente])), None])
+                avanzado = True
+                break
+            if not avanzado:
+                pila.pop()
+        return None
+
+    def _preparar(self):
+        """
+        Inicializa las estructuras incrementales usadas por `resolver`.
+        """
+        n = len(self.variables)
+        self._dominios = {v: set(self.dominios[v]) for v in self.variables}
+        self._grado = {v: len(self.vecinos[v]) for v in self.variables}
+        self._asignacion = {}
+        self._trail = []
+        self._ancho = n + 1  # Número de grados posibles (0..n)
+        tam_max = max((len(d) for d in self._dominios.values()), default=0)
+        self._cubetas = [set() for _ in range((tam_max + 1) * self._ancho)]
+        self._clave = {}
+        self._minimo = len(self._cubetas)
+        for v in self.variables:
+            self._insertar_en_cubeta(v)
+
+    def _insertar_en_cubeta(self, variable):
+        clave = len(self._dominios[variable]) * self._ancho + (self._ancho - 1 - self._grado[variable])
+        self._clave[variable] = clave
+        self._cubetas[clave].add(variable)
+        if clave < self._minimo:
+            self._minimo = clave
+
+    def _quitar_de_cubeta(self, variable):
+        self._cubetas[self._clave.pop(variable)].discard(variable)
+
+    def _elegir_variable(self):
+        """
+        Devuelve la variable sin asignar con el dominio más pequeño y, en caso de empate,
+        con más vecinos sin asignar; None si todas están asignadas.
+        """
+        while self._minimo < len(self._cubetas) and not self._cubetas[self._minimo]:
+            self._minimo += 1
+        if self._minimo == len(self._cubetas):
+            return None
+        return next(iter(self._cubetas[self._minimo]))
+
+    def _asignar(self, variable, valor):
+        """
+        Asigna un valor y poda los dominios de los vecinos sin asignar.
+        Devuelve la marca del trail para deshacer, o None si algún dominio quedó vacío
+        (en ese caso los cambios ya se han deshecho).
+        """
+        marca = len(self._trail)
+        self._quitar_de_cubeta(variable)
+        self._asignacion[variable] = valor
+        self._trail.append(('asignacion', variable, None))
+        for vecino in self.vecinos[variable]:
+            if vecino in self._asignacion:
+                continue
+            self._quitar_de_cubeta(vecino)
+            self._grado[vecino] -= 1
+            self._trail.append(('grado', vecino, None))
+            dominio = self._dominios[vecino]
+            for otro_valor in [b for b in dominio if not self.restricciones(variable, valor, vecino, b)]:
+                dominio.discard(otro_valor)
+                self._trail.append(('valor', vecino, otro_valor))
+            self._insertar_en_cubeta(vecino)
+            if not dominio:
+                self._deshacer(marca)
+                return None
+        return marca
+
+    def _deshacer(self, marca):
+        """
+        Revierte todos los cambios registrados en el trail desde la marca indicada.
+        """
+        trail = self._trail
+        while len(trail) > marca:
+            tipo, variable, valor = trail.pop()
+            if tipo == 'asignacion':
+                del self._asignacion[variable]
+                self._insertar_en_cubeta(variable)
+                continue
+            self._quitar_de_cubeta(variable)
+            if tipo == 'grado':
+                self._grado[variable] += 1
+            else:
+                self._dominios[variable].add(valor)
+            self._insertar_en_cubeta(variable)
+
 
 # Ejemplo práctico: Problema de coloreo de mapas
 # Variables: Regiones de un mapa
@@ -94,4 +230,32 @@ problema_csp = CSP(variables, dominios, restricciones)
 solucion = problema_csp.busqueda_retroceso()
 
 # Imprimir la solución encontrada
-print("Solucion encontrada:", solucion)
\ No newline at end of file
+print("Solucion encontrada:", solucion)
+
+# Coloreo de un grafo aleatorio de 1000 regiones usando el grafo de restricciones
+def generar_coloreo(num_regiones, num_colores, grado_medio, semilla=0):
+    """
+    Genera un problema de coloreo con solución garantizada: se elige una coloración
+    oculta y solo se añaden aristas entre regiones de distinto color.
+    """
+    generador = random.Random(semilla)
+    oculto = [generador.randrange(num_colores) for _ in range(num_regiones)]
+    vecinos = {r: set() for r in range(num_regiones)}
+    aristas = 0
+    while aristas < num_regiones * grado_medio // 2:
+        a, b = generador.randrange(num_regiones), generador.randrange(num_regiones)
+        if oculto[a] != oculto[b] and b not in vecinos[a]:
+            vecinos[a].add(b)
+            vecinos[b].add(a)
+            aristas += 1
+    variables_grandes = list(range(num_regiones))
+    dominios_grandes = {r: list(range(num_colores)) for r in variables_grandes}
+    return CSP(variables_grandes, dominios_grandes, lambda v1, x1, v2, x2: x1 != x2, vecinos)
+
+problema_grande = generar_coloreo(1000, 4, 6)
+inicio = time.perf_counter()
+solucion_grande = problema_grande.resolver()
+duracion = time.perf_counter() - inicio
+valida = solucion_grande is not None and all(
+    solucion_grande[a] != solucion_grande[b] for a in problema_grande.variables for b in problema_grande.vecinos[a])
+print(f"Coloreo de 1000 regiones resuelto en {duracion:.3f} s (solución válida: {valida})")
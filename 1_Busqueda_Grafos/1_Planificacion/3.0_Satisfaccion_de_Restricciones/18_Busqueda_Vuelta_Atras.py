@@ -1,3 +1,9 @@
+import copy  # Para no modificar el tablero de ejemplo al resolverlo
+import multiprocessing  # Para resolver lotes de Sudokus en varios procesos
+import os
+import tempfile
+import time
+
 def backtracking_sudoku(tablero):
     """
     Resuelve un Sudoku utilizando el algoritmo de Búsqueda de Vuelta Atrás.
@@ -66,27 +72,412 @@ def es_valido(tablero, fila, columna, numero):
     # Si pasa todas las verificaciones, el número es válido
     return True
 
-# Ejemplo práctico:
-# Tablero inicial de Sudoku con algunas casillas llenas y otras vacías
-tablero_sudoku = [
-    [5, 3, 0, 0, 7, 0, 0, 0, 0],
-    [6, 0, 0, 1, 9, 5, 0, 0, 0],
-    [0, 9, 8, 0, 0, 0, 0, 6, 0],
-    [8, 0, 0, 0, 6, 0, 0, 0, 3],
-    [4, 0, 0, 8, 0, 3, 0, 0, 1],
-    [7, 0, 0, 0, 2, 0, 0, 0, 6],
-    [0, 6, 0, 0, 0, 0, 2, 8, 0],
-    [0, 0, 0, 4, 1, 9, 0, 0, 5],
-    [0, 0, 0, 0, 8, 0, 0, 7, 9]
+
+# Motor de Sudoku con máscaras de bits y propagación de restricciones
+# Cada fila, columna y caja guarda en una máscara de 9 bits los dígitos ya usados,
+# de modo que los candidatos de una casilla se obtienen con dos operaciones OR y una NOT.
+
+TODOS = 0x1FF  # Máscara con los nueve dígitos
+UNIDADES = ([[9 * f + c for c in range(9)] for f in range(9)] +                      # Filas (0-8)
+            [[9 * f + c for f in range(9)] for c in range(9)] +                      # Columnas (9-17)
+            [[9 * (3 * (b // 3) + i) + 3 * (b % 3) + j for i in range(3) for j in range(3)]
+             for b in range(9)])                                                     # Cajas (18-26)
+UNIDADES_CASILLA = [(c // 9, 9 + c % 9, 18 + 3 * (c // 27) + (c % 9) // 3) for c in range(81)]
+NUM_BITS = [bin(m).count('1') for m in range(TODOS + 1)]  # Número de candidatos por máscara
+
+def parsear_sudoku(linea):
+    """
+    Convierte una línea de 81 caracteres ('0' o '.' = vacía) en una lista de 81 enteros.
+    """
+    return [int(ch) if ch in '123456789' else 0 for ch in linea.strip()[:81]]
+
+def candidatos(usados, casilla):
+    """
+    Máscara de dígitos que todavía pueden colocarse en la casilla.
+    """
+    f, c, b = UNIDADES_CASILLA[casilla]
+    return TODOS & ~(usados[f] | usados[c] | usados[b])
+
+def colocar(valores, usados, casilla, bit):
+    """
+    Coloca el dígito representado por `bit` y lo marca como usado en sus tres unidades.
+    """
+    valores[casilla] = bit.bit_length()
+    for u in UNIDADES_CASILLA[casilla]:
+        usados[u] |= bit
+
+def propagar(valores, usados):
+    """
+    Aplica solitarios desnudos (casillas con un solo candidato) y solitarios ocultos
+    (dígitos con una sola casilla posible en una unidad) hasta un punto fijo.
+
+    :return: None si se detecta una contradicción; si no, la casilla vacía con menos
+             candidatos (-1 si el tablero está completo).
+    """
+    while True:
+        cambio = False
+        mejor, minimo = -1, 10
+        # Solitarios desnudos
+        for casilla in range(81):
+            if valores[casilla]:
+                continue
+            cand = candidatos(usados, casilla)
+            n = NUM_BITS[cand]
+            if n == 0:
+                return None
+            if n == 1:
+                colocar(valores, usados, casilla, cand)
+                cambio = True
+            elif n < minimo:
+                mejor, minimo = casilla, n
+        # Solitarios ocultos
+        for u, unidad in enumerate(UNIDADES):
+            una_vez = varias_veces = 0
+            for casilla in unidad:
+                if not valores[casilla]:
+                    cand = candidatos(usados, casilla)
+                    varias_veces |= una_vez & cand
+                    una_vez |= cand
+            if (una_vez | usados[u]) != TODOS:
+                return None  # Algún dígito no tiene sitio en la unidad
+            unicos = una_vez & ~varias_veces & ~usados[u]
+            while unicos:
+                bit = unicos & -unicos
+                unicos ^= bit
+                for casilla in unidad:
+                    if not valores[casilla] and candidatos(usados, casilla) & bit:
+                        colocar(valores, usados, casilla, bit)
+                        cambio = True
+                        break
+                else:
+                    return None  # El dígito perdió su única casilla por otra colocación
+        if not cambio:
+            return mejor
+
+def resolver_sudoku_bits(celdas):
+    """
+    Resuelve un Sudoku con máscaras de bits, propagación de solitarios y
+    ramificación en la casilla con menos candidatos.
+
+    :param celdas: Lista de 81 enteros (0 = vacía).
+    :return: Lista de 81 enteros resuelta o None si no hay solución.
+    """
+    valores = list(celdas)
+    usados = [0] * 27
+    for casilla, valor in enumerate(valores):
+        if valor:
+            bit = 1 << (valor - 1)
+            if candidatos(usados, casilla) & bit == 0:
+                return None  # Pista repetida en una unidad
+            for u in UNIDADES_CASILLA[casilla]:
+                usados[u] |= bit
+    return _buscar_bits(valores, usados)
+
+def _buscar_bits(valores, usados):
+    casilla = propagar(valores, usados)
+    if casilla is None:
+        return None
+    if casilla == -1:
+        return valores
+    cand = candidatos(usados, casilla)
+    while cand:
+        bit = cand & -cand
+        cand ^= bit
+        nuevos_valores, nuevos_usados = valores[:], usados[:]
+        colocar(nuevos_valores, nuevos_usados, casilla, bit)
+        resultado = _buscar_bits(nuevos_valores, nuevos_usados)
+        if resultado is not None:
+            return resultado
+    return None
+
+def _resolver_linea(linea):
+    solucion = resolver_sudoku_bits(parsear_sudoku(linea))
+    return ''.join(map(str, solucion)) if solucion else None
+
+def resolver_lote(archivo, procesos=None):
+    """
+    Resuelve todos los Sudokus de un archivo (uno por línea, 81 caracteres) repartiéndolos
+    entre varios procesos e informa de los Sudokus resueltos por segundo.
+
+    :param archivo: Ruta del archivo de entrada.
+    :param procesos: Número de procesos (por defecto, uno por núcleo).
+    :return: Lista con la solución de cada Sudoku como cadena de 81 dígitos (None si no tiene).
+    """
+    with open(archivo) as f:
+        lineas = [linea for linea in f if len(linea.strip()) >= 81]
+    inicio = time.perf_counter()
+    with multiprocessing.Pool(procesos) as pool:
+        soluciones = pool.map(_resolver_linea, lineas, chunksize=max(1, len(lineas) // (4 * (procesos or os.cpu_count() or 1))))
+    duracion = time.perf_counter() - inicio
+    print(f"{len(lineas)} Sudokus resueltos en {duracion:.2f} s ({len(lineas) / duracion:.0f} Sudokus/s)")
+    return soluciones
+
+
+# Cobertura exacta con el Algoritmo X de Knuth y Dancing Links (DLX)
+# Sudoku, N-reinas o teselados con pentominós son problemas de cobertura exacta:
+# elegir filas de una matriz dispersa de 0/1 de modo que cada columna primaria
+# quede cubierta exactamente una vez (y cada secundaria, como mucho una vez).
+# Los nodos se guardan en listas paralelas (izquierda, derecha, arriba, abajo)
+# para que cubrir y descubrir columnas sean solo reasignaciones de índices.
+
+class DancingLinks:
+    """
+    Matriz dispersa de cobertura exacta enlazada en listas circulares dobles.
+    Las columnas 0..primarias-1 deben cubrirse exactamente una vez; las columnas
+    secundarias (primarias..primarias+secundarias-1) como mucho una vez.
+    """
+    def __init__(self, filas, primarias, secundarias=0):
+        """
+        :param filas: Diccionario identificador de fila -> lista de índices de columna.
+        :param primarias: Número de columnas primarias.
+        :param secundarias: Número de columnas secundarias.
+        """
+        num_columnas = primarias + secundarias
+        raiz = num_columnas  # La cabecera raíz va después de las cabeceras de columna
+        total = num_columnas + 1
+        self.izq = list(range(total))
+        self.der = list(range(total))
+        self.arr = list(range(total))
+        self.aba = list(range(total))
+        self.col = list(range(total))
+        self.fila = [None] * total
+        self.tamano = [0] * total
+        self.raiz = raiz
+        # Enlazar las columnas primarias a la raíz; las secundarias quedan enlazadas consigo mismas
+        anterior = raiz
+        for c in range(primarias):
+            self.der[anterior], self.izq[c] = c, anterior
+            anterior = c
+        self.der[anterior], self.izq[raiz] = raiz, anterior
+        for identificador, columnas in filas.items():
+            primero = None
+            for c in columnas:
+                nodo = len(self.col)
+                self.col.append(c)
+                self.fila.append(identificador)
+                # Insertar al final de la columna c
+                self.arr.append(self.arr[c])
+                self.aba.append(c)
+                self.aba[self.arr[c]] = nodo
+                self.arr[c] = nodo
+                self.tamano[c] += 1
+                # Insertar en la lista horizontal de la fila
+                if primero is None:
+                    primero = nodo
+                    self.izq.append(nodo)
+                    self.der.append(nodo)
+                else:
+                    self.izq.append(self.izq[primero])
+                    self.der.append(primero)
+                    self.der[self.izq[primero]] = nodo
+                    self.izq[primero] = nodo
+
+    def cubrir(self, c):
+        """
+        Retira la columna c y todas las filas que la contienen.
+        """
+        izq, der, arr, aba, col, tamano = self.izq, self.der, self.arr, self.aba, self.col, self.tamano
+        der[izq[c]], izq[der[c]] = der[c], izq[c]
+        i = aba[c]
+        while i != c:
+            j = der[i]
+            while j != i:
+                aba[arr[j]], arr[aba[j]] = aba[j], arr[j]
+                tamano[col[j]] -= 1
+                j = der[j]
+            i = aba[i]
+
+    def descubrir(self, c):
+        """
+        Operación inversa de `cubrir`, en orden inverso.
+        """
+        izq, der, arr, aba, col, tamano = self.izq, self.der, self.arr, self.aba, self.col, self.tamano
+        i = arr[c]
+        while i != c:
+            j = izq[i]
+            while j != i:
+                tamano[col[j]] += 1
+                aba[arr[j]] = arr[aba[j]] = j
+                j = izq[j]
+            i = arr[i]
+        der[izq[c]] = izq[der[c]] = c
+
+    def _elegir_columna(self):
+        """
+        Heurística S de Knuth: la columna primaria con menos filas.
+        """
+        mejor, minimo = None, float('inf')
+        c = self.der[self.raiz]
+        while c != self.raiz:
+            if self.tamano[c] < minimo:
+                mejor, minimo = c, self.tamano[c]
+                if minimo <= 1:
+                    break
+            c = self.der[c]
+        return mejor
+
+    def _elegir_fila(self, r):
+        j = self.der[r]
+        while j != r:
+            self.cubrir(self.col[j])
+            j = self.der[j]
+
+    def _deshacer_fila(self, r):
+        j = self.izq[r]
+        while j != r:
+            self.descubrir(self.col[j])
+            j = self.izq[j]
+
+    def soluciones(self):
+        """
+        Genera todas las soluciones como listas de identificadores de fila, sin guardarlas.
+        Si el consumidor abandona el generador (o se cierra con close()), los bloques
+        finally deshacen las coberturas pendientes y la matriz queda como al principio.
+        """
+        parcial = []
+
+        def buscar():
+            if self.der[self.raiz] == self.raiz:
+                yield list(parcial)
+                return
+            c = self._elegir_columna()
+            if self.tamano[c] == 0:
+                return
+            self.cubrir(c)
+            try:
+                r = self.aba[c]
+                while r != c:
+                    parcial.append(self.fila[r])
+                    self._elegir_fila(r)
+                    try:
+                        yield from buscar()
+                    finally:
+                        self._deshacer_fila(r)
+                        parcial.pop()
+                    r = self.aba[r]
+            finally:
+                self.descubrir(c)
+
+        return buscar()
+
+    def contar(self):
+        """
+        Cuenta todas las soluciones sin construirlas.
+        """
+        def buscar():
+            if self.der[self.raiz] == self.raiz:
+                return 1
+            c = self._elegir_columna()
+            if self.tamano[c] == 0:
+                return 0
+            total = 0
+            self.cubrir(c)
+            r = self.aba[c]
+            while r != c:
+                self._elegir_fila(r)
+                total += buscar()
+                self._deshacer_fila(r)
+                r = self.aba[r]
+            self.descubrir(c)
+            return total
+
+        return buscar()
+
+def codificar_sudoku(celdas):
+    """
+    Codifica un Sudoku (lista de 81 enteros, 0 = vacía) como cobertura exacta con 324
+    columnas: casilla ocupada, dígito en fila, dígito en columna y dígito en caja.
+    Cada fila de la matriz es una terna (casilla, dígito).
+    """
+    filas = {}
+    for casilla in range(81):
+        f, c = divmod(casilla, 9)
+        b = 3 * (f // 3) + c // 3
+        digitos = [celdas[casilla]] if celdas[casilla] else range(1, 10)
+        for d in digitos:
+            filas[(casilla, d)] = [casilla, 81 + 9 * f + d - 1, 162 + 9 * c + d - 1, 243 + 9 * b + d - 1]
+    return DancingLinks(filas, 324)
+
+def decodificar_sudoku(solucion):
+    """
+    Convierte una solución de cobertura exacta en una lista de 81 enteros.
+    """
+    valores = [0] * 81
+    for casilla, d in solucion:
+        valores[casilla] = d
+    return valores
+
+def codificar_n_reinas(n):
+    """
+    Codifica las N-reinas como cobertura exacta: filas y columnas del tablero son
+    columnas primarias (exactamente una reina); las 2·(2n-1) diagonales son
+    secundarias (como mucho una reina).
+    """
+    filas = {}
+    for f in range(n):
+        for c in range(n):
+            filas[(f, c)] = [f, n + c, 2 * n + f + c, 2 * n + (2 * n - 1) + f - c + n - 1]
+    return DancingLinks(filas, 2 * n, 2 * (2 * n - 1))
+
+# Sudokus difíciles conocidos; se repiten para formar un lote de prueba
+SUDOKUS_DIFICILES = [
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97..",
 ]
 
-# Resuelve el Sudoku utilizando el algoritmo de Búsqueda de Vuelta Atrás
-solucion = backtracking_sudoku(tablero_sudoku)
+if __name__ == '__main__':
+    # Ejemplo práctico:
+    # Tablero inicial de Sudoku con algunas casillas llenas y otras vacías
+    tablero_sudoku = [
+        [5, 3, 0, 0, 7, 0, 0, 0, 0],
+        [6, 0, 0, 1, 9, 5, 0, 0, 0],
+        [0, 9, 8, 0, 0, 0, 0, 6, 0],
+        [8, 0, 0, 0, 6, 0, 0, 0, 3],
+        [4, 0, 0, 8, 0, 3, 0, 0, 1],
+        [7, 0, 0, 0, 2, 0, 0, 0, 6],
+        [0, 6, 0, 0, 0, 0, 2, 8, 0],
+        [0, 0, 0, 4, 1, 9, 0, 0, 5],
+        [0, 0, 0, 0, 8, 0, 0, 7, 9]
+    ]
+
+    # Resuelve el Sudoku utilizando el algoritmo de Búsqueda de Vuelta Atrás (sobre una copia,
+    # porque rellena el tablero en el sitio)
+    solucion = backtracking_sudoku(copy.deepcopy(tablero_sudoku))
+
+    # Imprime el resultado
+    if solucion:
+        print("Sudoku resuelto:")
+        for fila in solucion:
+            print(fila)
+    else:
+        print("No hay solución para este Sudoku.")
+    # El motor de máscaras de bits resuelve el mismo tablero original sin casi ramificar
+    solucion_bits = resolver_sudoku_bits([valor for fila in tablero_sudoku for valor in fila])
+    print("Motor de bits:", ''.join(map(str, solucion_bits)),
+          "(coincide)" if solucion and solucion_bits == [valor for fila in solucion for valor in fila] else "(distinta)")
+
+    # Cobertura exacta (DLX) frente a la vuelta atrás original en Sudokus difíciles
+    for linea in SUDOKUS_DIFICILES[2:]:
+        celdas = parsear_sudoku(linea)
+        inicio = time.perf_counter()
+        backtracking_sudoku([celdas[9 * i:9 * i + 9] for i in range(9)])
+        tiempo_vuelta_atras = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        dlx = codificar_sudoku(celdas)
+        solucion_dlx = decodificar_sudoku(next(dlx.soluciones()))
+        tiempo_dlx = time.perf_counter() - inicio
+        print(f"Vuelta atrás: {1000 * tiempo_vuelta_atras:.1f} ms | DLX: {1000 * tiempo_dlx:.1f} ms "
+              f"| soluciones: {codificar_sudoku(celdas).contar()}")
+
+    # Contar todas las soluciones de las N-reinas con la misma maquinaria
+    for n in (4, 6, 8):
+        print(f"{n}-reinas: {codificar_n_reinas(n).contar()} soluciones")
 
-# Imprime el resultado
-if solucion:
-    print("Sudoku resuelto:")
-    for fila in solucion:
-        print(fila)
-else:
-    print("No hay solución para este Sudoku.")
\ No newline at end of file
+    archivo_lote = os.path.join(tempfile.gettempdir(), 'sudokus_dificiles.txt')
+    with open(archivo_lote, 'w') as f:
+        f.write('\n'.join(SUDOKUS_DIFICILES * 100))
+    soluciones_lote = resolver_lote(archivo_lote)
+    print("Todos resueltos:", all(soluciones_lote))
+    os.remove(archivo_lote)
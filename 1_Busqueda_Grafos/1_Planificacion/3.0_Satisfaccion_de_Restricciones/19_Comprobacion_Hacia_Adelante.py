@@ -1,33 +1,152 @@
-def comprobacion_hacia_adelante(grafo, colores_disponibles, nodo_actual, asignacion_colores):
+import random  # Para generar mapas aleatorios en la comparación de rendimiento
+import time  # Para medir el tiempo de cada algoritmo
+
+def comprobacion_hacia_adelante(grafo, dominios, nodo_actual, asignacion_colores, trail):
     """
     Algoritmo de Comprobación Hacia Adelante (Forward Checking).
-    Este algoritmo verifica si la asignación de un color a un nodo es válida,
-    reduciendo los dominios de los nodos vecinos y detectando conflictos.
+    Al asignar un color a un nodo, elimina ese color de los dominios de los vecinos
+    sin asignar. Si algún dominio queda vacío, la asignación es inválida y hay que
+    retroceder de inmediato.
+
+    Cada valor podado se apunta en `trail` como (vecino, color), de modo que la poda
+    se deshace con `deshacer_poda` sin copiar los dominios.
 
     :param grafo: Diccionario que representa el grafo como lista de adyacencia.
-    :param colores_disponibles: Lista de colores disponibles para asignar.
+    :param dominios: Diccionario {nodo: conjunto de colores aún posibles}; se modifica en el sitio.
     :param nodo_actual: Nodo al que se le asignó un color.
     :param asignacion_colores: Diccionario con la asignación actual de colores {nodo: color}.
+    :param trail: Lista donde se registran las podas realizadas.
     :return: True si la asignación es válida, False si algún dominio queda vacío.
     """
+    color = asignacion_colores[nodo_actual]
     # Iterar sobre los vecinos del nodo actual
     for vecino in grafo[nodo_actual]:
-        # Verificar si el vecino aún no tiene un color asignado
-        if vecino not in asignacion_colores:
-            # Crear una copia del dominio original de colores
-            dominio_original = colores_disponibles.copy()
-            
-            # Filtrar los colores que son inconsistentes con el color asignado al nodo actual
-            nuevo_dominio = [color for color in dominio_original if color != asignacion_colores[nodo_actual]]
-            
+        # Solo se podan los vecinos que aún no tienen un color asignado
+        if vecino not in asignacion_colores and color in dominios[vecino]:
+            # Eliminar el color inconsistente del dominio del vecino y registrarlo
+            dominios[vecino].discard(color)
+            trail.append((vecino, color))
+
             # Si el dominio del vecino queda vacío, la asignación es inválida
-            if not nuevo_dominio:
+            if not dominios[vecino]:
                 return False
-            
-            # Nota: En una implementación más avanzada, aquí se actualizaría el dominio del vecino.
-            # En este caso, solo verificamos si hay conflictos inmediatos.
     return True
 
+def deshacer_poda(dominios, trail, marca):
+    """
+    Restaura los valores podados desde la posición `marca` del trail.
+
+    :param dominios: Diccionario {nodo: conjunto de colores}.
+    :param trail: Lista de podas (vecino, color).
+    :param marca: Longitud del trail antes de la asignación que se deshace.
+    """
+    while len(trail) > marca:
+        vecino, color = trail.pop()
+        dominios[vecino].add(color)
+
+def colorear_mapa(grafo, colores_disponibles):
+    """
+    Colorea un mapa mediante vuelta atrás con comprobación hacia adelante y la
+    heurística MRV (se elige el nodo con menos colores restantes).
+
+    :param grafo: Diccionario de adyacencia del mapa.
+    :param colores_disponibles: Lista de colores.
+    :return: Tupla (asignación {nodo: color} o None, número de nodos del árbol de búsqueda).
+    """
+    dominios = {nodo: set(colores_disponibles) for nodo in grafo}
+    asignacion_colores = {}
+    trail = []
+    nodos_explorados = 0
+
+    def elegir_nodo():
+        pendientes = [n for n in grafo if n not in asignacion_colores]
+        return min(pendientes, key=lambda n: len(dominios[n])) if pendientes else None
+
+    # Búsqueda iterativa con una pila explícita: cada marco es [nodo, colores por probar,
+    # marca del trail del color en curso], así que la profundidad no depende del límite
+    # de recursión y se pueden colorear mapas de miles de regiones
+    nodo = elegir_nodo()
+    if nodo is None:
+        return asignacion_colores, nodos_explorados
+    pila = [[nodo, iter(list(dominios[nodo])), None]]
+    while pila:
+        marco = pila[-1]
+        nodo, colores, marca = marco
+        if marca is not None:
+            # Retroceso: se deshace la poda y la asignación del color anterior
+            deshacer_poda(dominios, trail, marca)
+            del asignacion_colores[nodo]
+            marco[2] = None
+        avanzado = False
+        for color in colores:
+            nodos_explorados += 1
+            marca = len(trail)
+            asignacion_colores[nodo] = color
+            if not comprobacion_hacia_adelante(grafo, dominios, nodo, asignacion_colores, trail):
+                deshacer_poda(dominios, trail, marca)
+                del asignacion_colores[nodo]
+                continue
+            marco[2] = marca
+            siguiente = elegir_nodo()
+            if siguiente is None:
+                return asignacion_colores, nodos_explorados
+            pila.append([siguiente, iter(list(dominios[siguiente])), None])
+            avanzado = True
+            break
+        if not avanzado:
+            pila.pop()
+    return None, nodos_explorados
+
+def colorear_mapa_sin_poda(grafo, colores_disponibles, limite_nodos=200000):
+    """
+    Vuelta atrás cronológica sin poda, que solo comprueba la asignación ya hecha.
+    Se usa como referencia en la comparación de rendimiento.
+
+    :return: Tupla (asignación o None, número de nodos explorados).
+    """
+    orden = list(grafo)
+    asignacion_colores = {}
+    nodos_explorados = 0
+
+    # Pila explícita con el índice del siguiente color a probar en cada nivel
+    siguiente_color = [0]
+    while siguiente_color:
+        indice = len(siguiente_color) - 1
+        nodo = orden[indice]
+        asignacion_colores.pop(nodo, None)  # Se deshace el color probado antes en este nivel
+        avanzado = False
+        while siguiente_color[-1] < len(colores_disponibles):
+            if nodos_explorados >= limite_nodos:
+                return None, nodos_explorados
+            color = colores_disponibles[siguiente_color[-1]]
+            siguiente_color[-1] += 1
+            nodos_explorados += 1
+            if all(asignacion_colores.get(vecino) != color for vecino in grafo[nodo]):
+                asignacion_colores[nodo] = color
+                if indice + 1 == len(orden):
+                    return asignacion_colores, nodos_explorados
+                siguiente_color.append(0)
+                avanzado = True
+                break
+        if not avanzado:
+            siguiente_color.pop()
+    return None, nodos_explorados
+
+def generar_mapa(num_regiones, vecinos_cercanos=3, semilla=0):
+    """
+    Genera un mapa aleatorio: cada región es un punto del plano unido a sus
+    regiones más cercanas (grafo casi plano, como un mapa real).
+    """
+    generador = random.Random(semilla)
+    puntos = [(generador.random(), generador.random()) for _ in range(num_regiones)]
+    mapa = {r: set() for r in range(num_regiones)}
+    for r, (x, y) in enumerate(puntos):
+        cercanos = sorted(range(num_regiones), key=lambda o: (puntos[o][0] - x) ** 2 + (puntos[o][1] - y) ** 2)
+        for otro in cercanos[1:vecinos_cercanos + 1]:
+            mapa[r].add(otro)
+            mapa[otro].add(r)
+    return {r: sorted(v) for r, v in mapa.items()}
+
 # Ejemplo práctico:
 # Representación de un grafo donde los nodos son ciudades y las aristas indican que son vecinas
 grafo = {
@@ -40,17 +159,38 @@ grafo = {
 # Lista de colores disponibles para colorear las ciudades
 colores_disponibles = ['Rojo', 'Verde', 'Azul']
 
+# Dominios de cada ciudad y registro (trail) de las podas
+dominios = {ciudad: set(colores_disponibles) for ciudad in grafo}
+trail = []
+
 # Asignación inicial de colores (asignamos 'Rojo' a 'Ciudad1')
 asignacion_colores = {'Ciudad1': 'Rojo'}
 
 # Aplicamos el algoritmo de Comprobación Hacia Adelante
-es_valida = comprobacion_hacia_adelante(grafo, colores_disponibles, 'Ciudad1', asignacion_colores)
+es_valida = comprobacion_hacia_adelante(grafo, dominios, 'Ciudad1', asignacion_colores, trail)
 
 # Imprimimos el resultado
 print(f"¿La asignación es válida después de la Comprobación Hacia Adelante? {es_valida}")
+print(f"Dominios tras la poda: {dominios}")
+deshacer_poda(dominios, trail, 0)
+print(f"Dominios tras deshacer la poda: {dominios}")
 
 # Explicación del ejemplo:
 # - 'Ciudad1' tiene asignado el color 'Rojo'.
 # - Los vecinos de 'Ciudad1' son 'Ciudad2' y 'Ciudad3'.
-# - El color 'Rojo' se elimina del dominio de 'Ciudad2' y 'Ciudad3'.
-# - Si el dominio de algún vecino queda vacío, la asignación no es válida.
\ No newline at end of file
+# - El color 'Rojo' se elimina del dominio de 'Ciudad2' y 'Ciudad3' y se apunta en el trail.
+# - Si el dominio de algún vecino queda vacío, la asignación no es válida.
+# - Al retroceder, el trail permite devolver los colores podados sin copiar diccionarios.
+
+# Comparación de rendimiento en mapas aleatorios de cientos de regiones
+for num_regiones in (100, 300, 500, 2000):
+    mapa = generar_mapa(num_regiones)
+    inicio = time.perf_counter()
+    solucion, nodos_fc = colorear_mapa(mapa, ['Rojo', 'Verde', 'Azul', 'Amarillo'])
+    tiempo_fc = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    solucion_base, nodos_base = colorear_mapa_sin_poda(mapa, ['Rojo', 'Verde', 'Azul', 'Amarillo'])
+    tiempo_base = time.perf_counter() - inicio
+    print(f"{num_regiones} regiones | comprobación hacia adelante: {nodos_fc} nodos, {tiempo_fc:.3f} s "
+          f"| sin poda: {nodos_base} nodos, {tiempo_base:.3f} s"
+          f"{'' if solucion_base else ' (límite alcanzado)'}")
@@ -1,10 +1,15 @@
 from collections import deque
+import random  # Para generar CSP binarios aleatorios en la comparación
+import time  # Para medir el tiempo de AC-3
 
 def ac3(grafo, dominios):
     """
     Algoritmo AC-3 para la propagación de restricciones.
     Este algoritmo asegura que los dominios de las variables sean consistentes
-    con las restricciones binarias del grafo.
+    con las restricciones binarias del grafo (en este caso, vecinos con valores distintos).
+
+    Internamente los dominios se representan como conjuntos de bits y la propagación
+    se delega en `propagar_arcos`.
 
     :param grafo: Diccionario que representa el grafo como lista de adyacencia.
                   Ejemplo: {'A': ['B', 'C'], 'B': ['A'], 'C': ['A']}
@@ -12,43 +17,125 @@ def ac3(grafo, dominios):
                      de cada variable. Ejemplo: {'A': ['Rojo', 'Verde'], ...}
     :return: Diccionario con los dominios consistentes o False si no hay solución.
     """
-    # Cola para almacenar las restricciones (pares de nodos conectados)
-    cola = deque()
+    # Numerar todos los valores para poder representar cada dominio como una máscara de bits
+    valores = []
+    indice = {}
+    for dominio in dominios.values():
+        for valor in dominio:
+            if valor not in indice:
+                indice[valor] = len(valores)
+                valores.append(valor)
+    dominios_bits = {x: sum(1 << indice[v] for v in dominios[x]) for x in dominios}
+
+    # Restricción "distinto de" como máscaras de compatibilidad compartidas por todos los arcos
+    todos = (1 << len(valores)) - 1
+    distinto = [todos & ~(1 << a) for a in range(len(valores))]
+    relaciones = {(xi, xj): distinto for xi in grafo for xj in grafo[xi]}
+
+    consistente, _ = propagar_arcos(dominios_bits, grafo, relaciones)
+    if not consistente:
+        return False
+    # Devolver los dominios como listas, conservando el orden original
+    return {x: [v for v in dominios[x] if dominios_bits[x] >> indice[v] & 1] for x in dominios}
 
+def propagar_arcos(dominios_bits, vecinos, relaciones):
+    """
+    Propagación de consistencia de arcos sobre dominios representados como bits.
+
+    La cola de trabajo nunca contiene el mismo arco dos veces (se lleva un conjunto de
+    arcos pendientes). Como cada búsqueda de soporte es una sola operación `&` entre la
+    máscara de compatibilidad del valor y el dominio de la vecina, revisar un arco nunca
+    recorre el dominio de xj valor a valor, que es lo que AC-2001 intenta evitar guardando
+    el último soporte; con bits ese registro no ahorra ninguna comprobación.
+
+    :param dominios_bits: Diccionario variable -> máscara de bits de índices de valores (se modifica).
+    :param vecinos: Diccionario variable -> lista de variables relacionadas.
+    :param relaciones: Diccionario (xi, xj) -> lista R con R[a] la máscara de bits de los valores b
+                       de xj compatibles con el valor a de xi.
+    :return: Tupla (True si los dominios son consistentes y False si alguno queda vacío,
+             número de comprobaciones de restricción realizadas).
+    """
+    cola = deque()
+    pendientes = set()
     # Inicializamos la cola con todas las aristas del grafo
-    for nodo in grafo:
-        for vecino in grafo[nodo]:
-            cola.append((nodo, vecino))
+    for xi in vecinos:
+        for xj in vecinos[xi]:
+            cola.append((xi, xj))
+            pendientes.add((xi, xj))
 
-    # Procesamos las restricciones en la cola
+    comprobaciones = 0
     while cola:
-        (xi, xj) = cola.popleft()  # Extraemos un par de nodos (xi, xj)
-        if revisar(dominios, xi, xj):  # Revisamos si el dominio de xi debe reducirse
-            if not dominios[xi]:  # Si el dominio de xi queda vacío, no hay solución
-                return False
-            # Agregamos a la cola las restricciones relacionadas con xi
-            for xk in grafo[xi]:
-                if xk != xj:  # Evitamos agregar de nuevo la restricción (xi, xj)
+        arco = cola.popleft()
+        pendientes.discard(arco)
+        xi, xj = arco
+        modificado, n = revisar(dominios_bits, xi, xj, relaciones[arco])
+        comprobaciones += n
+        if modificado:
+            if not dominios_bits[xi]:  # Si el dominio de xi queda vacío, no hay solución
+                return False, comprobaciones
+            # Agregamos los arcos que apuntan a xi, salvo los que ya están en la cola
+            for xk in vecinos[xi]:
+                if xk != xj and (xk, xi) not in pendientes:
                     cola.append((xk, xi))
-    return dominios
+                    pendientes.add((xk, xi))
+    return True, comprobaciones
 
-def revisar(dominios, xi, xj):
+def revisar(dominios_bits, xi, xj, relacion):
     """
-    Revisa si el dominio de xi necesita ser reducido debido a las restricciones
-    con xj. En este caso, la restricción es que xi y xj no pueden tener el mismo valor.
+    Revisa si el dominio de xi necesita ser reducido debido a las restricciones con xj.
+    Un valor a tiene soporte si `relacion[a] & dominio_j` no es cero, así que cada
+    comprobación es una sola operación sobre enteros; si no lo tiene, se borra su bit.
 
-    :param dominios: Diccionario con los dominios de las variables.
+    :param dominios_bits: Diccionario con los dominios como máscaras de bits.
     :param xi: Variable actual que estamos revisando.
     :param xj: Variable vecina que impone restricciones sobre xi.
-    :return: True si el dominio de xi fue modificado, False en caso contrario.
+    :param relacion: Lista con, para cada valor a de xi, la máscara de bits de los valores de xj compatibles.
+    :return: Tupla (True si el dominio de xi fue modificado, comprobaciones realizadas).
+    """
+    dominio_j = dominios_bits[xj]
+    nuevo_dominio = dominio_i = dominios_bits[xi]
+    comprobaciones = 0
+    for a in indices_bits(dominio_i):
+        comprobaciones += 1
+        # Cualquier valor compatible que siga en el dominio de xj sirve de soporte
+        if not relacion[a] & dominio_j:
+            nuevo_dominio &= ~(1 << a)  # Eliminamos el valor de xi
+    dominios_bits[xi] = nuevo_dominio
+    return nuevo_dominio != dominio_i, comprobaciones
+
+def indices_bits(mascara):
+    """
+    Genera los índices de los bits activos de una máscara, de menor a mayor.
     """
-    modificado = False
-    for valor in dominios[xi].copy():  # Iteramos sobre una copia del dominio de xi
-        # Si no hay ningún valor en el dominio de xj que sea diferente al valor actual de xi
-        if all(valor == v for v in dominios[xj]):
-            dominios[xi].remove(valor)  # Eliminamos el valor de xi
-            modificado = True
-    return modificado
+    while mascara:
+        bit = mascara & -mascara
+        yield bit.bit_length() - 1
+        mascara ^= bit
+
+def generar_csp_aleatorio(num_variables, tamano_dominio, densidad, dureza, semilla=0):
+    """
+    Genera un CSP binario aleatorio (modelo B): cada par de variables está restringido
+    con probabilidad `densidad`, y cada restricción prohíbe una fracción `dureza` de
+    los pares de valores.
+    """
+    generador = random.Random(semilla)
+    vecinos = {x: [] for x in range(num_variables)}
+    relaciones = {}
+    pares = [(a, b) for a in range(tamano_dominio) for b in range(tamano_dominio)]
+    for xi in range(num_variables):
+        for xj in range(xi + 1, num_variables):
+            if generador.random() < densidad:
+                relacion = [[True] * tamano_dominio for _ in range(tamano_dominio)]
+                for a, b in generador.sample(pares, int(dureza * len(pares))):
+                    relacion[a][b] = False
+                relaciones[(xi, xj)] = [sum(1 << b for b, compatible in enumerate(fila) if compatible)
+                                        for fila in relacion]
+                relaciones[(xj, xi)] = [sum(1 << a for a, compatible in enumerate(columna) if compatible)
+                                        for columna in zip(*relacion)]
+                vecinos[xi].append(xj)
+                vecinos[xj].append(xi)
+    dominios_bits = {x: (1 << tamano_dominio) - 1 for x in range(num_variables)}
+    return dominios_bits, vecinos, relaciones
 
 # Ejemplo práctico: Coloreado de mapas
 # Grafo que representa las conexiones entre regiones de un mapa
@@ -80,4 +167,15 @@ if resultado:
     for region, colores in resultado.items():
         print(f"{region}: {colores}")
 else:
-    print("No hay solución posible para el problema.")
\ No newline at end of file
+    print("No hay solución posible para el problema.")
+
+# AC-3 con bits en CSP binarios aleatorios con dominios grandes
+for tamano_dominio, dureza in ((50, 0.9), (100, 0.95), (200, 0.97)):
+    dominios_aleatorios, vecinos_aleatorios, relaciones_aleatorias = generar_csp_aleatorio(30, tamano_dominio, 0.3, dureza)
+    copia = dict(dominios_aleatorios)
+    inicio = time.perf_counter()
+    consistente, comprobaciones = propagar_arcos(copia, vecinos_aleatorios, relaciones_aleatorias)
+    duracion = time.perf_counter() - inicio
+    valores_restantes = sum(bin(m).count('1') for m in copia.values())
+    print(f"d={tamano_dominio}, dureza={dureza} | ac3: {comprobaciones} comprobaciones, "
+          f"{duracion:.3f} s, consistente={consistente}, valores restantes={valores_restantes}")
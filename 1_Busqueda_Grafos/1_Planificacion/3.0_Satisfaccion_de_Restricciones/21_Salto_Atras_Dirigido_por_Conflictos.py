@@ -1,92 +1,226 @@
-def salto_atras_dirigido_por_conflictos(csp, asignacion={}):
+import random  # Para generar problemas de coloreo aleatorios
+import time  # Para medir el tiempo de resolución
+
+def salto_atras_dirigido_por_conflictos(csp, asignacion=None, estadisticas=None):
     """
     Algoritmo de Salto Atrás Dirigido por Conflictos (CBJ) para resolver problemas de satisfacción de restricciones (CSP).
+    Cada variable mantiene su conjunto de conflicto (las variables anteriores que explican el fallo de sus
+    valores). Cuando una variable agota sus valores, se salta directamente a la variable más profunda de
+    ese conjunto, sin pasar por los niveles intermedios, y el conjunto se guarda como nogood aprendido para
+    no volver a explorar el mismo fallo.
+
     :param csp: Diccionario que contiene:
         - variables: Lista de variables.
         - dominios: Diccionario de dominios {variable: [valores]}.
-        - restricciones: Función que retorna True si se cumplen las restricciones.
-    :param asignacion: Asignación actual {variable: valor}.
+        - vecinos: Grafo de restricciones {variable: [variables relacionadas]}.
+        - restriccion: Función binaria (x, valor_x, y, valor_y) que retorna True si se cumple la restricción.
+    :param asignacion: Asignación inicial {variable: valor}.
+    :param estadisticas: Diccionario opcional donde se acumulan nodos, saltos y nogoods aprendidos.
     :return: Asignación solución o None si no hay solución.
     """
-    # Si todas las variables están asignadas, se encontró una solución
-    if len(asignacion) == len(csp["variables"]):
-        return asignacion
-
-    # Seleccionar la siguiente variable sin asignar usando la heurística MRV
-    variable = seleccionar_variable_sin_asignar(csp, asignacion)
-
-    # Probar cada valor del dominio de la variable en orden LCV
-    for valor in ordenar_valores_dominio(csp, variable, asignacion):
-        # Verificar si el valor es consistente con las restricciones
-        if es_consistente(csp, variable, valor, asignacion):
-            # Asignar temporalmente el valor a la variable
-            asignacion[variable] = valor
+    asignacion = dict(asignacion or {})
+    if estadisticas is None:
+        estadisticas = {}
+    estadisticas.update(nodos=0, saltos=0, nogoods=0)
+    almacen = AlmacenNogoods()
+    orden = {v: i for i, v in enumerate(asignacion)}  # Profundidad de cada variable asignada
+    conteos = ConteosIncrementales(csp)
+    for v, valor in asignacion.items():
+        conteos.asignar(v, valor)
+
+    def cbj():
+        # Si todas las variables están asignadas, se encontró una solución
+        if len(asignacion) == len(csp["variables"]):
+            return True, set()
 
-            # Llamada recursiva para intentar resolver con la nueva asignación
-            resultado = salto_atras_dirigido_por_conflictos(csp, asignacion)
-            if resultado is not None:
-                return resultado  # Solución encontrada
+        # Seleccionar la siguiente variable sin asignar usando la heurística MRV
+        variable = seleccionar_variable_sin_asignar(csp, asignacion, conteos)
+        conflicto = set()  # Conjunto de conflicto de la variable
 
-            # Si no se encontró solución, deshacer la asignación
+        # Probar cada valor del dominio de la variable en orden LCV
+        for valor in ordenar_valores_dominio(csp, variable, asignacion, conteos):
+            estadisticas["nodos"] += 1
+            # Culpables del fallo: un vecino incompatible o las variables de un nogood violado
+            culpables = encontrar_conflicto(csp, variable, valor, asignacion, orden)
+            if culpables is None:
+                culpables = almacen.violado(variable, valor, asignacion)
+            if culpables is not None:
+                conflicto |= culpables
+                continue
+
+            # Asignar el valor a la variable y continuar
+            asignacion[variable] = valor
+            orden[variable] = len(orden)
+            marca = conteos.asignar(variable, valor)
+            exito, conflicto_hijo = cbj()
+            if exito:
+                return True, set()
+            conteos.deshacer(marca)
             del asignacion[variable]
-        else:
-            # Encontrar la variable en conflicto
-            variable_conflicto = encontrar_conflicto(csp, variable, valor, asignacion)
-            if variable_conflicto != variable:
-                return None  # Saltar al nivel del conflicto
-    return None  # No se encontró solución
+            del orden[variable]
+
+            if variable not in conflicto_hijo:
+                # La variable no es responsable del fallo: se salta por encima de ella
+                estadisticas["saltos"] += 1
+                return False, conflicto_hijo
+            conflicto |= conflicto_hijo - {variable}
+
+        # Todos los valores fallaron: el conjunto de conflicto es un nogood
+        if almacen.aprender({(v, asignacion[v]) for v in conflicto}):
+            estadisticas["nogoods"] += 1
+        return False, conflicto
+
+    exito, _ = cbj()
+    return asignacion if exito else None
+
+class AlmacenNogoods:
+    """
+    Almacén de nogoods aprendidos (combinaciones de asignaciones que no pueden
+    extenderse a una solución). Cada nogood se indexa por cada uno de sus pares
+    (variable, valor), de modo que al probar un valor solo se revisan los nogoods
+    que lo contienen.
+    """
+    def __init__(self, tamano_maximo=12):
+        self.tamano_maximo = tamano_maximo  # Los nogoods más grandes rara vez se repiten
+        self.indice = {}  # (variable, valor) -> lista de nogoods (frozensets de pares)
+        self.conocidos = set()
+
+    def aprender(self, pares):
+        """
+        Registra un nogood. Devuelve True si es nuevo y se ha guardado.
+        """
+        nogood = frozenset(pares)
+        if not nogood or len(nogood) > self.tamano_maximo or nogood in self.conocidos:
+            return False
+        self.conocidos.add(nogood)
+        for par in nogood:
+            self.indice.setdefault(par, []).append(nogood)
+        return True
+
+    def violado(self, variable, valor, asignacion):
+        """
+        Si asignar `valor` a `variable` completa algún nogood, devuelve las demás variables
+        de ese nogood (los culpables); si no, devuelve None.
+        """
+        for nogood in self.indice.get((variable, valor), ()):
+            if all(v == variable or (v in asignacion and asignacion[v] == a) for v, a in nogood):
+                return {v for v, _ in nogood if v != variable}
+        return None
+
+class ConteosIncrementales:
+    """
+    Recuentos de valores compatibles mantenidos de forma incremental. Para cada variable y
+    valor se guarda cuántos vecinos asignados lo descartan, y para cada variable cuántos de
+    sus valores no descarta ninguno (sus valores restantes). Al asignar solo se recorren las
+    aristas de la variable; los cambios se registran en una pila (trail) y se deshacen al
+    retroceder, como en la búsqueda con retroceso de 17_Problemas_CSP.py.
+    """
+    def __init__(self, csp):
+        self.csp = csp
+        self.descartes = {v: dict.fromkeys(csp["dominios"][v], 0) for v in csp["variables"]}
+        self.restantes = {v: len(csp["dominios"][v]) for v in csp["variables"]}
+        self.trail = []  # Pares (vecino, valor) cuyo recuento de descartes se incrementó
+
+    def asignar(self, variable, valor):
+        """
+        Descarta en los vecinos los valores incompatibles con variable=valor.
+        Devuelve la marca del trail para deshacer.
+        """
+        marca = len(self.trail)
+        restriccion = self.csp["restriccion"]
+        for vecino in obtener_vecinos(self.csp, variable):
+            descartes = self.descartes[vecino]
+            for valor_vecino, veces in descartes.items():
+                if not restriccion(variable, valor, vecino, valor_vecino):
+                    descartes[valor_vecino] = veces + 1
+                    if veces == 0:
+                        self.restantes[vecino] -= 1
+                    self.trail.append((vecino, valor_vecino))
+        return marca
+
+    def deshacer(self, marca):
+        """
+        Revierte todos los cambios registrados en el trail desde la marca indicada.
+        """
+        trail = self.trail
+        while len(trail) > marca:
+            vecino, valor_vecino = trail.pop()
+            descartes = self.descartes[vecino]
+            descartes[valor_vecino] -= 1
+            if descartes[valor_vecino] == 0:
+                self.restantes[vecino] += 1
 
 # Funciones auxiliares:
-def seleccionar_variable_sin_asignar(csp, asignacion):
-    """Selecciona la próxima variable sin asignar usando la heurística MRV (Menor Restricción de Valores)."""
+def seleccionar_variable_sin_asignar(csp, asignacion, conteos):
+    """
+    Selecciona la próxima variable sin asignar usando la heurística MRV (Menor Restricción de Valores):
+    la de menos valores compatibles con sus vecinos asignados y, en caso de empate, la de más vecinos.
+    Los valores restantes se leen de los recuentos incrementales, sin revisar restricciones.
+    """
     sin_asignar = [v for v in csp["variables"] if v not in asignacion]
-    return min(sin_asignar, key=lambda v: len(csp["dominios"][v]))
+    return min(sin_asignar, key=lambda v: (conteos.restantes[v], -len(obtener_vecinos(csp, v))))
 
-def ordenar_valores_dominio(csp, variable, asignacion):
+def ordenar_valores_dominio(csp, variable, asignacion, conteos):
     """Ordena los valores del dominio de la variable usando la heurística LCV (Menor Conflicto)."""
-    return sorted(csp["dominios"][variable], key=lambda val: contar_conflictos(csp, variable, val, asignacion))
+    return sorted(csp["dominios"][variable],
+                  key=lambda val: contar_conflictos(csp, variable, val, asignacion, conteos))
 
 def es_consistente(csp, variable, valor, asignacion):
-    """Verifica si asignar 'valor' a 'variable' es consistente con las restricciones."""
-    asignacion[variable] = valor  # Asignación temporal
-    consistente = csp["restricciones"](asignacion)
-    del asignacion[variable]  # Deshacer asignación temporal
-    return consistente
+    """Verifica si asignar 'valor' a 'variable' es consistente con sus vecinos asignados."""
+    return all(csp["restriccion"](variable, valor, u, asignacion[u])
+               for u in obtener_vecinos(csp, variable) if u in asignacion)
 
-def encontrar_conflicto(csp, variable, valor, asignacion):
+def encontrar_conflicto(csp, variable, valor, asignacion, orden):
     """
-    Encuentra la variable más reciente en el conflicto.
-    :return: Variable en conflicto o 'variable' si no hay conflicto previo.
+    Encuentra el vecino asignado que entra en conflicto con 'valor', revisando solo el grafo de restricciones.
+    Entre varios culpables se elige el menos profundo, lo que permite saltos más largos.
+    :return: Conjunto con la variable en conflicto, o None si el valor es consistente.
     """
-    asignacion[variable] = valor  # Asignación temporal
-    for v in reversed(list(asignacion.keys())):  # De más reciente a más antigua
-        if v == variable:
-            continue
-        asignacion_temporal = asignacion.copy()
-        del asignacion_temporal[variable]
-        if not csp["restricciones"](asignacion_temporal):
-            del asignacion[variable]
-            return v
-    del asignacion[variable]
-    return variable
+    culpable = None
+    for u in obtener_vecinos(csp, variable):
+        if u in asignacion and not csp["restriccion"](variable, valor, u, asignacion[u]):
+            if culpable is None or orden[u] < orden[culpable]:
+                culpable = u
+    return None if culpable is None else {culpable}
 
-def contar_conflictos(csp, variable, valor, asignacion):
-    """Cuenta los conflictos potenciales para la heurística LCV."""
-    asignacion[variable] = valor
+def contar_conflictos(csp, variable, valor, asignacion, conteos):
+    """
+    Cuenta los conflictos potenciales para la heurística LCV: valores restantes de los vecinos sin
+    asignar que quedarían descartados. Solo se revisan las aristas de la variable en el grafo de
+    restricciones, y los valores ya descartados por otras asignaciones no se cuentan.
+    """
     conflictos = 0
     for vecino in obtener_vecinos(csp, variable):
         if vecino not in asignacion:
-            for valor_vecino in csp["dominios"][vecino]:
-                asignacion[vecino] = valor_vecino
-                if not csp["restricciones"](asignacion):
+            for valor_vecino, veces in conteos.descartes[vecino].items():
+                if veces == 0 and not csp["restriccion"](variable, valor, vecino, valor_vecino):
                     conflictos += 1
-                del asignacion[vecino]
-    del asignacion[variable]
     return conflictos
 
 def obtener_vecinos(csp, variable):
-    """Retorna las variables relacionadas por restricciones (simulado)."""
-    return [v for v in csp["variables"] if v != variable]
+    """Retorna las variables relacionadas por restricciones según el grafo de restricciones del CSP."""
+    return csp["vecinos"][variable]
+
+def generar_coloreo(num_regiones, num_colores, grado_medio, semilla=0):
+    """
+    Genera un CSP de coloreo aleatorio con solución garantizada (coloración oculta).
+    """
+    generador = random.Random(semilla)
+    oculto = [generador.randrange(num_colores) for _ in range(num_regiones)]
+    vecinos = {r: set() for r in range(num_regiones)}
+    aristas = 0
+    while aristas < num_regiones * grado_medio // 2:
+        a, b = generador.randrange(num_regiones), generador.randrange(num_regiones)
+        if oculto[a] != oculto[b] and b not in vecinos[a]:
+            vecinos[a].add(b)
+            vecinos[b].add(a)
+            aristas += 1
+    return {
+        "variables": list(range(num_regiones)),
+        "dominios": {r: list(range(num_colores)) for r in range(num_regiones)},
+        "vecinos": {r: sorted(v) for r, v in vecinos.items()},
+        "restriccion": lambda x, valor_x, y, valor_y: valor_x != valor_y,
+    }
 
 # Ejemplo práctico:
 # Problema de coloreo de mapas: asignar colores a regiones adyacentes sin que compartan el mismo color
@@ -100,14 +234,29 @@ csp = {
         "NSW": ["Rojo", "Verde", "Azul"],
         "V": ["Rojo", "Verde", "Azul"]
     },
-    "restricciones": lambda asignacion: all(
-        asignacion.get(u) != asignacion.get(v)
-        for u in asignacion
-        for v in asignacion
-        if v in obtener_vecinos(csp, u)
-    )
+    # Grafo de restricciones: regiones que comparten frontera
+    "vecinos": {
+        "WA": ["NT", "SA"],
+        "NT": ["WA", "SA", "Q"],
+        "SA": ["WA", "NT", "Q", "NSW", "V"],
+        "Q": ["NT", "SA", "NSW"],
+        "NSW": ["Q", "SA", "V"],
+        "V": ["SA", "NSW"]
+    },
+    "restriccion": lambda x, valor_x, y, valor_y: valor_x != valor_y
 }
 
 # Resolver el CSP usando el algoritmo de Salto Atrás Dirigido por Conflictos
 solucion = salto_atras_dirigido_por_conflictos(csp)
-print("Solución encontrada:", solucion)
\ No newline at end of file
+print("Solución encontrada:", solucion)
+
+# Coloreo aleatorio más grande: se muestran los saltos y nogoods aprendidos
+csp_grande = generar_coloreo(200, 3, 5)
+estadisticas = {}
+inicio = time.perf_counter()
+solucion_grande = salto_atras_dirigido_por_conflictos(csp_grande, estadisticas=estadisticas)
+duracion = time.perf_counter() - inicio
+valida = solucion_grande is not None and all(
+    es_consistente(csp_grande, v, solucion_grande[v], solucion_grande) for v in csp_grande["variables"])
+print(f"Coloreo de 200 regiones en {duracion:.3f} s (válido: {valida}): {estadisticas['nodos']} nodos, "
+      f"{estadisticas['saltos']} saltos, {estadisticas['nogoods']} nogoods aprendidos")
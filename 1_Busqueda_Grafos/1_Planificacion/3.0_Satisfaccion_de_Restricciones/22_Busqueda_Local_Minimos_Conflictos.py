@@ -1,4 +1,7 @@
 import random
+import time
+
+import numpy as np
 
 def minimos_conflictos(tamano_tablero, max_pasos=1000):
     """
@@ -103,6 +106,147 @@ def contar_conflictos(asignacion, columna, fila, tamano_tablero):
             conflictos += 1
     return conflictos
 
+def minimos_conflictos_incremental(tamano_tablero, max_pasos=None, max_reinicios=10, semilla=None, prob_paseo=0.1):
+    """
+    Mínimos-Conflictos incremental para N-Reinas muy grandes (n = 1 000 000 en segundos).
+
+    Las reinas se mantienen como una permutación (fila de cada columna), de modo que
+    nunca comparten fila, y los movimientos son intercambios de filas entre dos columnas.
+    La ocupación de cada diagonal y antidiagonal se guarda en arrays de NumPy junto con la
+    suma de las columnas que la ocupan: así, cuando una diagonal pasa de 1 a 2 reinas, se
+    sabe en O(1) qué reina quedó en conflicto. Cada movimiento actualiza los contadores y el
+    conjunto de columnas conflictivas en O(1); la evaluación completa solo se hace al verificar.
+    Si ninguno de los intercambios probados reduce las colisiones, con probabilidad
+    prob_paseo se hace un intercambio al azar (paso de paseo aleatorio) para salir del
+    mínimo local, algo frecuente en tableros pequeños.
+
+    :param tamano_tablero: Tamaño del tablero (n x n).
+    :param max_pasos: Intentos de intercambio por reinicio (por defecto, max(2·n, 10 000)).
+    :param max_reinicios: Número máximo de reinicios desde una nueva configuración inicial.
+    :param semilla: Semilla para reproducir la búsqueda.
+    :param prob_paseo: Probabilidad de dar un paso aleatorio cuando no se encuentra ninguna mejora.
+    :return: Array de NumPy con la fila de cada columna, o None si no se encuentra solución.
+    """
+    n = tamano_tablero
+    if max_pasos is None:
+        max_pasos = max(2 * n, 10_000)
+    generador_np = np.random.default_rng(semilla)
+    generador = random.Random(semilla)
+    aleatorio = generador.random
+
+    for _ in range(max_reinicios + 1):
+        filas_np = generador_np.permutation(n).astype(np.int64)
+        diagonales_np = np.zeros(2 * n - 1, dtype=np.int64)      # Reinas por diagonal (columna - fila)
+        antidiagonales_np = np.zeros(2 * n - 1, dtype=np.int64)  # Reinas por antidiagonal (columna + fila)
+        suma_diag_np = np.zeros(2 * n - 1, dtype=np.int64)       # Suma de columnas en cada diagonal
+        suma_anti_np = np.zeros(2 * n - 1, dtype=np.int64)       # Suma de columnas en cada antidiagonal
+        # Las vistas de memoria permiten leer y escribir los arrays elemento a elemento sin crear
+        # escalares de NumPy, lo que hace los bucles de Python varias veces más rápidos
+        filas, diagonales, antidiagonales = memoryview(filas_np), memoryview(diagonales_np), memoryview(antidiagonales_np)
+        suma_diag, suma_anti = memoryview(suma_diag_np), memoryview(suma_anti_np)
+        conflictivas = []  # Columnas posiblemente en conflicto (se verifican al extraerlas)
+        colisiones = 0  # Pares de reinas excedentes en diagonales; 0 = solución
+
+        def poner(columna, fila):
+            nonlocal colisiones
+            d, a = columna - fila + n - 1, columna + fila
+            k = diagonales[d]
+            if k:
+                colisiones += 1
+                conflictivas.append(columna)
+                if k == 1:
+                    conflictivas.append(suma_diag[d])  # La reina que estaba sola pasa a estar en conflicto
+            diagonales[d] = k + 1
+            suma_diag[d] += columna
+            k = antidiagonales[a]
+            if k:
+                colisiones += 1
+                conflictivas.append(columna)
+                if k == 1:
+                    conflictivas.append(suma_anti[a])
+            antidiagonales[a] = k + 1
+            suma_anti[a] += columna
+
+        def quitar(columna, fila):
+            nonlocal colisiones
+            d, a = columna - fila + n - 1, columna + fila
+            diagonales[d] -= 1
+            suma_diag[d] -= columna
+            if diagonales[d]:
+                colisiones -= 1
+            antidiagonales[a] -= 1
+            suma_anti[a] -= columna
+            if antidiagonales[a]:
+                colisiones -= 1
+
+        # Inicialización voraz: cada columna toma, entre las filas aún libres, una cuyas
+        # diagonales estén vacías (con un número limitado de intentos)
+        for columna in range(n):
+            for _ in range(20):
+                j = columna + int(aleatorio() * (n - columna))
+                fila = filas[j]
+                if diagonales[columna - fila + n - 1] == 0 and antidiagonales[columna + fila] == 0:
+                    break
+            filas[columna], filas[j] = filas[j], filas[columna]
+            poner(columna, filas[columna])
+
+        # Reparación: se intercambia una reina conflictiva con otra columna al azar solo si
+        # el intercambio reduce las colisiones; si no se encuentra ninguno, a veces paseo aleatorio
+        pasos = 0
+        while colisiones and conflictivas and pasos < max_pasos:
+            columna = conflictivas.pop()
+            fila = filas[columna]
+            if diagonales[columna - fila + n - 1] <= 1 and antidiagonales[columna + fila] <= 1:
+                continue  # Entrada obsoleta: ya no está en conflicto
+            antes = colisiones
+            for _ in range(50):
+                pasos += 1
+                j = int(aleatorio() * n)
+                fila_j = filas[j]
+                # Descartar sin modificar nada si la nueva casilla de la reina ya está atacada
+                if j == columna or diagonales[columna - fila_j + n - 1] or antidiagonales[columna + fila_j]:
+                    continue
+                quitar(columna, fila)
+                quitar(j, fila_j)
+                poner(columna, fila_j)
+                poner(j, fila)
+                if colisiones < antes:
+                    filas[columna], filas[j] = fila_j, fila
+                    break
+                # El intercambio no mejora: se deshace
+                quitar(columna, fila_j)
+                quitar(j, fila)
+                poner(columna, fila)
+                poner(j, fila_j)
+            else:
+                if aleatorio() >= prob_paseo:
+                    conflictivas.append(columna)
+                    continue
+                # Paso de paseo aleatorio: intercambio con cualquier otra columna. poner()
+                # vuelve a apuntar las columnas que queden en conflicto
+                j = int(aleatorio() * (n - 1))
+                j += j >= columna
+                fila_j = filas[j]
+                quitar(columna, fila)
+                quitar(j, fila_j)
+                poner(columna, fila_j)
+                poner(j, fila)
+                filas[columna], filas[j] = fila_j, fila
+                pasos += 1
+
+        if colisiones == 0 and es_solucion(filas_np):
+            return filas_np
+    return None
+
+def es_solucion(filas):
+    """
+    Verificación vectorizada: ninguna fila, diagonal ni antidiagonal se repite.
+    """
+    n = len(filas)
+    columnas = np.arange(n)
+    return all(np.bincount(v, minlength=1).max(initial=0) <= 1
+               for v in (filas, columnas - filas + n - 1, columnas + filas))
+
 # Ejemplo práctico:
 tamano_tablero = 8  # Tablero 8x8 (problema de las 8 reinas)
 solucion = minimos_conflictos(tamano_tablero)
@@ -112,4 +256,18 @@ if solucion:
     for columna, fila in enumerate(solucion):
         print(f"Columna {columna}: Fila {fila}")
 else:
-    print("No se encontró solución en el número máximo de pasos.")
\ No newline at end of file
+    print("No se encontró solución en el número máximo de pasos.")
+
+# Mínimos-Conflictos incremental en tableros pequeños y medianos con 20 semillas distintas
+for n in (8, 10, 20, 50, 100, 200):
+    resueltos = sum(es_solucion(solucion) for solucion in
+                    (minimos_conflictos_incremental(n, semilla=semilla) for semilla in range(20))
+                    if solucion is not None)
+    print(f"{n}-Reinas: {resueltos}/20 semillas resueltas")
+
+# Mínimos-Conflictos incremental en tableros muy grandes
+for n in (1000, 100000, 1000000):
+    inicio = time.perf_counter()
+    solucion_grande = minimos_conflictos_incremental(n, semilla=0)
+    print(f"{n}-Reinas resuelto en {time.perf_counter() - inicio:.2f} s "
+          f"(solución válida: {solucion_grande is not None and es_solucion(solucion_grande)})")
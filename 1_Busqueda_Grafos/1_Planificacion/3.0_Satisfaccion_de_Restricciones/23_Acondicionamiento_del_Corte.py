@@ -1,43 +1,269 @@
-def acondicionamiento_corte(numeros, objetivo, subconjunto_actual=[], indice=0, suma_actual=0):
+import itertools  # Para recorrer las asignaciones del corte
+import random  # Para generar instancias grandes en el ejemplo
+import time  # Para medir el tiempo de resolución
+from collections import deque
+
+def acondicionamiento_corte(numeros, objetivo):
     """
     Encuentra subconjuntos de una lista de números que sumen un valor objetivo utilizando el acondicionamiento del corte.
-    
-    :param numeros: Lista de números enteros.
+
+    :param numeros: Lista de números enteros no negativos.
     :param objetivo: Valor objetivo que se desea alcanzar con la suma de un subconjunto.
-    :param subconjunto_actual: Subconjunto que se está construyendo actualmente.
-    :param indice: Índice actual en la lista de números.
-    :param suma_actual: Suma parcial del subconjunto actual.
     :return: Imprime los subconjuntos válidos que cumplen con la condición.
     """
-    # Si la suma actual es igual al objetivo, se encontró un subconjunto válido
-    if suma_actual == objetivo:
-        print(subconjunto_actual)  # Imprime el subconjunto encontrado
+    for subconjunto in generar_subconjuntos(numeros, objetivo):
+        print(subconjunto)  # Imprime el subconjunto encontrado
+
+def existe_subconjunto(numeros, objetivo):
+    """
+    Versión de decisión del problema de la suma de subconjuntos mediante programación
+    dinámica sobre un entero grande usado como conjunto de bits: el bit s está activo
+    si alguna combinación de los números vistos suma s. Añadir un número x es un
+    desplazamiento y un OR, de modo que cada paso procesa todas las sumas a la vez.
+
+    :param numeros: Lista de números enteros no negativos.
+    :param objetivo: Valor objetivo.
+    :return: True si existe un subconjunto que suma exactamente el objetivo.
+    """
+    if objetivo < 0:
+        return False
+    mascara = (1 << (objetivo + 1)) - 1  # Solo interesan las sumas hasta el objetivo
+    alcanzables = 1  # Con el subconjunto vacío se alcanza la suma 0
+    for x in numeros:
+        alcanzables |= (alcanzables << x) & mascara
+        if alcanzables >> objetivo & 1:
+            return True
+    return bool(alcanzables >> objetivo & 1)
+
+def generar_subconjuntos(numeros, objetivo, memoria_max=64 * 2 ** 20):
+    """
+    Generador que recorre todos los subconjuntos que suman el objetivo, uno a uno, sin
+    guardarlos en memoria. La búsqueda es iterativa (no depende del límite de recursión)
+    y usa un único camino que se amplía y recorta, sin copiar listas en cada llamada.
+
+    Cortes:
+    - Sumas de sufijos precalculadas: si lo que falta es negativo o mayor que la suma
+      de los números restantes, la rama se descarta en O(1).
+    - Si caben en `memoria_max` bytes, conjuntos de bits de sumas alcanzables por cada
+      sufijo: solo se entra en ramas que tienen al menos una solución.
+
+    :param numeros: Lista de números enteros no negativos.
+    :param objetivo: Valor objetivo.
+    :param memoria_max: Memoria máxima (en bytes) para los conjuntos de bits de los sufijos.
+    :return: Genera listas con los números de cada subconjunto válido.
+    """
+    n = len(numeros)
+    sufijo = [0] * (n + 1)  # sufijo[i] = suma de numeros[i:]
+    for i in range(n - 1, -1, -1):
+        sufijo[i] = sufijo[i + 1] + numeros[i]
+
+    alcanzable = None
+    if objetivo >= 0 and (n + 1) * (objetivo + 1) // 8 <= memoria_max:
+        mascara = (1 << (objetivo + 1)) - 1
+        alcanzable = [0] * (n + 1)  # alcanzable[i]: sumas alcanzables con numeros[i:]
+        alcanzable[n] = 1
+        for i in range(n - 1, -1, -1):
+            alcanzable[i] = alcanzable[i + 1] | ((alcanzable[i + 1] << numeros[i]) & mascara)
+
+    def viable(i, resto):
+        # ¿Puede completarse la suma `resto` con los números a partir de `i`?
+        if resto < 0 or resto > sufijo[i]:
+            return False
+        return alcanzable is None or alcanzable[i] >> resto & 1
+
+    if not viable(0, objetivo):
         return
-    
-    # Si se han recorrido todos los números o la suma actual supera el objetivo, se detiene la búsqueda en esta rama
-    if indice >= len(numeros) or suma_actual > objetivo:
-        return  # Corte: no hay solución en esta rama
-    
-    # Incluir el número actual en el subconjunto
-    # Se llama recursivamente con el número actual incluido
-    acondicionamiento_corte(
-        numeros, 
-        objetivo, 
-        subconjunto_actual + [numeros[indice]],  # Agregar el número actual al subconjunto
-        indice + 1,  # Avanzar al siguiente índice
-        suma_actual + numeros[indice]  # Actualizar la suma parcial
-    )
-    
-    # Excluir el número actual del subconjunto
-    # Solo se explora esta rama si la suma de los números restantes es suficiente para alcanzar el objetivo
-    if suma_actual + sum(numeros[indice + 1:]) >= objetivo:  # Corte: si la suma restante es suficiente
-        acondicionamiento_corte(
-            numeros, 
-            objetivo, 
-            subconjunto_actual,  # No se agrega el número actual
-            indice + 1,  # Avanzar al siguiente índice
-            suma_actual  # La suma parcial no cambia
-        )
+    camino = []
+    pila = [[0, objetivo, False]]  # (índice, resto, ¿se incluyó numeros[índice]?)
+    while pila:
+        marco = pila[-1]
+        i, resto, incluido = marco
+        if i == n:
+            # Solo se llega al final por ramas viables, así que el resto es 0
+            yield list(camino)
+            pila.pop()
+            continue
+        if incluido is None:
+            pila.pop()  # Ambas ramas exploradas
+            continue
+        if incluido:
+            # Volvemos de la rama que incluía el número: se quita y se prueba a excluirlo
+            camino.pop()
+        elif viable(i + 1, resto - numeros[i]):
+            # Incluir el número actual
+            marco[2] = True
+            camino.append(numeros[i])
+            pila.append([i + 1, resto - numeros[i], False])
+            continue
+        # Excluir el número actual
+        marco[2] = None
+        if viable(i + 1, resto):
+            pila.append([i + 1, resto, False])
+
+# Acondicionamiento del corte de ciclos para CSP binarios
+# Si se eliminan del grafo de restricciones las variables de un corte de ciclos,
+# lo que queda es un bosque, y un CSP con forma de árbol se resuelve en O(n·d²)
+# con consistencia de arcos direccional. Basta recorrer las asignaciones del corte
+# (d^c como mucho) y resolver el árbol restante para cada una.
+# El CSP se describe como en los demás módulos: un diccionario con "variables",
+# "dominios", "vecinos" (grafo de restricciones) y "restriccion" binaria
+# (x, valor_x, y, valor_y) -> bool.
+
+def encontrar_corte_ciclos(vecinos):
+    """
+    Busca un corte de ciclos pequeño de forma voraz: se eliminan repetidamente las
+    variables de grado 0 o 1 (no pueden estar en un ciclo) y, si aún queda grafo,
+    se pasa al corte la variable de mayor grado.
+
+    :param vecinos: Grafo de restricciones {variable: [vecinos]}.
+    :return: Lista de variables del corte.
+    """
+    grados = {v: len(set(vs)) for v, vs in vecinos.items()}
+    adyacencia = {v: set(vs) for v, vs in vecinos.items()}
+    restantes = set(vecinos)
+    hojas = deque(v for v in restantes if grados[v] <= 1)
+    corte = []
+
+    def eliminar(v):
+        restantes.discard(v)
+        for u in adyacencia[v]:
+            if u in restantes:
+                grados[u] -= 1
+                if grados[u] == 1:
+                    hojas.append(u)
+
+    while restantes:
+        while hojas:
+            v = hojas.popleft()
+            if v in restantes:
+                eliminar(v)
+        if restantes:
+            v = max(restantes, key=lambda u: grados[u])
+            corte.append(v)
+            eliminar(v)
+            hojas.extend(u for u in restantes if grados[u] <= 1)
+    return corte
+
+def ordenar_bosque(vecinos, variables):
+    """
+    Recorre en anchura cada árbol del bosque formado por `variables`.
+
+    :return: Tupla (orden de las variables, padre de cada variable o None si es raíz).
+    """
+    padre = {}
+    orden = []
+    for raiz in variables:
+        if raiz in padre:
+            continue
+        padre[raiz] = None
+        cola = deque([raiz])
+        while cola:
+            v = cola.popleft()
+            orden.append(v)
+            for u in vecinos[v]:
+                if u in variables and u not in padre:
+                    padre[u] = v
+                    cola.append(u)
+    return orden, padre
+
+def resolver_csp_arbol(csp, variables, dominios, orden_bosque=None):
+    """
+    Resuelve un CSP cuyo grafo (restringido a `variables`) es un bosque, en O(n·d²):
+    se ordena cada árbol desde una raíz, se aplica consistencia de arcos direccional
+    de las hojas hacia la raíz y se asigna de la raíz hacia las hojas sin retroceder.
+
+    :param csp: CSP con "vecinos" y "restriccion".
+    :param variables: Conjunto de variables del bosque.
+    :param dominios: Dominios ya reducidos {variable: lista de valores}.
+    :param orden_bosque: Resultado de `ordenar_bosque`, si ya se calculó.
+    :return: Asignación {variable: valor} o None si no hay solución.
+    """
+    restriccion = csp["restriccion"]
+    orden, padre = orden_bosque or ordenar_bosque(csp["vecinos"], variables)
+
+    dominios = dict(dominios)
+    # Consistencia de arcos direccional: cada padre conserva solo los valores con soporte en el hijo
+    for hijo in reversed(orden):
+        p = padre[hijo]
+        if p is None:
+            continue
+        dominio_hijo = dominios[hijo]
+        dominios[p] = [a for a in dominios[p] if any(restriccion(p, a, hijo, b) for b in dominio_hijo)]
+        if not dominios[p]:
+            return None
+
+    asignacion = {}
+    for v in orden:
+        p = padre[v]
+        if p is None:
+            if not dominios[v]:
+                return None
+            asignacion[v] = dominios[v][0]
+        else:
+            asignacion[v] = next(b for b in dominios[v] if restriccion(p, asignacion[p], v, b))
+    return asignacion
+
+def acondicionamiento_corte_ciclos(csp, estadisticas=None):
+    """
+    Acondicionamiento del corte de ciclos: para cada asignación consistente del corte,
+    se reducen los dominios de sus vecinos y se resuelve el bosque restante como CSP árbol.
+    El coste es O(d^c · n·d²), donde c es el tamaño del corte.
+
+    :param csp: CSP con "variables", "dominios", "vecinos" y "restriccion".
+    :param estadisticas: Diccionario opcional donde se guarda el corte y las asignaciones probadas.
+    :return: Asignación completa o None si no hay solución.
+    """
+    restriccion = csp["restriccion"]
+    corte = encontrar_corte_ciclos(csp["vecinos"])
+    en_corte = set(corte)
+    resto = set(csp["variables"]) - en_corte
+    # El orden del bosque y las variables vecinas del corte no dependen de la asignación
+    orden_bosque = ordenar_bosque(csp["vecinos"], resto)
+    frontera = [v for v in resto if any(u in en_corte for u in csp["vecinos"][v])]
+    if estadisticas is not None:
+        estadisticas.update(corte=corte, probadas=0)
+    for valores in itertools.product(*(csp["dominios"][v] for v in corte)):
+        asignacion_corte = dict(zip(corte, valores))
+        # La asignación del corte debe ser consistente consigo misma
+        if any(u in en_corte and not restriccion(v, asignacion_corte[v], u, asignacion_corte[u])
+               for v in corte for u in csp["vecinos"][v]):
+            continue
+        if estadisticas is not None:
+            estadisticas["probadas"] += 1
+        # Reducir los dominios de las variables vecinas del corte según su asignación
+        dominios = dict(csp["dominios"])
+        for v in frontera:
+            dominios[v] = [a for a in csp["dominios"][v]
+                           if all(restriccion(v, a, u, asignacion_corte[u]) for u in csp["vecinos"][v] if u in en_corte)]
+        solucion = resolver_csp_arbol(csp, resto, dominios, orden_bosque)
+        if solucion is not None:
+            solucion.update(asignacion_corte)
+            return solucion
+    return None
+
+def generar_csp_casi_arbol(num_variables, aristas_extra, num_colores=3, semilla=0):
+    """
+    Genera un problema de coloreo cuyo grafo es un árbol aleatorio más unas pocas aristas extra.
+    """
+    generador = random.Random(semilla)
+    vecinos = {v: set() for v in range(num_variables)}
+    for v in range(1, num_variables):
+        u = generador.randrange(v)
+        vecinos[v].add(u)
+        vecinos[u].add(v)
+    añadidas = 0
+    while añadidas < aristas_extra:
+        a, b = generador.randrange(num_variables), generador.randrange(num_variables)
+        if a != b and b not in vecinos[a]:
+            vecinos[a].add(b)
+            vecinos[b].add(a)
+            añadidas += 1
+    return {
+        "variables": list(range(num_variables)),
+        "dominios": {v: list(range(num_colores)) for v in range(num_variables)},
+        "vecinos": {v: sorted(vs) for v, vs in vecinos.items()},
+        "restriccion": lambda x, valor_x, y, valor_y: valor_x != valor_y,
+    }
 
 # Ejemplo práctico:
 # Lista de números disponibles
@@ -48,4 +274,42 @@ objetivo = 5
 
 # Llamada al algoritmo
 print("Subconjuntos que suman al objetivo:")
-acondicionamiento_corte(numeros, objetivo)
\ No newline at end of file
+acondicionamiento_corte(numeros, objetivo)
+
+# Miles de números y un objetivo grande
+generador = random.Random(0)
+numeros_grandes = [generador.randrange(1, 100000) for _ in range(3000)]
+objetivo_grande = sum(numeros_grandes) // 3
+inicio = time.perf_counter()
+existe = existe_subconjunto(numeros_grandes, objetivo_grande)
+print(f"\n¿Existe subconjunto de {len(numeros_grandes)} números que sume {objetivo_grande}? "
+      f"{existe} ({time.perf_counter() - inicio:.2f} s)")
+
+# El generador entrega las soluciones de una en una; se toman solo las primeras
+numeros_medianos = [generador.randrange(1, 1000) for _ in range(200)]
+inicio = time.perf_counter()
+primeras = []
+for subconjunto in generar_subconjuntos(numeros_medianos, 5000):
+    primeras.append(subconjunto)
+    if len(primeras) == 1000:
+        break
+print(f"Primeras {len(primeras)} soluciones de 200 números con objetivo 5000 en {time.perf_counter() - inicio:.2f} s "
+      f"(todas válidas: {all(sum(s) == 5000 for s in primeras)})")
+
+# Acondicionamiento del corte de ciclos en grafos casi árbol: el tiempo crece
+# linealmente con el número de variables y exponencialmente solo con el corte
+# (con 2 colores los ciclos impares hacen que haya que probar todo el corte)
+for num_variables, aristas_extra, num_colores in ((1000, 4, 3), (10000, 4, 3), (40000, 4, 3),
+                                                  (10000, 12, 3), (10000, 12, 2), (10000, 24, 2)):
+    csp_casi_arbol = generar_csp_casi_arbol(num_variables, aristas_extra, num_colores)
+    estadisticas = {}
+    inicio = time.perf_counter()
+    solucion_csp = acondicionamiento_corte_ciclos(csp_casi_arbol, estadisticas)
+    duracion = time.perf_counter() - inicio
+    if solucion_csp is None:
+        resultado = "sin solución"
+    else:
+        valida = all(solucion_csp[v] != solucion_csp[u] for v in csp_casi_arbol["variables"] for u in csp_casi_arbol["vecinos"][v])
+        resultado = f"solución válida: {valida}"
+    print(f"n={num_variables}, aristas extra={aristas_extra}, colores={num_colores}: corte de {len(estadisticas['corte'])} variables, "
+          f"{estadisticas['probadas']} asignaciones del corte, {duracion:.2f} s ({resultado})")
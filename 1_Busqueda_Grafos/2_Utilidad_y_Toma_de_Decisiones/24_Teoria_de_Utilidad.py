@@ -3,6 +3,12 @@
 # en situaciones donde hay incertidumbre. Este algoritmo incluye una función
 # de utilidad que asigna un valor numérico a cada posible resultado.
 
+import os
+import tempfile
+import time
+
+import numpy as np
+
 # Definimos la función de utilidad
 def funcion_utilidad(resultado):
     """
@@ -24,6 +30,108 @@ def funcion_utilidad(resultado):
     # Retornamos la utilidad correspondiente al resultado
     return utilidades.get(resultado, 0.0)  # Si el resultado no está definido, retorna 0.0
 
+# Funciones de utilidad monetarias estándar, vectorizadas sobre arrays de resultados
+FAMILIAS_UTILIDAD = ("lineal", "cara", "crra")
+
+def utilidad_monetaria(resultados, familia="lineal", parametro=0.0):
+    """
+    Utilidad de resultados numéricos según una familia estándar.
+
+    Parametros:
+    resultados (array): Resultados monetarios (cualquier forma).
+    familia (str): "lineal" (u = x), "cara" (exponencial, u = (1 - exp(-a x)) / a con aversión
+        absoluta al riesgo a) o "crra" (potencia, u = x^(1-r) / (1-r), o log(x) si r = 1, con
+        aversión relativa r y resultados positivos).
+    parametro (float): Coeficiente de aversión al riesgo (a o r); 0 equivale a la utilidad lineal.
+
+    Retorna:
+    array: Utilidad de cada resultado.
+    """
+    if familia not in FAMILIAS_UTILIDAD:
+        raise ValueError(f"Familia de utilidad desconocida: {familia} (opciones: {FAMILIAS_UTILIDAD})")
+    x = np.asarray(resultados, dtype=float)
+    if familia == "lineal" or parametro == 0:
+        return x
+    if familia == "cara":
+        return -np.expm1(-parametro * x) / parametro
+    if familia == "crra":
+        if parametro == 1:
+            return np.log(x)
+        return x ** (1 - parametro) / (1 - parametro)
+
+def _log_media_exponencial(z, probabilidades, validos):
+    """log(sum_k p_k exp(z_k)) por filas, estable numéricamente e ignorando el relleno."""
+    z = np.where(validos, z, -np.inf)
+    maximo = z.max(axis=1, keepdims=True)
+    suma = (probabilidades * np.exp(z - maximo)).sum(axis=1)
+    return np.log(suma) + maximo[:, 0]
+
+def _evaluar_bloque(resultados, probabilidades, familia, parametro):
+    """Utilidad esperada y equivalente cierto de un bloque de loterías (L, K)."""
+    if familia not in FAMILIAS_UTILIDAD:
+        raise ValueError(f"Familia de utilidad desconocida: {familia} (opciones: {FAMILIAS_UTILIDAD})")
+    resultados = np.asarray(resultados, dtype=float)
+    probabilidades = np.asarray(probabilidades, dtype=float)
+    if (probabilidades < 0).any() or not np.allclose(probabilidades.sum(axis=1), 1.0, atol=1e-6):
+        raise ValueError("Las probabilidades de cada lotería deben ser no negativas y sumar 1")
+    validos = probabilidades > 0  # Las posiciones de relleno llevan probabilidad 0
+    resultados = np.where(validos, resultados, 0.0)
+    if familia == "lineal" or parametro == 0:
+        media = (probabilidades * resultados).sum(axis=1)
+        return media, media.copy()
+    if familia == "cara":
+        # E[exp(-a x)] en escala logarítmica para evitar desbordamientos
+        log_media = _log_media_exponencial(-parametro * resultados, probabilidades, validos)
+        return -np.expm1(log_media) / parametro, -log_media / parametro
+    if familia == "crra":
+        if (resultados[validos] <= 0).any():
+            raise ValueError("La utilidad CRRA solo admite resultados positivos")
+        logaritmos = np.log(np.where(validos, resultados, 1.0))
+        if parametro == 1:
+            media_log = (probabilidades * logaritmos).sum(axis=1)
+            return media_log, np.exp(media_log)
+        log_media = _log_media_exponencial((1 - parametro) * logaritmos, probabilidades, validos)
+        return np.exp(log_media) / (1 - parametro), np.exp(log_media / (1 - parametro))
+
+def evaluar_loterias(resultados, probabilidades, familia="lineal", parametro=0.0, tamano_bloque=None):
+    """
+    Utilidad esperada y equivalente cierto de muchas loterías en una pasada vectorizada.
+
+    Las loterías se dan como arrays rellenados (L, K): la fila i contiene los resultados de
+    la lotería i y sus probabilidades, con probabilidad 0 en las posiciones de relleno. Si
+    se indica tamano_bloque, las filas se procesan por bloques, de modo que los arrays
+    pueden ser np.memmap mayores que la memoria disponible.
+
+    Parametros:
+    resultados (array): Resultados (L, K).
+    probabilidades (array): Probabilidades (L, K).
+    familia (str): "lineal", "cara" o "crra" (ver utilidad_monetaria).
+    parametro (float): Coeficiente de aversión al riesgo.
+    tamano_bloque (int): Número de loterías por bloque (None para todas a la vez).
+
+    Retorna:
+    tuple: (utilidades_esperadas, equivalentes_ciertos), arrays de longitud L.
+    """
+    num_loterias = len(resultados)
+    tamano_bloque = tamano_bloque or max(num_loterias, 1)
+    utilidades_esperadas = np.empty(num_loterias)
+    equivalentes_ciertos = np.empty(num_loterias)
+    for inicio in range(0, num_loterias, tamano_bloque):
+        bloque = slice(inicio, min(inicio + tamano_bloque, num_loterias))
+        utilidades_esperadas[bloque], equivalentes_ciertos[bloque] = _evaluar_bloque(
+            resultados[bloque], probabilidades[bloque], familia, parametro)
+    return utilidades_esperadas, equivalentes_ciertos
+
+def rellenar_loterias(loterias):
+    """Convierte una lista de loterías [(resultados, probabilidades), ...] en arrays rellenados (L, K)."""
+    ancho = max(len(r) for r, _ in loterias)
+    resultados = np.zeros((len(loterias), ancho))
+    probabilidades = np.zeros((len(loterias), ancho))
+    for i, (r, p) in enumerate(loterias):
+        resultados[i, :len(r)] = r
+        probabilidades[i, :len(p)] = p
+    return resultados, probabilidades
+
 # Ejemplo práctico: Evaluación de decisiones
 def ejemplo_practico():
     """
@@ -44,6 +152,51 @@ def ejemplo_practico():
     mejor_resultado = max(resultados, key=funcion_utilidad)
     print(f"\nEl mejor resultado basado en la utilidad es: {mejor_resultado}")
 
+# Ejemplo práctico: ranking de miles de loterías monetarias
+def ejemplo_loterias(num_loterias=5000, max_resultados=300):
+    """
+    Ordena miles de loterías por su equivalente cierto con distintas actitudes ante el riesgo
+    y compara con la evaluación resultado a resultado en Python.
+    """
+    generador = np.random.default_rng(0)
+    longitudes = generador.integers(2, max_resultados + 1, num_loterias)
+    loterias = []
+    for longitud in longitudes:
+        escala = generador.uniform(10, 100)
+        loterias.append((generador.lognormal(np.log(escala), generador.uniform(0.1, 1.0), longitud),
+                         generador.dirichlet(np.ones(longitud))))
+    resultados, probabilidades = rellenar_loterias(loterias)
+
+    print(f"\nEvaluando {num_loterias} loterías de hasta {max_resultados} resultados:")
+    for familia, parametro in (("lineal", 0.0), ("cara", 0.05), ("crra", 2.0)):
+        inicio = time.perf_counter()
+        _, equivalentes = evaluar_loterias(resultados, probabilidades, familia, parametro)
+        tiempo = time.perf_counter() - inicio
+        print(f"  {familia} ({parametro}): {tiempo * 1e3:.1f} ms, mejor lotería {int(equivalentes.argmax())} "
+              f"con equivalente cierto {equivalentes.max():.2f}")
+
+    # Comparación con la evaluación resultado a resultado
+    inicio = time.perf_counter()
+    esperadas_bucle = [sum(p * utilidad_monetaria(x, "crra", 2.0) for x, p in zip(r, q)) for r, q in loterias]
+    tiempo_bucle = time.perf_counter() - inicio
+    esperadas, _ = evaluar_loterias(resultados, probabilidades, "crra", 2.0)
+    assert np.allclose(esperadas, esperadas_bucle)
+    print(f"  Bucle en Python (crra): {tiempo_bucle * 1e3:.1f} ms")
+
+    # Evaluación por bloques sobre arrays en disco
+    with tempfile.TemporaryDirectory() as directorio:
+        resultados_disco = np.lib.format.open_memmap(os.path.join(directorio, "resultados.npy"), mode="w+",
+                                                     dtype=float, shape=resultados.shape)
+        probabilidades_disco = np.lib.format.open_memmap(os.path.join(directorio, "probabilidades.npy"),
+                                                         mode="w+", dtype=float, shape=probabilidades.shape)
+        resultados_disco[:], probabilidades_disco[:] = resultados, probabilidades
+        _, equivalentes_bloques = evaluar_loterias(resultados_disco, probabilidades_disco, "cara", 0.05,
+                                                   tamano_bloque=512)
+        _, equivalentes = evaluar_loterias(resultados, probabilidades, "cara", 0.05)
+        print(f"  Por bloques desde disco: diferencia máxima {np.abs(equivalentes_bloques - equivalentes).max():.1e}")
+        del resultados_disco, probabilidades_disco
+
 # Llamamos al ejemplo práctico para demostrar el algoritmo
 if __name__ == "__main__":
-    ejemplo_practico()
\ No newline at end of file
+    ejemplo_practico()
+    ejemplo_loterias()
\ No newline at end of file
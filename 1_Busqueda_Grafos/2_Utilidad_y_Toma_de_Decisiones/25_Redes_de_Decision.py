@@ -1,4 +1,9 @@
 # Importamos las librerías necesarias
+import heapq
+import itertools
+import time
+from collections import OrderedDict, defaultdict
+
 import numpy as np
 
 # Clase que representa una Red de Decisión
@@ -33,39 +38,378 @@ class RedDecision:
         return utilidad_esperada
 
 
-# Ejemplo práctico: Decidir si llevar paraguas o no
-# Definimos los nodos de la red
-nodos = ["Clima", "Paraguas"]
-
-# Definimos las probabilidades condicionales
-# Probabilidades del clima: Soleado (0.7), Lluvioso (0.3)
-# Probabilidad de llevar paraguas dado el clima
-probabilidades = {
-    ("Clima", "Soleado"): 0.7,
-    ("Clima", "Lluvioso"): 0.3,
-    ("Paraguas", "Llevar"): 0.8,  # Probabilidad de estar preparado si llevas paraguas
-    ("Paraguas", "NoLlevar"): 0.2  # Probabilidad de estar preparado si no llevas paraguas
-}
-
-# Definimos las utilidades asociadas
-# Utilidad de estar preparado para la lluvia
-utilidades = {
-    "Clima": 0,  # El clima no tiene utilidad directa
-    "Paraguas": 50  # Llevar paraguas tiene una utilidad de 50
-}
-
-# Creamos la red de decisión
-red = RedDecision(nodos, probabilidades, utilidades)
-
-# Definimos las decisiones tomadas
-# Decisión: Llevar paraguas
-decisiones = {
-    "Clima": "Lluvioso",
-    "Paraguas": "Llevar"
-}
-
-# Calculamos la utilidad esperada
-utilidad_esperada = red.calcular_utilidad_esperada(decisiones)
-
-# Mostramos el resultado
-print(f"La utilidad esperada de la decisión es: {utilidad_esperada}")
\ No newline at end of file
+# Motor de diagramas de influencia: nodos de azar, de decision y de utilidad, resueltos
+# por eliminacion de variables sobre tablas de factores (potenciales de probabilidad y de utilidad)
+class Factor:
+    """Tabla sobre un conjunto de variables, con un eje por variable y una clave que identifica su contenido."""
+
+    def __init__(self, variables, tabla, clave):
+        self.variables = tuple(variables)
+        self.tabla = np.asarray(tabla, dtype=float)
+        self.clave = clave
+
+
+def _alinear(factor, variables):
+    """Tabla del factor con los ejes en el orden de `variables` (tamaño 1 en las variables que no tiene)."""
+    orden = [factor.variables.index(v) for v in variables if v in factor.variables]
+    forma = [factor.tabla.shape[factor.variables.index(v)] if v in factor.variables else 1 for v in variables]
+    return factor.tabla.transpose(orden).reshape(forma)
+
+
+def _alcance(factores):
+    """Union ordenada de las variables de varios factores."""
+    variables = []
+    for factor in factores:
+        variables.extend(v for v in factor.variables if v not in variables)
+    return tuple(variables)
+
+
+class DiagramaInfluencia:
+    """
+    Diagrama de influencia resuelto por eliminacion de variables.
+
+    Las decisiones se añaden en orden temporal y cada una declara las variables de azar que se
+    observan antes de tomarla (sin olvido: tambien recuerda todo lo anterior). Cada paso de
+    eliminacion se guarda en una cache indexada por el contenido de los factores que usa, de modo
+    que al cambiar una tabla solo se recalculan los pasos que dependen de ella. Cada factor se
+    identifica con un entero (internado a partir de una clave plana), asi que las claves de los
+    pasos no crecen con el numero de variables eliminadas; las caches son LRU de capacidad
+    `capacidad_cache`.
+    """
+
+    def __init__(self, capacidad_cache=100000):
+        self.valores = {}      # Variable -> lista de valores posibles
+        self.padres = {}       # Nodo -> lista de padres
+        self.tablas = {}       # Nodo de azar o de utilidad -> tabla (un eje por padre, y el propio nodo si es de azar)
+        self.versiones = {}    # Nodo -> version de su tabla
+        self.azar = []
+        self.decisiones = []   # En orden temporal
+        self.informacion = {}  # Decision -> variables de azar observadas antes de decidir
+        self.utilidades = []
+        # Caches LRU acotadas: pasos de eliminacion, soluciones completas e identificadores de factores
+        self.capacidad_cache = capacidad_cache
+        self._cache_pasos = OrderedDict()
+        self._cache_soluciones = OrderedDict()
+        self._identificadores = OrderedDict()
+        self._contador = itertools.count()
+        self.estadisticas = {"pasos_calculados": 0, "pasos_reutilizados": 0}
+
+    def agregar_azar(self, nombre, valores, padres, tabla):
+        """Nodo de azar con tabla P(nombre | padres) de forma (padres..., nombre)."""
+        self.valores[nombre] = list(valores)
+        self.padres[nombre] = list(padres)
+        self.azar.append(nombre)
+        self.actualizar_tabla(nombre, tabla)
+
+    def agregar_decision(self, nombre, valores, informacion=()):
+        """Nodo de decision; `informacion` son las variables de azar observadas antes de decidir."""
+        self.valores[nombre] = list(valores)
+        self.decisiones.append(nombre)
+        self.informacion[nombre] = list(informacion)
+
+    def agregar_utilidad(self, nombre, padres, tabla):
+        """Nodo de utilidad con tabla U(padres) de forma (padres...)."""
+        self.padres[nombre] = list(padres)
+        self.utilidades.append(nombre)
+        self.actualizar_tabla(nombre, tabla)
+
+    def actualizar_tabla(self, nombre, tabla):
+        """Sustituye la tabla de un nodo (por ejemplo, para una consulta hipotetica)."""
+        tabla = np.asarray(tabla, dtype=float)
+        forma = tuple(len(self.valores[p]) for p in self.padres[nombre])
+        if nombre in self.valores:
+            forma += (len(self.valores[nombre]),)
+        if tabla.shape != forma:
+            raise ValueError(f"La tabla de {nombre} debe tener forma {forma}, no {tabla.shape}")
+        self.tablas[nombre] = tabla
+        self.versiones[nombre] = self.versiones.get(nombre, 0) + 1
+
+    def limpiar_cache(self):
+        """Vacia las caches de pasos, de soluciones y de identificadores."""
+        self._cache_pasos.clear()
+        self._cache_soluciones.clear()
+        self._identificadores.clear()
+
+    def _consultar(self, cache, clave):
+        """Busca en una cache LRU, marcando la entrada como usada recientemente (None si no esta)."""
+        if clave not in cache:
+            return None
+        cache.move_to_end(clave)
+        return cache[clave]
+
+    def _guardar(self, cache, clave, valor):
+        """Inserta en una cache LRU, expulsando la entrada menos usada si se supera la capacidad."""
+        cache[clave] = valor
+        if len(cache) > self.capacidad_cache:
+            cache.popitem(last=False)
+        return valor
+
+    def _identificador(self, clave):
+        """Entero que representa una clave estructural plana; identificadores nunca reutilizados."""
+        identificador = self._consultar(self._identificadores, clave)
+        if identificador is None:
+            identificador = self._guardar(self._identificadores, clave, next(self._contador))
+        return identificador
+
+    def _factores_iniciales(self):
+        clave = {n: self._identificador(("tabla", n, self.versiones[n])) for n in self.azar + self.utilidades}
+        probabilidad = [Factor(self.padres[n] + [n], self.tablas[n], clave[n]) for n in self.azar]
+        utilidad = [Factor(self.padres[n], self.tablas[n], clave[n]) for n in self.utilidades]
+        return probabilidad, utilidad
+
+    def _orden_eliminacion(self):
+        """Grupos a eliminar: azar nunca observado, ultima decision, lo observado antes de ella, etc."""
+        observadas, grupos_informacion = set(), []
+        for decision in self.decisiones:
+            nuevas = [v for v in self.informacion[decision] if v not in observadas]
+            grupos_informacion.append(nuevas)
+            observadas.update(nuevas)
+        grupos = [("azar", [v for v in self.azar if v not in observadas])]
+        for decision, grupo in zip(reversed(self.decisiones), reversed(grupos_informacion)):
+            grupos.append(("decision", [decision]))
+            grupos.append(("azar", grupo))
+        return grupos
+
+    def _paso(self, clave, calcular):
+        """Devuelve el resultado de un paso de eliminacion, reutilizandolo si ya se calculo."""
+        resultado = self._consultar(self._cache_pasos, clave)
+        if resultado is not None:
+            self.estadisticas["pasos_reutilizados"] += 1
+            return resultado
+        self.estadisticas["pasos_calculados"] += 1
+        return self._guardar(self._cache_pasos, clave, calcular())
+
+    def _clave_paso(self, tipo, variable, rel_p, rel_u):
+        """Clave plana de un paso: la variable y los identificadores enteros de los factores que usa."""
+        return (tipo, variable, tuple(sorted(f.clave for f in rel_p)), tuple(sorted(f.clave for f in rel_u)))
+
+    def _eliminar_azar(self, variable, rel_p, rel_u):
+        """Suma `variable`; devuelve los factores nuevos (probabilidad, utilidad o None)."""
+        clave = self._clave_paso("azar", variable, rel_p, rel_u)
+
+        def calcular():
+            alcance_p = _alcance(rel_p)
+            producto = np.ones([1] * len(alcance_p))
+            for f in rel_p:
+                producto = producto * _alinear(f, alcance_p)
+            eje = alcance_p.index(variable)
+            variables_p = alcance_p[:eje] + alcance_p[eje + 1:]
+            nueva_p = producto.sum(axis=eje)
+            if not rel_u:
+                return nueva_p, variables_p, None, None
+            # psi' = sum_x phi * psi / sum_x phi (utilidad esperada condicionada a lo que queda)
+            alcance = _alcance(rel_p + rel_u)
+            suma_u = sum(_alinear(f, alcance) for f in rel_u)
+            phi = _alinear(Factor(alcance_p, producto, None), alcance)
+            eje = alcance.index(variable)
+            numerador = (phi * suma_u).sum(axis=eje)
+            variables_u = alcance[:eje] + alcance[eje + 1:]
+            denominador = _alinear(Factor(variables_p, nueva_p, None), variables_u)
+            numerador = np.broadcast_to(numerador, np.broadcast_shapes(numerador.shape, denominador.shape))
+            nueva_u = np.divide(numerador, denominador, out=np.zeros(numerador.shape), where=denominador > 0)
+            return nueva_p, variables_p, nueva_u, variables_u
+
+        nueva_p, variables_p, nueva_u, variables_u = self._paso(clave, calcular)
+        factor_p = Factor(variables_p, nueva_p, self._identificador((clave, "p")))
+        factor_u = None if nueva_u is None else Factor(variables_u, nueva_u, self._identificador((clave, "u")))
+        return [factor_p], factor_u
+
+    def _eliminar_decision(self, decision, rel_p, rel_u):
+        """Maximiza `decision`; devuelve los factores nuevos y la politica."""
+        clave = self._clave_paso("decision", decision, rel_p, rel_u)
+
+        def calcular():
+            alcance = _alcance(rel_u)
+            if not rel_u:
+                return (), np.zeros((), dtype=int), None, [(f.variables, f.tabla) for f in rel_p]
+            suma_u = sum(_alinear(f, alcance) for f in rel_u)
+            eje = alcance.index(decision)
+            suma_u = np.broadcast_to(suma_u, np.broadcast_shapes(*(_alinear(f, alcance).shape for f in rel_u)))
+            variables = alcance[:eje] + alcance[eje + 1:]
+            # Los potenciales de probabilidad ya no dependen de la decision: basta una rebanada
+            rebanadas = [(f.variables[:f.variables.index(decision)] + f.variables[f.variables.index(decision) + 1:],
+                          f.tabla.take(0, axis=f.variables.index(decision))) for f in rel_p]
+            return variables, suma_u.argmax(axis=eje), suma_u.max(axis=eje), rebanadas
+
+        variables, politica, nueva_u, rebanadas = self._paso(clave, calcular)
+        nuevos_p = [Factor(v, t, self._identificador((clave, "p", k))) for k, (v, t) in enumerate(rebanadas)]
+        factor_u = None if nueva_u is None else Factor(variables, nueva_u, self._identificador((clave, "u")))
+        return nuevos_p, factor_u, Factor(variables, politica, self._identificador((clave, "politica")))
+
+    def resolver(self):
+        """
+        Calcula la utilidad esperada maxima y la politica optima de cada decision.
+
+        :return: (utilidad_esperada_maxima, politicas), donde politicas[decision] es un Factor
+            con el indice de la mejor accion para cada combinacion de las variables de su tabla.
+        """
+        clave_solucion = tuple(sorted(self.versiones.items()))
+        solucion = self._consultar(self._cache_soluciones, clave_solucion)
+        if solucion is not None:
+            return solucion
+        probabilidad, utilidad = self._factores_iniciales()
+        # Factores vivos indexados por variable, para no recorrerlos todos en cada paso
+        vivos = {"p": {}, "u": {}}
+        por_variable = defaultdict(set)
+
+        def anadir(tipo, factor):
+            vivos[tipo][id(factor)] = factor
+            for v in factor.variables:
+                por_variable[v].add((tipo, id(factor)))
+
+        def extraer(variable):
+            rel = {"p": [], "u": []}
+            for tipo, identificador in sorted(por_variable.pop(variable, ()), key=lambda t: t[1]):
+                factor = vivos[tipo].pop(identificador)
+                rel[tipo].append(factor)
+                for v in factor.variables:
+                    if v != variable:
+                        por_variable[v].discard((tipo, identificador))
+            return rel["p"], rel["u"]
+
+        for factor in probabilidad:
+            anadir("p", factor)
+        for factor in utilidad:
+            anadir("u", factor)
+
+        def tamano_eliminacion(v):
+            alcance = set()
+            for tipo, identificador in por_variable.get(v, ()):
+                alcance.update(vivos[tipo][identificador].variables)
+            return np.prod([len(self.valores[w]) for w in alcance])
+
+        politicas = {}
+        for tipo, grupo in self._orden_eliminacion():
+            if tipo == "decision":
+                for variable in grupo:
+                    rel_p, rel_u = extraer(variable)
+                    nuevos_p, nuevo_u, politicas[variable] = self._eliminar_decision(variable, rel_p, rel_u)
+                    for factor in nuevos_p:
+                        anadir("p", factor)
+                    if nuevo_u is not None:
+                        anadir("u", nuevo_u)
+                continue
+            # Heuristica voraz: eliminar antes la variable que genera el factor mas pequeño. Las
+            # puntuaciones se guardan en un monticulo y solo se recalculan las de las variables
+            # que aparecen en los factores nuevos (las entradas antiguas se descartan al salir)
+            puntuacion = {v: tamano_eliminacion(v) for v in grupo}
+            monticulo = [(puntuacion[v], k, v) for k, v in enumerate(grupo)]
+            heapq.heapify(monticulo)
+            desempate = itertools.count(len(grupo))
+            while monticulo:
+                valor, _, variable = heapq.heappop(monticulo)
+                if variable not in puntuacion or valor != puntuacion[variable]:
+                    continue
+                del puntuacion[variable]
+                rel_p, rel_u = extraer(variable)
+                nuevos_p, nuevo_u = self._eliminar_azar(variable, rel_p, rel_u)
+                nuevos = nuevos_p + ([nuevo_u] if nuevo_u is not None else [])
+                for factor in nuevos_p:
+                    anadir("p", factor)
+                if nuevo_u is not None:
+                    anadir("u", nuevo_u)
+                for v in {w for factor in nuevos for w in factor.variables if w in puntuacion}:
+                    puntuacion[v] = tamano_eliminacion(v)
+                    heapq.heappush(monticulo, (puntuacion[v], next(desempate), v))
+        constante = np.prod([float(f.tabla) for f in vivos["p"].values()])
+        solucion = (constante * sum(float(f.tabla) for f in vivos["u"].values()), politicas)
+        return self._guardar(self._cache_soluciones, clave_solucion, solucion)
+
+    def decision_optima(self, decision, observaciones):
+        """Mejor valor de `decision` dadas las observaciones (y decisiones previas) de las que depende su politica."""
+        politica = self.resolver()[1][decision]
+        indices = tuple(self.valores[v].index(observaciones[v]) for v in politica.variables)
+        return self.valores[decision][int(politica.tabla[indices])]
+
+
+if __name__ == "__main__":
+    # Ejemplo práctico: Decidir si llevar paraguas o no
+    # Definimos los nodos de la red
+    nodos = ["Clima", "Paraguas"]
+
+    # Definimos las probabilidades condicionales
+    # Probabilidades del clima: Soleado (0.7), Lluvioso (0.3)
+    # Probabilidad de llevar paraguas dado el clima
+    probabilidades = {
+        ("Clima", "Soleado"): 0.7,
+        ("Clima", "Lluvioso"): 0.3,
+        ("Paraguas", "Llevar"): 0.8,  # Probabilidad de estar preparado si llevas paraguas
+        ("Paraguas", "NoLlevar"): 0.2  # Probabilidad de estar preparado si no llevas paraguas
+    }
+
+    # Definimos las utilidades asociadas
+    # Utilidad de estar preparado para la lluvia
+    utilidades = {
+        "Clima": 0,  # El clima no tiene utilidad directa
+        "Paraguas": 50  # Llevar paraguas tiene una utilidad de 50
+    }
+
+    # Creamos la red de decisión
+    red = RedDecision(nodos, probabilidades, utilidades)
+
+    # Definimos las decisiones tomadas
+    # Decisión: Llevar paraguas
+    decisiones = {
+        "Clima": "Lluvioso",
+        "Paraguas": "Llevar"
+    }
+
+    # Calculamos la utilidad esperada
+    utilidad_esperada = red.calcular_utilidad_esperada(decisiones)
+
+    # Mostramos el resultado
+    print(f"La utilidad esperada de la decisión es: {utilidad_esperada}")
+
+    # Diagrama de influencia: el problema del buscador de petroleo.
+    # Decidir si hacer una prueba sismica (cuesta 10) y, viendo su resultado, si perforar.
+    diagrama = DiagramaInfluencia()
+    diagrama.agregar_azar("Petroleo", ["seco", "humedo", "empapado"], [], [0.5, 0.3, 0.2])
+    diagrama.agregar_decision("Prueba", ["hacer", "no_hacer"])
+    diagrama.agregar_azar("Resultado", ["cerrada", "abierta", "difusa"], ["Petroleo", "Prueba"], [
+        [[0.1, 0.3, 0.6], [1 / 3, 1 / 3, 1 / 3]],   # Seco (si no hay prueba, el resultado no informa)
+        [[0.3, 0.4, 0.3], [1 / 3, 1 / 3, 1 / 3]],   # Humedo
+        [[0.5, 0.4, 0.1], [1 / 3, 1 / 3, 1 / 3]],   # Empapado
+    ])
+    diagrama.agregar_decision("Perforar", ["si", "no"], informacion=["Resultado"])
+    diagrama.agregar_utilidad("CostePrueba", ["Prueba"], [-10, 0])
+    diagrama.agregar_utilidad("Beneficio", ["Petroleo", "Perforar"], [[-70, 0], [50, 0], [200, 0]])
+
+    utilidad_maxima, politicas = diagrama.resolver()
+    print(f"\nUtilidad esperada maxima: {utilidad_maxima:.2f}")
+    print("Prueba sismica:", diagrama.decision_optima("Prueba", {}))
+    for resultado in diagrama.valores["Resultado"]:
+        print(f"  Resultado {resultado}: perforar = "
+              f"{diagrama.decision_optima('Perforar', {'Resultado': resultado, 'Prueba': 'hacer'})}")
+
+    # Consultas hipoteticas: solo se recalculan los pasos que dependen de la tabla cambiada
+    for coste in (-15, -10):
+        diagrama.estadisticas.update(pasos_calculados=0, pasos_reutilizados=0)
+        diagrama.actualizar_tabla("CostePrueba", [coste, 0])
+        utilidad_maxima, _ = diagrama.resolver()
+        print(f"Si la prueba cuesta {-coste}: utilidad {utilidad_maxima:.2f}, prueba = "
+              f"{diagrama.decision_optima('Prueba', {})}, cache: {diagrama.estadisticas}")
+
+    # Escalabilidad: cadena de 60 variables de azar ocultas con un sensor ruidoso al final
+    diagrama = DiagramaInfluencia()
+    generador = np.random.default_rng(0)
+    anterior = None
+    for k in range(60):
+        nombre = f"X{k}"
+        if anterior is None:
+            diagrama.agregar_azar(nombre, [0, 1, 2], [], [1 / 3] * 3)
+        else:
+            diagrama.agregar_azar(nombre, [0, 1, 2], [anterior], generador.dirichlet(np.ones(3), size=3))
+        anterior = nombre
+    diagrama.agregar_azar("Sensor", [0, 1, 2], [anterior], 0.1 + 0.7 * np.eye(3))
+    diagrama.agregar_decision("Accion", [0, 1, 2], informacion=["Sensor"])
+    diagrama.agregar_utilidad("Acierto", [anterior, "Accion"], 10 * np.eye(3))
+    inicio = time.perf_counter()
+    utilidad_maxima, _ = diagrama.resolver()
+    print(f"\nCadena de 60 variables (3^60 combinaciones): utilidad {utilidad_maxima:.3f} "
+          f"en {time.perf_counter() - inicio:.3f} s")
+    diagrama.actualizar_tabla("Acierto", 12 * np.eye(3))
+    diagrama.estadisticas.update(pasos_calculados=0, pasos_reutilizados=0)
+    inicio = time.perf_counter()
+    utilidad_maxima, _ = diagrama.resolver()
+    print(f"Tras cambiar la utilidad: {utilidad_maxima:.3f} en {time.perf_counter() - inicio:.3f} s, "
+          f"{diagrama.estadisticas}")
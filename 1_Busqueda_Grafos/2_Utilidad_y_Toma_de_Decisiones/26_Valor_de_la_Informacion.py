@@ -2,61 +2,141 @@
 # El VOI mide cuánto vale obtener información adicional antes de tomar una decisión.
 # Se utiliza en situaciones donde hay incertidumbre y se busca maximizar la utilidad esperada.
 
-# Importamos la biblioteca necesaria para realizar cálculos matemáticos
+# Importamos las bibliotecas necesarias: time para medir tiempos y NumPy para los cálculos vectorizados
+import time
+
 import numpy as np
 
+# Comprobación de que un vector (o cada fila de un tensor a lo largo de un eje) es una distribución
+def validar_distribucion(probabilidades, nombre, eje=-1, tolerancia=1e-9):
+    """
+    Lanza ValueError si hay probabilidades negativas o si no suman 1 a lo largo de `eje`.
+
+    :param probabilidades: Vector o tensor de probabilidades.
+    :param nombre: Nombre usado en el mensaje de error.
+    :param eje: Eje sobre el que deben sumar 1.
+    :param tolerancia: Error de redondeo admitido.
+    :return: Las probabilidades como array de NumPy.
+    """
+    probabilidades = np.asarray(probabilidades, dtype=float)
+    if (probabilidades < -tolerancia).any():
+        raise ValueError(f"{nombre} contiene probabilidades negativas")
+    if not np.allclose(probabilidades.sum(axis=eje), 1.0, rtol=0.0, atol=tolerancia * probabilidades.shape[eje]):
+        raise ValueError(f"{nombre} no suma 1")
+    return probabilidades
+
 # Función para calcular la utilidad esperada sin información adicional
 def utilidad_esperada_sin_informacion(probabilidades, utilidades):
     """
     Calcula la utilidad esperada sin información adicional.
-    
+
     :param probabilidades: Lista de probabilidades de los estados del mundo.
-    :param utilidades: Lista de utilidades asociadas a cada estado del mundo.
-    :return: Utilidad esperada sin información.
+    :param utilidades: Lista de utilidades asociadas a cada estado del mundo, o matriz
+        (decisiones x estados) con la utilidad de cada decisión en cada estado.
+    :return: Utilidad esperada sin información (la de la mejor decisión).
     """
-    # Multiplicamos las probabilidades por las utilidades y sumamos los resultados
-    return np.dot(probabilidades, utilidades)
+    # Multiplicamos las probabilidades por las utilidades, sumamos y nos quedamos con la mejor decisión
+    return np.max(np.atleast_2d(utilidades) @ np.asarray(probabilidades))
 
 # Función para calcular la utilidad esperada con información adicional
-def utilidad_esperada_con_informacion(probabilidades_condicionales, utilidades):
+def utilidad_esperada_con_informacion(probabilidades_condicionales, utilidades, probabilidades_observaciones):
     """
     Calcula la utilidad esperada con información adicional.
-    
-    :param probabilidades_condicionales: Matriz de probabilidades condicionales dado cada estado del mundo.
-    :param utilidades: Lista de utilidades asociadas a cada estado del mundo.
+
+    :param probabilidades_condicionales: Matriz con la distribución de los estados del mundo
+        dada cada observación (una fila por observación).
+    :param utilidades: Lista de utilidades por estado, o matriz (decisiones x estados).
+    :param probabilidades_observaciones: Probabilidad de recibir cada observación.
     :return: Utilidad esperada con información.
     """
     utilidad_total = 0
-    # Iteramos sobre cada estado del mundo
+    # Iteramos sobre cada observación posible
     for i in range(len(probabilidades_condicionales)):
-        # Calculamos la utilidad esperada para cada estado y la sumamos
-        utilidad_total += max(np.dot(probabilidades_condicionales[i], utilidades))
+        # Tras observar se elige la mejor decisión; se pondera por la probabilidad de la observación
+        utilidad_total += probabilidades_observaciones[i] * utilidad_esperada_sin_informacion(
+            probabilidades_condicionales[i], utilidades)
     return utilidad_total
 
 # Función principal para calcular el Valor de la Información (VOI)
-def valor_de_la_informacion(probabilidades, probabilidades_condicionales, utilidades):
+def valor_de_la_informacion(probabilidades, probabilidades_condicionales, utilidades, probabilidades_observaciones):
     """
     Calcula el Valor de la Información (VOI).
-    
+
     :param probabilidades: Lista de probabilidades de los estados del mundo.
-    :param probabilidades_condicionales: Matriz de probabilidades condicionales dado cada estado del mundo.
-    :param utilidades: Lista de utilidades asociadas a cada estado del mundo.
+    :param probabilidades_condicionales: Matriz con la distribución de los estados del mundo
+        dada cada observación (una fila por observación).
+    :param utilidades: Lista de utilidades por estado, o matriz (decisiones x estados).
+    :param probabilidades_observaciones: Probabilidad de recibir cada observación.
     :return: Valor de la Información.
+    :raises ValueError: Si alguna de las distribuciones tiene valores negativos o no suma 1.
     """
+    probabilidades = validar_distribucion(probabilidades, "probabilidades")
+    probabilidades_condicionales = validar_distribucion(probabilidades_condicionales, "probabilidades_condicionales")
+    probabilidades_observaciones = validar_distribucion(probabilidades_observaciones, "probabilidades_observaciones")
+    if len(probabilidades_observaciones) != len(probabilidades_condicionales):
+        raise ValueError("Debe haber una probabilidad de observación por cada fila de probabilidades_condicionales")
     # Calculamos la utilidad esperada sin información
     utilidad_sin_info = utilidad_esperada_sin_informacion(probabilidades, utilidades)
     # Calculamos la utilidad esperada con información
-    utilidad_con_info = utilidad_esperada_con_informacion(probabilidades_condicionales, utilidades)
+    utilidad_con_info = utilidad_esperada_con_informacion(probabilidades_condicionales, utilidades,
+                                                          probabilidades_observaciones)
     # El VOI es la diferencia entre ambas utilidades
     return utilidad_con_info - utilidad_sin_info
 
+# Versión por lotes: VOI de muchas observaciones candidatas a la vez
+def valor_de_la_informacion_lote(probabilidades, utilidades, verosimilitudes, utilidad_sin_info=None,
+                                 tamano_lote=2048):
+    """
+    Calcula el VOI de C observaciones candidatas en una sola pasada vectorizada.
+
+    Para cada candidata c: VOI_c = sum_o max_d sum_s U[d, s] P(o | s, c) P(s) - max_d sum_s U[d, s] P(s).
+    El tensor intermedio (candidatas x observaciones x decisiones) se calcula por lotes de
+    tamano_lote candidatas para acotar la memoria.
+
+    :param probabilidades: Vector (S,) con la distribución a priori de los estados.
+    :param utilidades: Matriz (D, S) con la utilidad de cada decisión en cada estado.
+    :param verosimilitudes: Tensor (C, O, S) con P(o | s) para cada candidata.
+    :param utilidad_sin_info: Utilidad esperada a priori ya calculada, compartida por todas las
+        candidatas (y reutilizable entre llamadas); si es None se calcula una sola vez.
+    :param tamano_lote: Número de candidatas procesadas a la vez.
+    :return: Vector (C,) con el VOI de cada candidata.
+    :raises ValueError: Si el prior o alguna P(. | s) no es una distribución.
+    """
+    probabilidades = validar_distribucion(probabilidades, "probabilidades")
+    validar_distribucion(verosimilitudes, "verosimilitudes", eje=1)
+    utilidades_t = np.atleast_2d(np.asarray(utilidades, dtype=float)).T  # (S, D)
+    if utilidad_sin_info is None:
+        utilidad_sin_info = utilidad_esperada_sin_informacion(probabilidades, utilidades_t.T)
+    voi = np.empty(len(verosimilitudes))
+    for inicio in range(0, len(verosimilitudes), tamano_lote):
+        conjuntas = verosimilitudes[inicio:inicio + tamano_lote] * probabilidades  # P(o, s) por candidata
+        # (C, O, S) @ (S, D): utilidad esperada (sin normalizar) de cada decisión tras cada observación
+        voi[inicio:inicio + tamano_lote] = (conjuntas @ utilidades_t).max(axis=2).sum(axis=1)
+    voi -= utilidad_sin_info
+    return voi
+
+def mejores_observaciones(probabilidades, utilidades, verosimilitudes, k, utilidad_sin_info=None):
+    """
+    Devuelve las k observaciones candidatas con mayor VOI.
+
+    :return: (indices, vois) ordenados de mayor a menor VOI.
+    """
+    voi = valor_de_la_informacion_lote(probabilidades, utilidades, verosimilitudes, utilidad_sin_info)
+    k = min(k, len(voi))
+    candidatas = np.argpartition(-voi, k - 1)[:k]
+    candidatas = candidatas[np.argsort(-voi[candidatas], kind="stable")]
+    return candidatas, voi[candidatas]
+
 # Ejemplo práctico
 if __name__ == "__main__":
     # Probabilidades de los estados del mundo (sin información adicional)
     probabilidades = [0.6, 0.4]  # Ejemplo: 60% de probabilidad de buen clima, 40% de mal clima
 
-    # Utilidades asociadas a cada estado del mundo
-    utilidades = [100, 20]  # Ejemplo: Ganancia de 100 si hay buen clima, 20 si hay mal clima
+    # Utilidad de cada decisión en cada estado del mundo
+    utilidades = [
+        [100, 20],  # Evento al aire libre: ganancia de 100 si hay buen clima, 20 si hay mal clima
+        [60, 60],   # Evento bajo techo: ganancia de 60 con cualquier clima
+    ]
 
     # Probabilidades condicionales dado que se obtiene información adicional
     probabilidades_condicionales = [
@@ -64,8 +144,42 @@ if __name__ == "__main__":
         [0.3, 0.7]   # Probabilidades ajustadas si se recibe un reporte desfavorable
     ]
 
+    # Probabilidad de recibir cada reporte (0.6 * 0.8 + 0.4 * 0.3 = 0.6 de buen clima, como el prior)
+    probabilidades_observaciones = [0.6, 0.4]
+
     # Calculamos el Valor de la Información
-    voi = valor_de_la_informacion(probabilidades, probabilidades_condicionales, utilidades)
+    voi = valor_de_la_informacion(probabilidades, probabilidades_condicionales, utilidades,
+                                  probabilidades_observaciones)
 
     # Mostramos el resultado
-    print(f"El Valor de la Información es: {voi}")
\ No newline at end of file
+    print(f"El Valor de la Información es: {voi:.2f}")
+
+    # Colocación de sensores: ranking de miles de sensores candidatos por su VOI
+    generador = np.random.default_rng(0)
+    num_estados, num_candidatos, num_lecturas = 40, 5000, 3
+    prior = generador.dirichlet(np.ones(num_estados))
+    # Decidir dónde intervenir: acertar el estado vale 10, fallar cuesta 1
+    utilidades_sensores = np.where(np.eye(num_estados, dtype=bool), 10.0, -1.0)
+    # P(lectura | estado) de cada sensor, como tensor (C, O, S)
+    verosimilitudes = generador.dirichlet(np.full(num_lecturas, 0.3), size=(num_candidatos, num_estados))
+    verosimilitudes = verosimilitudes.transpose(0, 2, 1)
+
+    inicio = time.perf_counter()
+    utilidad_previa = utilidad_esperada_sin_informacion(prior, utilidades_sensores)
+    indices, vois = mejores_observaciones(prior, utilidades_sensores, verosimilitudes, k=5,
+                                          utilidad_sin_info=utilidad_previa)
+    tiempo_lote = time.perf_counter() - inicio
+    print(f"\nVOI de {num_candidatos} sensores por lotes en {tiempo_lote:.3f} s; mejores sensores:")
+    for indice, valor in zip(indices, vois):
+        print(f"  Sensor {indice}: VOI = {valor:.4f}")
+
+    # Comprobación con la versión de una sola observación sobre los mejores sensores
+    inicio = time.perf_counter()
+    for indice, valor in zip(indices, vois):
+        conjuntas = verosimilitudes[indice] * prior
+        prob_lecturas = conjuntas.sum(axis=1)
+        voi_individual = valor_de_la_informacion(prior, conjuntas / prob_lecturas[:, None], utilidades_sensores,
+                                                 prob_lecturas)
+        assert np.isclose(voi_individual, valor)
+    print(f"Versión individual: {(time.perf_counter() - inicio) / len(indices) * 1e3:.3f} ms por sensor "
+          f"frente a {tiempo_lote / num_candidatos * 1e3:.4f} ms por lotes")
@@ -10,8 +10,20 @@
 # gamma: Factor de descuento que determina la importancia de las recompensas futuras
 # epsilon: Umbral para determinar la convergencia del algoritmo
 
-# Importamos la libreria math para trabajar con valores maximos
+# Importamos las librerias necesarias: NumPy y SciPy para las versiones vectorizadas y dispersas,
+# y multiprocessing para la version paralela con memoria compartida
+import heapq
 import math
+import multiprocessing as mp
+import multiprocessing.connection
+import os
+import time
+from functools import reduce
+from multiprocessing import shared_memory
+
+# NumPy y SciPy para la version vectorizada con matrices dispersas
+import numpy as np
+import scipy.sparse as sp
 
 def iteracion_de_valores(estados, acciones, transiciones, recompensas, gamma, epsilon):
     """
@@ -47,8 +59,8 @@ def iteracion_de_valores(estados, acciones, transiciones, recompensas, gamma, ep
             for accion in acciones:
                 # Calculamos el valor esperado para esta accion
                 valor_accion = sum(
-                    transiciones[(estado, accion, siguiente_estado)] * 
-                    (recompensas[(estado, accion, siguiente_estado)] + gamma * valores[siguiente_estado])
+                    transiciones.get((estado, accion, siguiente_estado), 0) *
+                    (recompensas.get((estado, accion, siguiente_estado), 0) + gamma * valores[siguiente_estado])
                     for siguiente_estado in estados
                 )
 
@@ -73,32 +85,450 @@ def iteracion_de_valores(estados, acciones, transiciones, recompensas, gamma, ep
 
     return valores, politica
 
-# Ejemplo practico
-# Supongamos un entorno simple con 3 estados y 2 acciones
-estados = ["A", "B", "C"]
-acciones = ["ir_a", "quedarse"]
-transiciones = {
-    ("A", "ir_a", "B"): 1.0,
-    ("A", "quedarse", "A"): 1.0,
-    ("B", "ir_a", "C"): 1.0,
-    ("B", "quedarse", "B"): 1.0,
-    ("C", "ir_a", "C"): 1.0,
-    ("C", "quedarse", "C"): 1.0,
-}
-recompensas = {
-    ("A", "ir_a", "B"): 10,
-    ("A", "quedarse", "A"): 0,
-    ("B", "ir_a", "C"): 50,
-    ("B", "quedarse", "B"): 0,
-    ("C", "ir_a", "C"): 0,
-    ("C", "quedarse", "C"): 0,
-}
-gamma = 0.9  # Factor de descuento
-epsilon = 0.01  # Umbral de convergencia
-
-# Llamamos a la funcion para calcular los valores y la politica optima
-valores_optimos, politica_optima = iteracion_de_valores(estados, acciones, transiciones, recompensas, gamma, epsilon)
-
-# Mostramos los resultados
-print("Valores optimos:", valores_optimos)
-print("Politica optima:", politica_optima)
\ No newline at end of file
+def convertir_a_matrices_dispersas(estados, acciones, transiciones, recompensas):
+    """
+    Convierte el formato de diccionarios con claves (estado, accion, siguiente_estado)
+    en una matriz dispersa CSR de transicion por accion y una matriz de recompensas esperadas.
+    Las transiciones que no aparecen en el diccionario se consideran de probabilidad 0.
+
+    Parametros:
+    estados (list): Lista de estados posibles.
+    acciones (list): Lista de acciones posibles.
+    transiciones (dict): Probabilidades de transicion entre estados.
+    recompensas (dict): Recompensas inmediatas para cada transicion.
+
+    Retorna:
+    matrices (list): Una matriz CSR (S x S) por accion.
+    recompensas_esperadas (ndarray): Matriz (A x S) con la recompensa esperada de cada accion en cada estado.
+    """
+    indice_estado = {estado: i for i, estado in enumerate(estados)}
+    indice_accion = {accion: i for i, accion in enumerate(acciones)}
+    filas = [[] for _ in acciones]
+    columnas = [[] for _ in acciones]
+    probabilidades = [[] for _ in acciones]
+    recompensas_esperadas = np.zeros((len(acciones), len(estados)))
+    for (estado, accion, siguiente_estado), probabilidad in transiciones.items():
+        if probabilidad == 0:
+            continue
+        a, i, j = indice_accion[accion], indice_estado[estado], indice_estado[siguiente_estado]
+        filas[a].append(i)
+        columnas[a].append(j)
+        probabilidades[a].append(probabilidad)
+        recompensas_esperadas[a, i] += probabilidad * recompensas.get((estado, accion, siguiente_estado), 0)
+    matrices = [sp.csr_matrix((probabilidades[a], (filas[a], columnas[a])), shape=(len(estados), len(estados)))
+                for a in range(len(acciones))]
+    return matrices, recompensas_esperadas
+
+def iteracion_de_valores_dispersa(matrices, recompensas_esperadas, gamma, epsilon, modo="jacobi",
+                                  tamano_bloque=4096, iteraciones_max=100000):
+    """
+    Iteracion de Valores vectorizada sobre matrices de transicion dispersas.
+    Cada actualizacion de Bellman es un producto matriz dispersa por vector por accion,
+    de modo que solo se recorren las transiciones con probabilidad distinta de cero.
+
+    Modos:
+    - "jacobi": todos los estados se actualizan con los valores del barrido anterior.
+    - "gauss_seidel": los estados se actualizan en el sitio por bloques de filas; cada
+      bloque es un producto disperso que ya usa los valores nuevos de los bloques
+      anteriores, lo que reduce el numero de barridos cuando los sucesores de un estado
+      suelen caer en otros bloques. Dentro de un bloque la actualizacion es Jacobi, asi
+      que si los sucesores son casi siempre estados cercanos (del mismo bloque) el numero
+      de barridos es el de Jacobi. Con tamano_bloque=1 se obtiene Gauss-Seidel fila a fila,
+      con un bucle de Python por estado: solo es razonable para MDP pequenos.
+
+    Parametros:
+    matrices (list): Una matriz CSR (S x S) por accion.
+    recompensas_esperadas (ndarray): Matriz (A x S) de recompensas esperadas.
+    gamma (float): Factor de descuento para recompensas futuras.
+    epsilon (float): Umbral para determinar la convergencia.
+    modo (str): "jacobi" o "gauss_seidel".
+    tamano_bloque (int): Numero de estados consecutivos actualizados juntos en el modo Gauss-Seidel.
+    iteraciones_max (int): Numero maximo de barridos.
+
+    Retorna:
+    valores (ndarray): Valores optimos para cada estado.
+    politica (ndarray): Indice de la accion optima para cada estado.
+    barridos (int): Numero de barridos realizados.
+    """
+    num_estados = recompensas_esperadas.shape[1]
+    num_acciones = len(matrices)
+    valores = np.zeros(num_estados)
+    if modo == "gauss_seidel" and tamano_bloque == 1:
+        # Listas de Python: acceder a ellas elemento a elemento es mas rapido que a arrays de NumPy
+        valores = valores.tolist()
+        filas = [[(m.indices[m.indptr[s]:m.indptr[s + 1]].tolist(), m.data[m.indptr[s]:m.indptr[s + 1]].tolist())
+                  for s in range(num_estados)] for m in matrices]
+        recompensas = recompensas_esperadas.tolist()
+    elif modo == "gauss_seidel":
+        bloques = [(inicio, min(inicio + tamano_bloque, num_estados),
+                    [m[inicio:inicio + tamano_bloque] for m in matrices])
+                   for inicio in range(0, num_estados, tamano_bloque)]
+
+    for barrido in range(1, iteraciones_max + 1):
+        if modo == "gauss_seidel" and tamano_bloque == 1:
+            delta = 0.0
+            for s in range(num_estados):
+                nuevo = max(recompensas[a][s] + gamma * sum(p * valores[j] for j, p in zip(*filas[a][s]))
+                            for a in range(num_acciones))
+                delta = max(delta, abs(nuevo - valores[s]))
+                valores[s] = nuevo  # Actualizacion en el sitio
+        elif modo == "gauss_seidel":
+            delta = 0.0
+            for inicio, fin, filas_bloque in bloques:
+                q = np.stack([recompensas_esperadas[a, inicio:fin] + gamma * (filas_bloque[a] @ valores)
+                              for a in range(num_acciones)])
+                nuevos = q.max(axis=0)
+                delta = max(delta, np.abs(nuevos - valores[inicio:fin]).max())
+                valores[inicio:fin] = nuevos  # Actualizacion en el sitio
+        else:
+            q = np.stack([recompensas_esperadas[a] + gamma * (matrices[a] @ valores) for a in range(num_acciones)])
+            nuevos = q.max(axis=0)
+            delta = np.abs(nuevos - valores).max()
+            valores = nuevos
+        if delta < epsilon:
+            break
+
+    valores = np.asarray(valores)
+    q = np.stack([recompensas_esperadas[a] + gamma * (matrices[a] @ valores) for a in range(num_acciones)])
+    return valores, q.argmax(axis=0), barrido
+
+def generar_mdp_disperso(num_estados, num_acciones, sucesores, semilla=0, alcance=50):
+    """
+    Genera un MDP aleatorio en el que cada par (estado, accion) lleva a unos pocos
+    estados a distancia como mucho `alcance` (None = cualquier estado), construyendo
+    las matrices CSR directamente con NumPy.
+    """
+    generador = np.random.default_rng(semilla)
+    indptr = np.arange(0, num_estados * sucesores + 1, sucesores)
+    matrices = []
+    for _ in range(num_acciones):
+        if alcance is None:
+            desplazamientos = generador.integers(0, num_estados, size=num_estados * sucesores)
+        else:
+            desplazamientos = generador.integers(-alcance, alcance + 1, size=num_estados * sucesores)
+        indices = (np.repeat(np.arange(num_estados), sucesores) + desplazamientos) % num_estados
+        probabilidades = generador.random((num_estados, sucesores))
+        probabilidades /= probabilidades.sum(axis=1, keepdims=True)
+        matrices.append(sp.csr_matrix((probabilidades.ravel(), indices, indptr), shape=(num_estados, num_estados)))
+    recompensas_esperadas = generador.normal(size=(num_acciones, num_estados))
+    return matrices, recompensas_esperadas
+
+def iteracion_de_valores_priorizada(matrices, recompensas_esperadas, gamma, umbral, backups_max=None):
+    """
+    Iteracion de Valores asincrona con barrido priorizado (prioritized sweeping).
+    En lugar de actualizar todos los estados en cada barrido, se mantiene una cola de
+    prioridad de estados ordenada por su residuo de Bellman y solo se actualiza el
+    estado con mayor residuo. Al cambiar el valor de un estado s, el residuo de cada
+    predecesor p puede crecer como mucho gamma * max_a P(s | p, a) * |cambio|, cota que
+    se suma a su prioridad; asi, cuando ninguna prioridad supera el umbral, ningun
+    residuo lo supera.
+
+    Parametros:
+    matrices (list): Una matriz CSR (S x S) por accion.
+    recompensas_esperadas (ndarray): Matriz (A x S) de recompensas esperadas.
+    gamma (float): Factor de descuento para recompensas futuras.
+    umbral (float): Residuo de Bellman maximo permitido al terminar.
+    backups_max (int): Numero maximo de actualizaciones (None para no limitar).
+
+    Retorna:
+    valores (ndarray): Valores para cada estado.
+    politica (ndarray): Indice de la accion voraz para cada estado.
+    backups (int): Numero de actualizaciones de Bellman realizadas.
+    """
+    num_estados = recompensas_esperadas.shape[1]
+    num_acciones = len(matrices)
+    valores = np.zeros(num_estados)
+
+    # Residuos iniciales calculados de forma vectorizada
+    q = np.stack([recompensas_esperadas[a] + gamma * (matrices[a] @ valores) for a in range(num_acciones)])
+    prioridad = np.abs(q.max(axis=0) - valores).tolist()
+    cola = [(-prioridad[s], s) for s in range(num_estados) if prioridad[s] > umbral]
+    heapq.heapify(cola)
+
+    # Cada actualizacion toca muy pocos elementos, asi que el bucle trabaja con listas de
+    # Python (acceso mas rapido que a elementos sueltos de NumPy) extraidas una sola vez
+    valores = valores.tolist()
+    recompensas = recompensas_esperadas.tolist()
+    datos = [(m.indptr.tolist(), m.indices.tolist(), m.data.tolist()) for m in matrices]
+    # Listas de predecesores, construidas una sola vez: fila s = max_a P(s | p, a) para cada p
+    predecesores = reduce(lambda x, y: x.maximum(y), [m.T.tocsr() for m in matrices]).tocsr()
+    pred_indptr, pred_indices, pred_datos = (predecesores.indptr.tolist(), predecesores.indices.tolist(),
+                                             predecesores.data.tolist())
+
+    backups = 0
+    while cola and (backups_max is None or backups < backups_max):
+        menos_prioridad, s = heapq.heappop(cola)
+        if -menos_prioridad != prioridad[s]:
+            continue  # Entrada obsoleta
+        # Actualizacion de Bellman del estado s
+        mejor = -math.inf
+        for a in range(num_acciones):
+            indptr, indices, probabilidades = datos[a]
+            esperado = 0.0
+            for k in range(indptr[s], indptr[s + 1]):
+                esperado += probabilidades[k] * valores[indices[k]]
+            valor_accion = recompensas[a][s] + gamma * esperado
+            if valor_accion > mejor:
+                mejor = valor_accion
+        cambio = abs(mejor - valores[s])
+        valores[s] = mejor
+        prioridad[s] = 0.0
+        backups += 1
+        # Propagar la cota del cambio a los predecesores
+        for k in range(pred_indptr[s], pred_indptr[s + 1]):
+            p = pred_indices[k]
+            prioridad[p] += gamma * pred_datos[k] * cambio
+            if prioridad[p] > umbral:
+                heapq.heappush(cola, (-prioridad[p], p))
+
+    valores = np.array(valores)
+    q = np.stack([recompensas_esperadas[a] + gamma * (matrices[a] @ valores) for a in range(num_acciones)])
+    return valores, q.argmax(axis=0), backups
+
+def generar_mundo_rejilla(lado, prob_exito=0.8):
+    """
+    Genera un mundo en rejilla (lado x lado) con 4 acciones que mueven al agente con
+    probabilidad `prob_exito` (si no, se queda quieto). Solo la esquina final da recompensa
+    y es absorbente, por lo que el valor se propaga poco a poco desde ella.
+    """
+    num_estados = lado * lado
+    estados = np.arange(num_estados)
+    fila, columna = np.divmod(estados, lado)
+    objetivo = num_estados - 1
+    matrices, recompensas_esperadas = [], np.zeros((4, num_estados))
+    for a, (df, dc) in enumerate(((1, 0), (-1, 0), (0, 1), (0, -1))):
+        destino = np.clip(fila + df, 0, lado - 1) * lado + np.clip(columna + dc, 0, lado - 1)
+        destino[objetivo] = objetivo
+        exito = np.where(estados == objetivo, 1.0, prob_exito)
+        m = sp.csr_matrix((exito, (estados, destino)), shape=(num_estados, num_estados)) + \
+            sp.csr_matrix((1.0 - exito, (estados, estados)), shape=(num_estados, num_estados))
+        matrices.append(m.tocsr())
+        llega = (destino == objetivo) & (estados != objetivo)
+        recompensas_esperadas[a, llega] = prob_exito * 100.0
+    return matrices, recompensas_esperadas
+
+def _copiar_a_memoria_compartida(array):
+    """Copia un array en un bloque de memoria compartida; devuelve (bloque, descriptor)."""
+    bloque = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=bloque.buf)[...] = array
+    return bloque, (bloque.name, array.shape, array.dtype.str)
+
+def _barridos_fragmento(arrays, inicio, fin, trabajador, gamma, epsilon, iteraciones_max, barrera, tiempo_espera):
+    """Barridos de Jacobi sobre los estados [inicio, fin) de un trabajador."""
+    valores, residuos, recompensas_esperadas = arrays["valores"], arrays["residuos"], arrays["recompensas"]
+    num_estados = valores.shape[1]
+    # Filas del fragmento como vistas CSR sobre la memoria compartida (sin copiar datos)
+    filas = []
+    for a in range(recompensas_esperadas.shape[0]):
+        indptr, indices, datos = arrays[f"indptr_{a}"], arrays[f"indices_{a}"], arrays[f"datos_{a}"]
+        primero, ultimo = indptr[inicio], indptr[fin]
+        filas.append(sp.csr_matrix((datos[primero:ultimo], indices[primero:ultimo], indptr[inicio:fin + 1] - primero),
+                                   shape=(fin - inicio, num_estados), copy=False))
+
+    for barrido in range(1, iteraciones_max + 1):
+        # Doble buffer: se lee el vector del barrido anterior y se escribe en el otro
+        actual, siguiente = valores[(barrido - 1) % 2], valores[barrido % 2]
+        if fin > inicio:
+            q = np.stack([recompensas_esperadas[a, inicio:fin] + gamma * (filas[a] @ actual)
+                          for a in range(len(filas))])
+            nuevos = q.max(axis=0)
+            residuos[trabajador] = np.abs(nuevos - actual[inicio:fin]).max()
+            siguiente[inicio:fin] = nuevos
+        else:
+            residuos[trabajador] = 0.0
+        barrera.wait(tiempo_espera)  # Todos los fragmentos del barrido escritos
+        parar = residuos.max() < epsilon  # Reduccion global del residuo
+        barrera.wait(tiempo_espera)  # Nadie sobrescribe los residuos antes de que todos los lean
+        if parar:
+            break
+    return barrido
+
+def _trabajador_bellman(descriptores, inicio, fin, trabajador, gamma, epsilon, iteraciones_max, barrera, barridos,
+                        tiempo_espera):
+    """
+    Proceso trabajador: se conecta a la memoria compartida y actualiza su fragmento de estados.
+    Si falla, rompe la barrera para que el resto de trabajadores no se quede esperando.
+    """
+    bloques = {}
+    try:
+        for clave, (nombre, _, _) in descriptores.items():
+            bloques[clave] = shared_memory.SharedMemory(name=nombre)
+        arrays = {clave: np.ndarray(forma, dtype=tipo, buffer=bloques[clave].buf)
+                  for clave, (_, forma, tipo) in descriptores.items()}
+        barridos_realizados = _barridos_fragmento(arrays, inicio, fin, trabajador, gamma, epsilon,
+                                                  iteraciones_max, barrera, tiempo_espera)
+        del arrays  # Liberar las vistas antes de cerrar los bloques
+        if trabajador == 0:
+            barridos.value = barridos_realizados
+    except BaseException:
+        barrera.abort()
+        raise
+    finally:
+        for bloque in bloques.values():
+            bloque.close()
+
+def iteracion_de_valores_paralela(matrices, recompensas_esperadas, gamma, epsilon, num_procesos=None,
+                                  iteraciones_max=100000, tiempo_espera=60.0):
+    """
+    Iteracion de Valores (Jacobi) repartida entre varios procesos con memoria compartida.
+    El vector de valores (con doble buffer), las matrices CSR y las recompensas se colocan
+    en memoria compartida una sola vez. Cada proceso actualiza un fragmento contiguo de
+    estados, con aproximadamente el mismo numero de transiciones, y los barridos se
+    sincronizan con una barrera; el criterio de parada es el maximo de los residuos
+    locales, igual que en iteracion_de_valores_dispersa, por lo que ambas dan los mismos valores.
+    Si un trabajador falla o muere, la barrera se rompe (o vence su tiempo de espera), el
+    resto de trabajadores termina y se lanza RuntimeError en lugar de bloquearse.
+    La aceleracion solo aparece con varios nucleos fisicos libres; con uno solo, el
+    reparto en procesos es algo mas lento que la version secuencial.
+
+    Parametros:
+    matrices (list): Una matriz CSR (S x S) por accion.
+    recompensas_esperadas (ndarray): Matriz (A x S) de recompensas esperadas.
+    gamma (float): Factor de descuento para recompensas futuras.
+    epsilon (float): Umbral para determinar la convergencia.
+    num_procesos (int): Numero de procesos trabajadores (por defecto, uno por nucleo).
+    iteraciones_max (int): Numero maximo de barridos.
+    tiempo_espera (float): Segundos maximos de espera en la barrera de cada barrido.
+
+    Retorna:
+    valores (ndarray): Valores optimos para cada estado.
+    politica (ndarray): Indice de la accion optima para cada estado.
+    barridos (int): Numero de barridos realizados.
+    """
+    num_acciones, num_estados = recompensas_esperadas.shape
+    num_procesos = num_procesos or os.cpu_count()
+    arrays = {"valores": np.zeros((2, num_estados)), "residuos": np.zeros(num_procesos),
+              "recompensas": np.ascontiguousarray(recompensas_esperadas, dtype=np.float64)}
+    for a, m in enumerate(matrices):
+        m = m.tocsr()
+        arrays[f"indptr_{a}"], arrays[f"indices_{a}"], arrays[f"datos_{a}"] = m.indptr, m.indices, m.data
+
+    # Fragmentos equilibrados por numero de transiciones, no por numero de estados
+    transiciones_acumuladas = sum(m.tocsr().indptr for m in matrices)
+    cortes = np.searchsorted(transiciones_acumuladas,
+                             np.linspace(0, transiciones_acumuladas[-1], num_procesos + 1)[1:-1])
+    limites = [0, *np.minimum(cortes, num_estados).tolist(), num_estados]
+
+    bloques, descriptores = {}, {}
+    try:
+        for clave, array in arrays.items():
+            bloques[clave], descriptores[clave] = _copiar_a_memoria_compartida(array)
+        barrera = mp.Barrier(num_procesos)
+        barridos = mp.Value("i", 0)
+        procesos = [mp.Process(target=_trabajador_bellman,
+                               args=(descriptores, limites[w], limites[w + 1], w, gamma, epsilon,
+                                     iteraciones_max, barrera, barridos, tiempo_espera))
+                    for w in range(num_procesos)]
+        for proceso in procesos:
+            proceso.start()
+        # Esperar a los trabajadores; al primer fallo se rompe la barrera y se detiene el resto
+        pendientes = list(procesos)
+        while pendientes:
+            mp.connection.wait([proceso.sentinel for proceso in pendientes], timeout=tiempo_espera)
+            for proceso in [proceso for proceso in pendientes if not proceso.is_alive()]:
+                proceso.join()
+                pendientes.remove(proceso)
+                if proceso.exitcode != 0:
+                    barrera.abort()
+                    for otro in pendientes:
+                        otro.join(tiempo_espera)
+                        if otro.is_alive():
+                            otro.terminate()
+                            otro.join()
+                    raise RuntimeError("Un proceso trabajador de la iteracion de valores ha fallado "
+                                       f"(codigo de salida {proceso.exitcode})")
+        _, forma, tipo = descriptores["valores"]
+        valores = np.ndarray(forma, dtype=tipo, buffer=bloques["valores"].buf)[barridos.value % 2].copy()
+    finally:
+        for bloque in bloques.values():
+            bloque.close()
+            bloque.unlink()
+
+    q = np.stack([recompensas_esperadas[a] + gamma * (matrices[a] @ valores) for a in range(num_acciones)])
+    return valores, q.argmax(axis=0), barridos.value
+
+if __name__ == "__main__":
+    # Ejemplo practico
+    # Supongamos un entorno simple con 3 estados y 2 acciones
+    estados = ["A", "B", "C"]
+    acciones = ["ir_a", "quedarse"]
+    transiciones = {
+        ("A", "ir_a", "B"): 1.0,
+        ("A", "quedarse", "A"): 1.0,
+        ("B", "ir_a", "C"): 1.0,
+        ("B", "quedarse", "B"): 1.0,
+        ("C", "ir_a", "C"): 1.0,
+        ("C", "quedarse", "C"): 1.0,
+    }
+    recompensas = {
+        ("A", "ir_a", "B"): 10,
+        ("A", "quedarse", "A"): 0,
+        ("B", "ir_a", "C"): 50,
+        ("B", "quedarse", "B"): 0,
+        ("C", "ir_a", "C"): 0,
+        ("C", "quedarse", "C"): 0,
+    }
+    gamma = 0.9  # Factor de descuento
+    epsilon = 0.01  # Umbral de convergencia
+
+    # Llamamos a la funcion para calcular los valores y la politica optima
+    valores_optimos, politica_optima = iteracion_de_valores(estados, acciones, transiciones, recompensas, gamma, epsilon)
+
+    # Mostramos los resultados
+    print("Valores optimos:", valores_optimos)
+    print("Politica optima:", politica_optima)
+
+    # Misma solucion con la version dispersa a partir del formato de diccionarios
+    matrices, recompensas_esperadas = convertir_a_matrices_dispersas(estados, acciones, transiciones, recompensas)
+    for modo in ("jacobi", "gauss_seidel"):
+        valores_dispersos, politica_dispersa, barridos = iteracion_de_valores_dispersa(
+            matrices, recompensas_esperadas, gamma, epsilon, modo=modo)
+        print(f"Version dispersa ({modo}):", dict(zip(estados, np.round(valores_dispersos, 2).tolist())),
+              {estado: acciones[a] for estado, a in zip(estados, politica_dispersa)}, f"{barridos} barridos")
+
+    # Escalabilidad: MDP dispersos con un millon de estados, con sucesores cercanos (a menos
+    # de 50 estados) o en cualquier parte; Gauss-Seidel por bloques de 4096 filas solo ahorra
+    # barridos en el segundo caso, en el que los sucesores caen en otros bloques
+    for alcance in (50, None):
+        matrices_grandes, recompensas_grandes = generar_mdp_disperso(10 ** 6, 2, 3, alcance=alcance)
+        for modo in ("jacobi", "gauss_seidel"):
+            inicio = time.perf_counter()
+            _, _, barridos = iteracion_de_valores_dispersa(matrices_grandes, recompensas_grandes, gamma, epsilon,
+                                                           modo=modo)
+            print(f"10^6 estados, sucesores {'cercanos' if alcance else 'lejanos'} ({modo}): "
+                  f"{barridos} barridos en {time.perf_counter() - inicio:.2f} s")
+
+    # Barrido priorizado frente a barridos completos en un mundo en rejilla de 40 x 40
+    matrices_rejilla, recompensas_rejilla = generar_mundo_rejilla(40)
+    num_estados_rejilla = recompensas_rejilla.shape[1]
+    inicio = time.perf_counter()
+    valores_sincronos, _, barridos = iteracion_de_valores_dispersa(matrices_rejilla, recompensas_rejilla, 0.95, 1e-3)
+    tiempo_sincrono = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    valores_priorizados, _, backups = iteracion_de_valores_priorizada(matrices_rejilla, recompensas_rejilla, 0.95, 1e-3)
+    tiempo_priorizado = time.perf_counter() - inicio
+    print(f"Barridos completos: {barridos * num_estados_rejilla} actualizaciones ({barridos} barridos, {tiempo_sincrono:.2f} s)")
+    print(f"Barrido priorizado: {backups} actualizaciones ({tiempo_priorizado:.2f} s), "
+          f"diferencia maxima de valores: {np.abs(valores_sincronos - valores_priorizados).max():.4f}")
+
+    # Iteracion de valores con varios procesos y memoria compartida sobre 4 * 10^6 estados
+    matrices_grandes, recompensas_grandes = generar_mdp_disperso(4 * 10 ** 6, 2, 3)
+    inicio = time.perf_counter()
+    valores_referencia, politica_referencia, barridos = iteracion_de_valores_dispersa(
+        matrices_grandes, recompensas_grandes, gamma, epsilon)
+    tiempo_base = time.perf_counter() - inicio
+    print(f"4 * 10^6 estados, un proceso: {barridos} barridos en {tiempo_base:.2f} s")
+    nucleos = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    if nucleos == 1:
+        # Con un solo nucleo los procesos se turnan y la sincronizacion solo anade coste:
+        # la aceleracion medida sera < 1x y no demuestra la ganancia del reparto
+        print("Aviso: solo hay un nucleo disponible; la aceleracion requiere varios nucleos y aqui no se observa")
+    for num_procesos in sorted({1, 2, 4, os.cpu_count()}):
+        inicio = time.perf_counter()
+        valores_paralelos, politica_paralela, barridos = iteracion_de_valores_paralela(
+            matrices_grandes, recompensas_grandes, gamma, epsilon, num_procesos=num_procesos)
+        tiempo = time.perf_counter() - inicio
+        print(f"{num_procesos} procesos: {barridos} barridos en {tiempo:.2f} s "
+              f"(aceleracion {tiempo_base / tiempo:.2f}x), diferencia maxima de valores: "
+              f"{np.abs(valores_paralelos - valores_referencia).max():.1e}, "
+              f"politicas iguales: {np.array_equal(politica_paralela, politica_referencia)}")
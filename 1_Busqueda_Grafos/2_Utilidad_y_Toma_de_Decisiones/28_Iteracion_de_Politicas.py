@@ -1,69 +1,84 @@
 # Importamos las bibliotecas necesarias
+import time
+
 import numpy as np
 
 # Definimos la funcion de Iteracion de Politicas
-def iteracion_de_politicas(recompensas, matriz_transicion, gamma, iteraciones_max):
+def iteracion_de_politicas(recompensas, matriz_transicion, gamma, iteraciones_max=1000, barridos_k=None,
+                           tolerancia=1e-6):
     """
     Algoritmo de Iteracion de Politicas para resolver problemas de decision en procesos de decision de Markov (MDP).
-    
+
+    La evaluacion de la politica puede ser exacta (resolviendo el sistema lineal
+    (I - gamma * P_pi) V = P_pi R) o aproximada con `barridos_k` barridos vectorizados
+    (iteracion de politicas modificada). La mejora es un unico argmax sobre un einsum.
+
     Parametros:
     - recompensas: Vector que contiene las recompensas inmediatas para cada estado.
-    - matriz_transicion: Matriz que define las probabilidades de transicion entre estados para cada accion.
-    - gamma: Factor de descuento que determina la importancia de las recompensas futuras (0 <= gamma <= 1).
+    - matriz_transicion: Matriz (S, A, S') que define las probabilidades de transicion entre estados para cada accion.
+    - gamma: Factor de descuento que determina la importancia de las recompensas futuras (0 <= gamma < 1).
     - iteraciones_max: Numero maximo de iteraciones para evitar bucles infinitos.
+    - barridos_k: None para evaluacion exacta, o numero de barridos parciales por iteracion.
+    - tolerancia: Cambio maximo de valores admitido para dar por estable la version modificada.
 
     Retorna:
     - politica_optima: Politica que maximiza la recompensa esperada.
     - valores: Valores optimos para cada estado.
     """
-    # Inicializamos la politica de manera aleatoria (una accion por estado)
-    num_estados, num_acciones = matriz_transicion.shape[:2]
+    num_estados = matriz_transicion.shape[0]
+    recompensas = np.asarray(recompensas, dtype=float)
+    estados = np.arange(num_estados)
     politica = np.zeros(num_estados, dtype=int)  # Politica inicial (accion 0 para todos los estados)
-    
-    # Inicializamos los valores de los estados en cero
     valores = np.zeros(num_estados)
 
-    # Iteramos hasta que la politica sea estable
     for _ in range(iteraciones_max):
         # Paso 1: Evaluacion de la politica
-        while True:
-            nuevos_valores = np.zeros(num_estados)
-            for estado in range(num_estados):
-                accion = politica[estado]
-                nuevos_valores[estado] = sum(
-                    matriz_transicion[estado, accion, siguiente_estado] *
-                    (recompensas[siguiente_estado] + gamma * valores[siguiente_estado])
-                    for siguiente_estado in range(num_estados)
-                )
-            # Verificamos si los valores han convergido
-            if np.allclose(valores, nuevos_valores, atol=1e-6):
-                break
-            valores = nuevos_valores
-
-        # Paso 2: Mejoramiento de la politica
-        politica_estable = True
-        for estado in range(num_estados):
-            # Calculamos el valor esperado para cada accion
-            valores_acciones = np.zeros(num_acciones)
-            for accion in range(num_acciones):
-                valores_acciones[accion] = sum(
-                    matriz_transicion[estado, accion, siguiente_estado] *
-                    (recompensas[siguiente_estado] + gamma * valores[siguiente_estado])
-                    for siguiente_estado in range(num_estados)
-                )
-            # Elegimos la mejor accion
-            mejor_accion = np.argmax(valores_acciones)
-            if mejor_accion != politica[estado]:
-                politica_estable = False
-            politica[estado] = mejor_accion
-
-        # Si la politica es estable, terminamos
-        if politica_estable:
+        transicion_politica = matriz_transicion[estados, politica]  # Matriz (S, S') de la politica actual
+        if barridos_k is None:
+            valores = np.linalg.solve(np.eye(num_estados) - gamma * transicion_politica,
+                                      transicion_politica @ recompensas)
+            cambio = 0.0
+        else:
+            cambio = 0.0
+            for _ in range(barridos_k):
+                nuevos_valores = transicion_politica @ (recompensas + gamma * valores)
+                cambio = np.abs(nuevos_valores - valores).max()
+                valores = nuevos_valores
+
+        # Paso 2: Mejoramiento de la politica (todas las acciones de todos los estados a la vez)
+        valores_acciones = np.einsum("ijk,k->ij", matriz_transicion, recompensas + gamma * valores)
+        mejores_acciones = valores_acciones.argmax(axis=1)
+        # Solo se cambia de accion si la mejora es estricta, para no oscilar entre empates
+        mejora = valores_acciones[estados, mejores_acciones] - valores_acciones[estados, politica]
+        cambiar = mejora > 1e-12 * max(1.0, np.abs(valores_acciones).max())
+        politica = np.where(cambiar, mejores_acciones, politica)
+
+        # Si la politica es estable (y los valores convergieron en la version modificada), terminamos
+        if not cambiar.any() and cambio < tolerancia:
             break
 
     return politica, valores
 
 
+def generar_mdp_aleatorio(num_estados, num_acciones, sucesores=5, semilla=0):
+    """
+    Genera un MDP aleatorio con `sucesores` estados sucesores por par (estado, accion).
+
+    Retorna:
+    - recompensas: Vector (S,) de recompensas por estado.
+    - matriz_transicion: Tensor (S, A, S') de probabilidades de transicion.
+    """
+    generador = np.random.default_rng(semilla)
+    matriz_transicion = np.zeros((num_estados, num_acciones, num_estados))
+    destinos = generador.integers(0, num_estados, size=(num_estados, num_acciones, sucesores))
+    pesos = generador.random((num_estados, num_acciones, sucesores))
+    pesos /= pesos.sum(axis=2, keepdims=True)
+    filas, columnas = np.arange(num_estados)[:, None], np.arange(num_acciones)[None, :]
+    for k in range(sucesores):
+        np.add.at(matriz_transicion, (filas, columnas, destinos[:, :, k]), pesos[:, :, k])
+    return generador.random(num_estados), matriz_transicion
+
+
 # Ejemplo practico
 if __name__ == "__main__":
     # Definimos un problema simple con 3 estados y 2 acciones
@@ -89,4 +104,15 @@ if __name__ == "__main__":
 
     # Mostramos los resultados
     print("Politica optima:", politica_optima)
-    print("Valores optimos:", valores_optimos)
\ No newline at end of file
+    print("Valores optimos:", valores_optimos)
+
+    # Evaluacion exacta frente a iteracion de politicas modificada en un MDP aleatorio
+    recompensas_grandes, transicion_grande = generar_mdp_aleatorio(1000, 4)
+    resultados = {}
+    for barridos_k in (None, 5, 20):
+        inicio = time.perf_counter()
+        resultados[barridos_k] = iteracion_de_politicas(recompensas_grandes, transicion_grande, 0.95,
+                                                        barridos_k=barridos_k)
+        nombre = "exacta" if barridos_k is None else f"modificada (k={barridos_k})"
+        print(f"Evaluacion {nombre}: {time.perf_counter() - inicio:.2f} s, "
+              f"diferencia de valores con la exacta: {np.abs(resultados[barridos_k][1] - resultados[None][1]).max():.2e}")
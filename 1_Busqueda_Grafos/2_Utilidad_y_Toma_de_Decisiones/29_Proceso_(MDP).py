@@ -2,71 +2,204 @@
 # Un MDP es un modelo matemático que se utiliza para tomar decisiones en un entorno incierto.
 # Se basa en estados, acciones, recompensas y transiciones probabilísticas.
 
-# Importamos la biblioteca numpy para realizar cálculos numéricos
+# Importamos las bibliotecas necesarias
+import json
+import os
+import tempfile
+import time
+
 import numpy as np
 
-# Definimos las variables principales del MDP
-# Estados posibles en el entorno
-estados = ["Inicio", "Intermedio", "Final"]
-
-# Acciones posibles que el agente puede tomar
-acciones = ["Moverse", "Esperar"]
-
-# Matriz de recompensas: define la recompensa por tomar una acción en un estado
-# Filas representan estados, columnas representan acciones
-recompensas = {
-    "Inicio": {"Moverse": -1, "Esperar": 0},
-    "Intermedio": {"Moverse": 10, "Esperar": -1},
-    "Final": {"Moverse": 0, "Esperar": 0}
-}
-
-# Matriz de transiciones: define la probabilidad de moverse de un estado a otro
-# Cada fila representa un estado actual, y cada columna un estado futuro
-transiciones = {
-    "Inicio": {"Inicio": 0.1, "Intermedio": 0.9, "Final": 0.0},
-    "Intermedio": {"Inicio": 0.0, "Intermedio": 0.5, "Final": 0.5},
-    "Final": {"Inicio": 0.0, "Intermedio": 0.0, "Final": 1.0}
-}
-
-# Factor de descuento (gamma): determina cuánto valoramos las recompensas futuras
-factor_descuento = 0.9
-
-# Inicializamos los valores de utilidad para cada estado
-utilidades = {estado: 0 for estado in estados}
-
-# Número de iteraciones para calcular las utilidades
-iteraciones = 10
-
-# Algoritmo de iteración de valores para resolver el MDP
-# Este algoritmo calcula las utilidades de cada estado basándose en las recompensas y transiciones
-for i in range(iteraciones):
-    # Creamos una copia de las utilidades actuales para actualizarlas
-    nuevas_utilidades = utilidades.copy()
-    for estado in estados:
-        # Calculamos la utilidad máxima para el estado actual
-        max_utilidad = float("-inf")
-        for accion in acciones:
-            # Calculamos el valor esperado de tomar esta acción
-            valor_esperado = 0
-            for estado_siguiente in estados:
-                probabilidad = transiciones[estado][estado_siguiente]
-                recompensa = recompensas[estado][accion]
-                valor_esperado += probabilidad * (recompensa + factor_descuento * utilidades[estado_siguiente])
-            # Actualizamos la utilidad máxima si encontramos un valor mayor
-            max_utilidad = max(max_utilidad, valor_esperado)
-        # Actualizamos la utilidad del estado actual
-        nuevas_utilidades[estado] = max_utilidad
-    # Reemplazamos las utilidades antiguas con las nuevas
-    utilidades = nuevas_utilidades
-
-# Mostramos las utilidades finales de cada estado
-print("Utilidades finales de los estados:")
-for estado, utilidad in utilidades.items():
-    print(f"Estado: {estado}, Utilidad: {utilidad:.2f}")
-
-# Ejemplo práctico:
-# Supongamos que un robot debe decidir si moverse o esperar en un entorno con tres estados:
-# - Inicio: donde comienza
-# - Intermedio: donde puede ganar una recompensa alta
-# - Final: donde termina el proceso
-# El robot utiliza este algoritmo para calcular la mejor estrategia y maximizar su recompensa.
\ No newline at end of file
+
+class MDP:
+    """
+    Proceso de Decisión de Markov reutilizable.
+
+    El modelo se guarda como arrays densos:
+    - transiciones: tensor (A, S, S') con P(s' | s, a).
+    - recompensas: matriz (A, S) con R(s, a).
+
+    Ambos arrays pueden ser np.memmap respaldados por ficheros, de modo que el modelo
+    no tiene por qué caber en memoria: los algoritmos recorren el tensor por acciones
+    y por bloques de filas, y solo mantienen en RAM vectores de tamaño S.
+    """
+
+    def __init__(self, transiciones, recompensas, factor_descuento, estados=None, acciones=None):
+        self.transiciones = transiciones
+        self.recompensas = recompensas
+        self.factor_descuento = factor_descuento
+        self.num_acciones, self.num_estados = recompensas.shape
+        self.estados = estados if estados is not None else list(range(self.num_estados))
+        self.acciones = acciones if acciones is not None else list(range(self.num_acciones))
+
+    @classmethod
+    def desde_diccionarios(cls, estados, acciones, recompensas, transiciones, factor_descuento):
+        """
+        Construye el MDP a partir de diccionarios con nombres de estados y acciones.
+
+        `transiciones` puede ser {estado: {estado_siguiente: p}} (igual para todas las
+        acciones) o {estado: {accion: {estado_siguiente: p}}}.
+        """
+        indice = {estado: i for i, estado in enumerate(estados)}
+        matriz_p = np.zeros((len(acciones), len(estados), len(estados)))
+        matriz_r = np.zeros((len(acciones), len(estados)))
+        for estado in estados:
+            for a, accion in enumerate(acciones):
+                matriz_r[a, indice[estado]] = recompensas[estado][accion]
+                destinos = transiciones[estado].get(accion, transiciones[estado])
+                for estado_siguiente, probabilidad in destinos.items():
+                    matriz_p[a, indice[estado], indice[estado_siguiente]] = probabilidad
+        return cls(matriz_p, matriz_r, factor_descuento, estados, acciones)
+
+    @classmethod
+    def crear_en_disco(cls, directorio, num_estados, num_acciones, factor_descuento):
+        """Crea ficheros vacíos para el modelo y devuelve un MDP respaldado por ellos (para rellenar)."""
+        os.makedirs(directorio, exist_ok=True)
+        with open(os.path.join(directorio, "mdp.json"), "w") as f:
+            json.dump({"num_estados": num_estados, "num_acciones": num_acciones,
+                       "factor_descuento": factor_descuento}, f)
+        transiciones = np.memmap(os.path.join(directorio, "transiciones.dat"), dtype=np.float64, mode="w+",
+                                 shape=(num_acciones, num_estados, num_estados))
+        recompensas = np.memmap(os.path.join(directorio, "recompensas.dat"), dtype=np.float64, mode="w+",
+                                shape=(num_acciones, num_estados))
+        return cls(transiciones, recompensas, factor_descuento)
+
+    @classmethod
+    def cargar(cls, directorio):
+        """Abre en solo lectura un MDP creado con `crear_en_disco`."""
+        with open(os.path.join(directorio, "mdp.json")) as f:
+            meta = json.load(f)
+        forma = (meta["num_acciones"], meta["num_estados"])
+        transiciones = np.memmap(os.path.join(directorio, "transiciones.dat"), dtype=np.float64, mode="r",
+                                 shape=forma + (meta["num_estados"],))
+        recompensas = np.memmap(os.path.join(directorio, "recompensas.dat"), dtype=np.float64, mode="r",
+                                shape=forma)
+        return cls(transiciones, recompensas, meta["factor_descuento"])
+
+    def _bloques(self, filas_bloque):
+        """Rangos de filas que se leen de una vez (None = todas las filas)."""
+        paso = filas_bloque or self.num_estados
+        for inicio in range(0, self.num_estados, paso):
+            yield slice(inicio, min(inicio + paso, self.num_estados))
+
+    def valores_acciones(self, utilidades, accion, filas_bloque=None):
+        """Q(., a) = R(., a) + gamma * P_a U, leyendo P_a por bloques de filas."""
+        q = np.empty(self.num_estados)
+        for filas in self._bloques(filas_bloque):
+            q[filas] = self.recompensas[accion, filas] + self.factor_descuento * (
+                self.transiciones[accion, filas] @ utilidades)
+        return q
+
+    def actualizar(self, utilidades, filas_bloque=None):
+        """Una actualización de Bellman completa; devuelve (nuevas utilidades, política voraz)."""
+        mejores = np.full(self.num_estados, -np.inf)
+        politica = np.zeros(self.num_estados, dtype=int)
+        for accion in range(self.num_acciones):
+            q = self.valores_acciones(utilidades, accion, filas_bloque)
+            mejora = q > mejores
+            mejores[mejora] = q[mejora]
+            politica[mejora] = accion
+        return mejores, politica
+
+    def iteracion_de_valores(self, epsilon=1e-6, iteraciones_max=1000, filas_bloque=None):
+        """
+        Iteración de valores en streaming sobre las rebanadas de acción del tensor.
+
+        Retorna:
+        - utilidades: Vector (S,) de utilidades.
+        - politica: Vector (S,) con el índice de la mejor acción de cada estado.
+        - iteraciones: Número de actualizaciones realizadas.
+        """
+        utilidades = np.zeros(self.num_estados)
+        politica = np.zeros(self.num_estados, dtype=int)
+        for iteracion in range(1, iteraciones_max + 1):
+            nuevas_utilidades, politica = self.actualizar(utilidades, filas_bloque)
+            residuo = np.abs(nuevas_utilidades - utilidades).max()
+            utilidades = nuevas_utilidades
+            if residuo <= epsilon * (1 - self.factor_descuento) / self.factor_descuento:
+                break
+        return utilidades, politica, iteracion
+
+    def evaluar_politica(self, politica, epsilon=1e-6, iteraciones_max=1000, filas_bloque=None):
+        """Utilidades de una política fija, iterando solo sobre la acción elegida en cada estado."""
+        utilidades = np.zeros(self.num_estados)
+        for _ in range(iteraciones_max):
+            nuevas_utilidades = np.empty(self.num_estados)
+            for filas in self._bloques(filas_bloque):
+                # Solo se leen del tensor las filas (s, politica[s]) del bloque
+                estados_bloque = np.arange(filas.start, filas.stop)
+                acciones_bloque = politica[filas]
+                nuevas_utilidades[filas] = (self.recompensas[acciones_bloque, estados_bloque]
+                                            + self.factor_descuento
+                                            * (self.transiciones[acciones_bloque, estados_bloque] @ utilidades))
+            residuo = np.abs(nuevas_utilidades - utilidades).max()
+            utilidades = nuevas_utilidades
+            if residuo <= epsilon * (1 - self.factor_descuento) / self.factor_descuento:
+                break
+        return utilidades
+
+
+if __name__ == "__main__":
+    # Ejemplo práctico:
+    # Supongamos que un robot debe decidir si moverse o esperar en un entorno con tres estados:
+    # - Inicio: donde comienza
+    # - Intermedio: donde puede ganar una recompensa alta
+    # - Final: donde termina el proceso
+    # El robot utiliza este algoritmo para calcular la mejor estrategia y maximizar su recompensa.
+
+    # Estados posibles en el entorno
+    estados = ["Inicio", "Intermedio", "Final"]
+
+    # Acciones posibles que el agente puede tomar
+    acciones = ["Moverse", "Esperar"]
+
+    # Matriz de recompensas: define la recompensa por tomar una acción en un estado
+    recompensas = {
+        "Inicio": {"Moverse": -1, "Esperar": 0},
+        "Intermedio": {"Moverse": 10, "Esperar": -1},
+        "Final": {"Moverse": 0, "Esperar": 0}
+    }
+
+    # Matriz de transiciones: define la probabilidad de moverse de un estado a otro
+    # Cada fila representa un estado actual, y cada columna un estado futuro
+    transiciones = {
+        "Inicio": {"Inicio": 0.1, "Intermedio": 0.9, "Final": 0.0},
+        "Intermedio": {"Inicio": 0.0, "Intermedio": 0.5, "Final": 0.5},
+        "Final": {"Inicio": 0.0, "Intermedio": 0.0, "Final": 1.0}
+    }
+
+    # Factor de descuento (gamma): determina cuánto valoramos las recompensas futuras
+    mdp = MDP.desde_diccionarios(estados, acciones, recompensas, transiciones, factor_descuento=0.9)
+
+    # Número de iteraciones para calcular las utilidades
+    utilidades, politica, _ = mdp.iteracion_de_valores(epsilon=0, iteraciones_max=10)
+
+    # Mostramos las utilidades finales de cada estado
+    print("Utilidades finales de los estados:")
+    for estado, utilidad, accion in zip(mdp.estados, utilidades, politica):
+        print(f"Estado: {estado}, Utilidad: {utilidad:.2f}, Mejor acción: {mdp.acciones[accion]}")
+
+    # Modelo respaldado por ficheros: el tensor (A, S, S') se escribe y se lee por bloques de filas
+    num_estados, num_acciones, filas_bloque = 3000, 3, 256
+    with tempfile.TemporaryDirectory() as directorio:
+        generador = np.random.default_rng(0)
+        mdp_disco = MDP.crear_en_disco(directorio, num_estados, num_acciones, factor_descuento=0.95)
+        for accion in range(num_acciones):
+            for inicio in range(0, num_estados, filas_bloque):
+                fin = min(inicio + filas_bloque, num_estados)
+                bloque = generador.random((fin - inicio, num_estados)) ** 20  # Pocas transiciones relevantes
+                mdp_disco.transiciones[accion, inicio:fin] = bloque / bloque.sum(axis=1, keepdims=True)
+        mdp_disco.recompensas[:] = generador.random((num_acciones, num_estados))
+        mdp_disco.transiciones.flush()
+        mdp_disco.recompensas.flush()
+        tamano_mb = mdp_disco.transiciones.nbytes / 2 ** 20
+        del mdp_disco
+
+        mdp_disco = MDP.cargar(directorio)
+        inicio = time.perf_counter()
+        utilidades, politica, iteraciones = mdp_disco.iteracion_de_valores(epsilon=1e-3, filas_bloque=filas_bloque)
+        print(f"MDP en disco ({tamano_mb:.0f} MB): {iteraciones} iteraciones en {time.perf_counter() - inicio:.2f} s, "
+              f"utilidad media {utilidades.mean():.3f}")
+        utilidades_politica = mdp_disco.evaluar_politica(politica, epsilon=1e-3, filas_bloque=filas_bloque)
+        print(f"Diferencia con la evaluación de la política voraz: {np.abs(utilidades_politica - utilidades).max():.2e}")
+        del mdp_disco
@@ -2,6 +2,8 @@
 # Un POMDP es una extensión de un MDP (Modelo de Decisión de Markov) donde el agente no tiene
 # acceso completo al estado actual del entorno, sino que recibe observaciones parciales.
 
+import time
+
 import numpy as np
 
 # Definimos las variables principales del POMDP
@@ -41,42 +43,197 @@ recompensas = {
     "lluvioso": {"llevar_paraguas": 1, "no_llevar_paraguas": -3},
 }
 
+# Version matricial del modelo, para trabajar con lotes de creencias
+# matriz_transicion[s, a, s'] = P(s'|s, a); matriz_observacion[s', o] = P(o|s'); matriz_recompensas[s, a] = R(s, a)
+def convertir_a_arrays(estados, acciones, observaciones, transicion, observacion, recompensas):
+    """Convierte el modelo en diccionarios a arrays (S, A, S'), (S, O) y (S, A)."""
+    matriz_transicion = np.array([[[transicion[s][a][s2] for s2 in estados] for a in acciones] for s in estados])
+    matriz_observacion = np.array([[observacion[s][o] for o in observaciones] for s in estados])
+    matriz_recompensas = np.array([[recompensas[s][a] for a in acciones] for s in estados])
+    return matriz_transicion, matriz_observacion, matriz_recompensas
+
+matriz_transicion, matriz_observacion, matriz_recompensas = convertir_a_arrays(
+    estados, acciones, observaciones, transicion, observacion, recompensas)
+
 # Creemos una funcion para calcular la creencia inicial
 def inicializar_creencia():
     # La creencia inicial es una distribucion de probabilidad sobre los estados
     return {"soleado": 0.5, "lluvioso": 0.5}
 
+# Actualizacion de un lote de creencias (B x S) con operaciones matriciales
+def actualizar_creencias(creencias, indices_acciones, indices_observaciones, matriz_transicion, matriz_observacion):
+    """
+    Actualiza B creencias a la vez: b'(s') = P(o|s') * sum_s b(s) P(s'|s, a), normalizada.
+
+    Parametros:
+    - creencias: Array (B, S) con una creencia por fila.
+    - indices_acciones: Array (B,) con el indice de la accion tomada por cada creencia.
+    - indices_observaciones: Array (B,) con el indice de la observacion recibida.
+
+    Retorna:
+    - nuevas_creencias: Array (B, S) normalizado.
+    - prob_observaciones: Array (B,) con P(o | b, a) de cada observacion recibida.
+    """
+    creencias = np.atleast_2d(creencias)
+    indices_acciones = np.broadcast_to(indices_acciones, creencias.shape[:1])
+    predicciones = np.empty_like(creencias, dtype=float)
+    # Un producto de matrices por accion (hay pocas acciones y muchas creencias)
+    for accion in np.unique(indices_acciones):
+        filas = indices_acciones == accion
+        predicciones[filas] = creencias[filas] @ matriz_transicion[:, accion, :]
+    nuevas_creencias = predicciones * matriz_observacion[:, indices_observaciones].T
+    prob_observaciones = nuevas_creencias.sum(axis=1)
+    # Normalizacion segura: si la observacion tiene probabilidad nula (o casi), se conserva la prediccion
+    validas = prob_observaciones > np.finfo(float).tiny
+    nuevas_creencias[validas] /= prob_observaciones[validas, None]
+    nuevas_creencias[~validas] = predicciones[~validas]
+    return nuevas_creencias, prob_observaciones
+
 # Actualizacion de la creencia basada en la observacion recibida
 def actualizar_creencia(creencia, accion, observacion_recibida):
-    nueva_creencia = {}
-    for estado in estados:
-        prob_observacion = observacion[estado][observacion_recibida]
-        prob_transicion = sum(
-            creencia[estado_anterior]
-            * transicion[estado_anterior][accion][estado]
-            for estado_anterior in estados
-        )
-        nueva_creencia[estado] = prob_observacion * prob_transicion
-
-    # Normalizamos la creencia para que sea una distribucion de probabilidad
-    suma = sum(nueva_creencia.values())
-    for estado in nueva_creencia:
-        nueva_creencia[estado] /= suma
-
-    return nueva_creencia
+    vector = np.array([[creencia[estado] for estado in estados]])
+    nueva, _ = actualizar_creencias(vector, acciones.index(accion), [observaciones.index(observacion_recibida)],
+                                    matriz_transicion, matriz_observacion)
+    return dict(zip(estados, nueva[0].tolist()))
 
 # Funcion para seleccionar la mejor accion basada en la creencia actual
 def seleccionar_mejor_accion(creencia):
-    mejor_accion = None
-    mejor_valor = float("-inf")
-    for accion in acciones:
-        valor_accion = sum(
-            creencia[estado] * recompensas[estado][accion] for estado in estados
-        )
-        if valor_accion > mejor_valor:
-            mejor_valor = valor_accion
-            mejor_accion = accion
-    return mejor_accion
+    vector = np.array([creencia[estado] for estado in estados])
+    return acciones[int(np.argmax(vector @ matriz_recompensas))]
+
+def muestrear_categorica(probabilidades, generador):
+    """Muestrea un indice por fila de una matriz (B, K) de probabilidades."""
+    acumuladas = probabilidades.cumsum(axis=1)
+    u = generador.random((probabilidades.shape[0], 1)) * acumuladas[:, -1:]
+    return np.minimum((acumuladas < u).sum(axis=1), probabilidades.shape[1] - 1)
+
+def simular_agentes(num_agentes, pasos, elegir_acciones, matriz_transicion, matriz_observacion, matriz_recompensas,
+                    gamma=0.95, creencia_inicial=None, semilla=0):
+    """
+    Simula num_agentes agentes en paralelo: cada uno tiene su estado real y su creencia, y
+    todas las creencias se actualizan a la vez en cada paso.
+
+    Parametros:
+    - elegir_acciones: Funcion que recibe el lote de creencias (B, S) y devuelve (B,) indices de acciones.
+
+    Retorna:
+    - creencias: Array (B, S) con las creencias finales.
+    - retornos: Array (B,) con la recompensa descontada acumulada por cada agente.
+    """
+    generador = np.random.default_rng(semilla)
+    num_estados = matriz_transicion.shape[0]
+    if creencia_inicial is None:
+        creencia_inicial = np.full(num_estados, 1.0 / num_estados)
+    creencias = np.tile(creencia_inicial, (num_agentes, 1))
+    estados_reales = muestrear_categorica(creencias, generador)
+    retornos = np.zeros(num_agentes)
+    for paso in range(pasos):
+        indices_acciones = elegir_acciones(creencias)
+        retornos += gamma ** paso * matriz_recompensas[estados_reales, indices_acciones]
+        estados_reales = muestrear_categorica(matriz_transicion[estados_reales, indices_acciones], generador)
+        indices_observaciones = muestrear_categorica(matriz_observacion[estados_reales], generador)
+        creencias, _ = actualizar_creencias(creencias, indices_acciones, indices_observaciones,
+                                            matriz_transicion, matriz_observacion)
+    return creencias, retornos
+
+# Iteracion de valores basada en puntos (PBVI): la funcion de valor se representa con
+# vectores alfa (uno por fila) y cada vector lleva asociada la accion que lo genero
+def muestrear_creencias_alcanzables(num_creencias, matriz_transicion, matriz_observacion, creencia_inicial=None,
+                                    distancia_minima=1e-3, semilla=0):
+    """
+    Expande un conjunto de creencias alcanzables desde la creencia inicial simulando una
+    accion aleatoria y una observacion muestreada desde cada creencia del conjunto; solo se
+    anaden las creencias nuevas a distancia L1 mayor que distancia_minima de las existentes.
+    """
+    generador = np.random.default_rng(semilla)
+    num_estados, num_acciones, _ = matriz_transicion.shape
+    if creencia_inicial is None:
+        creencia_inicial = np.full(num_estados, 1.0 / num_estados)
+    conjunto = np.array([creencia_inicial], dtype=float)
+    for _ in range(100 * num_creencias):
+        if len(conjunto) >= num_creencias:
+            break
+        indices_acciones = generador.integers(0, num_acciones, len(conjunto))
+        estados_reales = muestrear_categorica(conjunto, generador)
+        siguientes = muestrear_categorica(matriz_transicion[estados_reales, indices_acciones], generador)
+        indices_observaciones = muestrear_categorica(matriz_observacion[siguientes], generador)
+        candidatas, _ = actualizar_creencias(conjunto, indices_acciones, indices_observaciones,
+                                             matriz_transicion, matriz_observacion)
+        for candidata in candidatas:
+            if len(conjunto) < num_creencias and np.abs(conjunto - candidata).sum(axis=1).min() > distancia_minima:
+                conjunto = np.vstack([conjunto, candidata])
+    return conjunto
+
+def podar_vectores_alfa(alfas, acciones_alfa, elementos_bloque=1 << 22):
+    """
+    Elimina vectores alfa duplicados y los dominados punto a punto por otro vector.
+    La comparacion se hace por bloques de filas para que el tensor intermedio
+    (filas x K x S) no supere elementos_bloque elementos, en lugar de K x K x S.
+    """
+    alfas, unicos = np.unique(alfas, axis=0, return_index=True)
+    acciones_alfa = acciones_alfa[unicos]
+    num_alfas, num_estados = alfas.shape
+    filas_bloque = max(1, elementos_bloque // max(1, num_alfas * num_estados))
+    conservar = np.empty(num_alfas, dtype=bool)
+    for inicio in range(0, num_alfas, filas_bloque):
+        fin = min(inicio + filas_bloque, num_alfas)
+        # domina[i, j] = el vector j es >= que el i en todos los estados (y distinto, por ser unicos)
+        domina = (alfas[None, :, :] >= alfas[inicio:fin, None, :]).all(axis=2)
+        domina[np.arange(fin - inicio), np.arange(inicio, fin)] = False
+        conservar[inicio:fin] = ~domina.any(axis=1)
+    return alfas[conservar], acciones_alfa[conservar]
+
+def pbvi(creencias, matriz_transicion, matriz_observacion, matriz_recompensas, gamma=0.95, iteraciones_max=500,
+         tolerancia=1e-6):
+    """
+    Resuelve el POMDP de forma aproximada con actualizaciones de Bellman sobre un conjunto
+    fijo de creencias (N x S).
+
+    Retorna:
+    - alfas: Matriz (K, S) de vectores alfa.
+    - acciones_alfa: Array (K,) con la accion de cada vector alfa.
+    - iteraciones: Numero de actualizaciones realizadas.
+    """
+    num_estados, num_acciones, _ = matriz_transicion.shape
+    num_observaciones = matriz_observacion.shape[1]
+    # M[a, o, s, s'] = P(s'|s, a) * P(o|s'), calculado una sola vez
+    proyecciones = np.einsum("sak,ko->aosk", matriz_transicion, matriz_observacion)
+    # Cota inferior inicial: recibir siempre la peor recompensa
+    alfas = np.full((1, num_estados), matriz_recompensas.min() / (1 - gamma))
+    acciones_alfa = np.zeros(1, dtype=int)
+    valores = (creencias @ alfas.T).max(axis=1)
+    for iteracion in range(1, iteraciones_max + 1):
+        valores_acciones = np.empty((num_acciones, len(creencias)))
+        candidatos = np.empty((num_acciones, len(creencias), num_estados))
+        for a in range(num_acciones):
+            candidatos[a] = matriz_recompensas[:, a]
+            for o in range(num_observaciones):
+                # g[i, s] = gamma * sum_s' M[a, o, s, s'] * alfa_i(s'); cada creencia elige el mejor g
+                g = gamma * alfas @ proyecciones[a, o].T
+                candidatos[a] += g[(creencias @ g.T).argmax(axis=1)]
+            valores_acciones[a] = (candidatos[a] * creencias).sum(axis=1)
+        mejores = valores_acciones.argmax(axis=0)
+        alfas, acciones_alfa = podar_vectores_alfa(candidatos[mejores, np.arange(len(creencias))], mejores)
+        nuevos_valores = (creencias @ alfas.T).max(axis=1)
+        cambio = np.abs(nuevos_valores - valores).max()
+        valores = nuevos_valores
+        if cambio < tolerancia:
+            break
+    return alfas, acciones_alfa, iteracion
+
+def seleccionar_acciones_pbvi(creencias, alfas, acciones_alfa):
+    """Accion de cada creencia (B x S o S): argmax de un producto matriz-vector con los vectores alfa."""
+    return acciones_alfa[(np.asarray(creencias) @ alfas.T).argmax(axis=-1)]
+
+def generar_pomdp_aleatorio(num_estados, num_acciones, num_observaciones, semilla=0):
+    """POMDP aleatorio con observaciones ruidosas del estado y recompensas en [-1, 1]."""
+    generador = np.random.default_rng(semilla)
+    matriz_transicion = generador.random((num_estados, num_acciones, num_estados)) ** 4
+    matriz_transicion /= matriz_transicion.sum(axis=2, keepdims=True)
+    matriz_observacion = generador.random((num_estados, num_observaciones)) ** 4
+    matriz_observacion /= matriz_observacion.sum(axis=1, keepdims=True)
+    matriz_recompensas = generador.uniform(-1, 1, (num_estados, num_acciones))
+    return matriz_transicion, matriz_observacion, matriz_recompensas
 
 # Ejemplo practico
 def ejemplo_practico():
@@ -99,6 +256,39 @@ def ejemplo_practico():
         creencia = actualizar_creencia(creencia, accion, observacion_recibida)
         print("Nueva creencia:", creencia)
 
+# Seguimiento de miles de agentes a la vez con la politica miope
+def ejemplo_lote(num_agentes=10000, pasos=50):
+    inicio = time.perf_counter()
+    creencias, retornos = simular_agentes(
+        num_agentes, pasos, lambda b: (b @ matriz_recompensas).argmax(axis=1),
+        matriz_transicion, matriz_observacion, matriz_recompensas)
+    print(f"\n{num_agentes} agentes durante {pasos} pasos en {time.perf_counter() - inicio:.3f} s")
+    print("Creencia media final:", dict(zip(estados, creencias.mean(axis=0).round(3).tolist())))
+    print(f"Retorno descontado medio (politica miope): {retornos.mean():.3f}")
+
+# Tiempo de resolucion y calidad de PBVI segun el numero de creencias
+def ejemplo_pbvi(num_agentes=5000, pasos=60, gamma=0.95):
+    modelos = {"paraguas": (matriz_transicion, matriz_observacion, matriz_recompensas),
+               "aleatorio (30 estados)": generar_pomdp_aleatorio(30, 4, 6)}
+    for nombre, (transiciones, observaciones_modelo, recompensas_modelo) in modelos.items():
+        print(f"\nPBVI en el POMDP {nombre}:")
+        _, retornos = simular_agentes(num_agentes, pasos, lambda b: (b @ recompensas_modelo).argmax(axis=1),
+                                      transiciones, observaciones_modelo, recompensas_modelo, gamma)
+        print(f"  Politica miope: retorno medio {retornos.mean():.3f}")
+        for num_creencias in (4, 16, 64, 256):
+            creencias = muestrear_creencias_alcanzables(num_creencias, transiciones, observaciones_modelo)
+            inicio = time.perf_counter()
+            alfas, acciones_alfa, iteraciones = pbvi(creencias, transiciones, observaciones_modelo, recompensas_modelo,
+                                                     gamma)
+            tiempo = time.perf_counter() - inicio
+            _, retornos = simular_agentes(num_agentes, pasos,
+                                          lambda b: seleccionar_acciones_pbvi(b, alfas, acciones_alfa),
+                                          transiciones, observaciones_modelo, recompensas_modelo, gamma)
+            print(f"  {len(creencias):3d} creencias: {len(alfas):3d} vectores alfa, {iteraciones} iteraciones "
+                  f"en {tiempo:.2f} s, retorno medio {retornos.mean():.3f}")
+
 # Ejecutamos el ejemplo practico
 if __name__ == "__main__":
-    ejemplo_practico()
\ No newline at end of file
+    ejemplo_practico()
+    ejemplo_lote()
+    ejemplo_pbvi()
\ No newline at end of file
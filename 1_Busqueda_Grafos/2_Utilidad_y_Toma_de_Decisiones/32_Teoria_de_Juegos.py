@@ -1,4 +1,8 @@
 # Importamos la librería numpy para trabajar con matrices y cálculos matemáticos
+import itertools
+import math
+import time
+
 import numpy as np
 
 # Definimos una función para calcular el Equilibrio de Nash
@@ -19,53 +23,251 @@ def calcular_equilibrio_nash(matriz_jugador1, matriz_jugador2):
     matriz_j1 = np.array(matriz_jugador1)
     matriz_j2 = np.array(matriz_jugador2)
 
-    # Obtenemos las dimensiones de las matrices (filas y columnas)
+    # Mejores respuestas: el Jugador 1 elige fila viendo cada columna, el Jugador 2 columna viendo cada fila
+    mejor_respuesta_j1 = matriz_j1 == matriz_j1.max(axis=0, keepdims=True)
+    mejor_respuesta_j2 = matriz_j2 == matriz_j2.max(axis=1, keepdims=True)
+
+    # Un perfil puro es Equilibrio de Nash si cada estrategia es mejor respuesta a la otra
+    equilibrio_nash = [(int(i), int(j)) for i, j in np.argwhere(mejor_respuesta_j1 & mejor_respuesta_j2)]
+
+    return equilibrio_nash
+
+# Equilibrios mixtos por enumeración de soportes (todos los equilibrios de juegos pequeños no degenerados)
+def equilibrios_por_soportes(matriz_jugador1, matriz_jugador2, tolerancia=1e-9, primero=False):
+    """
+    Enumera pares de soportes del mismo tamaño y resuelve las condiciones de indiferencia.
+    El coste crece con pares_de_soportes(filas, columnas).
+
+    Parametros:
+    - matriz_jugador1, matriz_jugador2: Matrices de pagos (filas x columnas).
+    - tolerancia: Margen numérico para las comprobaciones de no negatividad y de mejor respuesta.
+    - primero: Si es True, se detiene en el primer equilibrio encontrado.
+
+    Retorna:
+    - Lista de pares (x, y) de estrategias mixtas que forman un Equilibrio de Nash.
+    """
+    matriz_j1 = np.asarray(matriz_jugador1, dtype=float)
+    matriz_j2 = np.asarray(matriz_jugador2, dtype=float)
     filas, columnas = matriz_j1.shape
+    equilibrios = []
+    for tamano in range(1, min(filas, columnas) + 1):
+        for soporte_1 in itertools.combinations(range(filas), tamano):
+            for soporte_2 in itertools.combinations(range(columnas), tamano):
+                # y hace indiferente al Jugador 1 en su soporte; x hace indiferente al Jugador 2
+                y = _resolver_indiferencia(matriz_j1[np.ix_(soporte_1, soporte_2)])
+                x = _resolver_indiferencia(matriz_j2[np.ix_(soporte_1, soporte_2)].T)
+                if x is None or y is None or (x < -tolerancia).any() or (y < -tolerancia).any():
+                    continue
+                estrategia_1, estrategia_2 = np.zeros(filas), np.zeros(columnas)
+                estrategia_1[list(soporte_1)], estrategia_2[list(soporte_2)] = x, y
+                # Ninguna estrategia fuera del soporte puede ser mejor respuesta
+                pagos_1 = matriz_j1 @ estrategia_2
+                pagos_2 = estrategia_1 @ matriz_j2
+                if pagos_1.max() <= pagos_1[list(soporte_1)].max() + tolerancia and \
+                        pagos_2.max() <= pagos_2[list(soporte_2)].max() + tolerancia:
+                    equilibrios.append((estrategia_1, estrategia_2))
+                    if primero:
+                        return equilibrios
+    return equilibrios
 
-    # Creamos listas para almacenar las estrategias dominantes de cada jugador
-    estrategias_j1 = []
-    estrategias_j2 = []
+def pares_de_soportes(filas, columnas):
+    """Número de pares de soportes del mismo tamaño que examina la enumeración de soportes."""
+    return sum(math.comb(filas, k) * math.comb(columnas, k) for k in range(1, min(filas, columnas) + 1))
 
-    # Buscamos las estrategias dominantes para el Jugador 1
-    for i in range(filas):
-        if all(matriz_j1[i, j] >= matriz_j1[k, j] for k in range(filas) for j in range(columnas)):
-            estrategias_j1.append(i)
+def _resolver_indiferencia(submatriz):
+    """Distribución p sobre las columnas de la submatriz cuadrada con submatriz @ p constante (None si no existe)."""
+    tamano = submatriz.shape[0]
+    sistema = np.zeros((tamano + 1, tamano + 1))
+    sistema[:tamano, :tamano] = submatriz
+    sistema[:tamano, tamano] = -1.0  # Valor común v como incógnita
+    sistema[tamano, :tamano] = 1.0
+    lado_derecho = np.zeros(tamano + 1)
+    lado_derecho[tamano] = 1.0
+    try:
+        return np.linalg.solve(sistema, lado_derecho)[:tamano]
+    except np.linalg.LinAlgError:
+        return None
 
-    # Buscamos las estrategias dominantes para el Jugador 2
-    for j in range(columnas):
-        if all(matriz_j2[i, j] >= matriz_j2[i, k] for i in range(filas) for k in range(columnas)):
-            estrategias_j2.append(j)
+# Equilibrio mixto por el algoritmo de Lemke-Howson (pivoteo complementario)
+class _CaminoLemkeHowson:
+    """
+    Un camino de Lemke-Howson sobre los politopos P = {x >= 0 : B^T x <= 1} y Q = {y >= 0 : A y <= 1}
+    (con pagos positivos). Las etiquetas 0..m-1 corresponden a las filas y m..m+n-1 a las columnas;
+    se abandona etiqueta_inicial y se pivota alternando entre ambos tableaux hasta recuperarla.
+    """
 
-    # Buscamos los puntos donde las estrategias dominantes coinciden
-    equilibrio_nash = []
-    for i in estrategias_j1:
-        for j in estrategias_j2:
-            equilibrio_nash.append((i, j))
+    def __init__(self, matriz_j1, matriz_j2, etiqueta_inicial):
+        filas, columnas = matriz_j1.shape
+        self.filas, self.etiqueta_inicial = filas, etiqueta_inicial
+        # Tableau de P: [B^T | I | 1]; la columna de cada variable coincide con su etiqueta
+        self.politopo_p = (np.hstack([matriz_j2.T, np.eye(columnas), np.ones((columnas, 1))]),
+                           list(range(filas, filas + columnas)), slice(filas, filas + columnas))
+        # Tableau de Q: [I | A | 1]; también indexado por etiqueta (r_i -> i, y_j -> m + j)
+        self.politopo_q = (np.hstack([np.eye(filas), matriz_j1, np.ones((filas, 1))]),
+                           list(range(filas)), slice(0, filas))
+        self.actual = self.politopo_p if etiqueta_inicial < filas else self.politopo_q
+        self.entrante = etiqueta_inicial
+        self.pivotes = 0
+        self.terminado = False
 
-    return equilibrio_nash
+    def avanzar(self):
+        """Da un pivote; devuelve True cuando el camino llega a un equilibrio."""
+        tableau, base, holguras = self.actual
+        saliente = _pivotar(tableau, base, self.entrante, holguras)
+        self.pivotes += 1
+        if saliente == self.etiqueta_inicial:
+            self.terminado = True
+        else:
+            # La etiqueta que sale de un politopo entra en el otro
+            self.entrante = saliente
+            self.actual = self.politopo_q if self.actual is self.politopo_p else self.politopo_p
+        return self.terminado
+
+    def estrategias(self):
+        """Estrategias mixtas (x, y) del vértice completamente etiquetado alcanzado."""
+        (tableau_p, base_p, _), (tableau_q, base_q, _) = self.politopo_p, self.politopo_q
+        x, y = np.zeros(tableau_q.shape[0]), np.zeros(tableau_p.shape[0])
+        for fila, etiqueta in enumerate(base_p):
+            if etiqueta < self.filas:
+                x[etiqueta] = tableau_p[fila, -1]
+        for fila, etiqueta in enumerate(base_q):
+            if etiqueta >= self.filas:
+                y[etiqueta - self.filas] = tableau_q[fila, -1]
+        return x / x.sum(), y / y.sum()
+
+def lemke_howson(matriz_jugador1, matriz_jugador2, etiqueta_inicial=None, caminos_simultaneos=32,
+                 pivotes_max=5000, semilla=0):
+    """
+    Calcula un Equilibrio de Nash mixto con el algoritmo de Lemke-Howson.
+
+    La longitud del camino depende mucho de la etiqueta abandonada (de unos pocos pivotes a
+    miles), así que, si no se fija etiqueta_inicial, se avanzan por turnos varios caminos con
+    etiquetas iniciales aleatorias y se devuelve el primero que termina; los caminos que
+    superan pivotes_max se sustituyen por otros con etiquetas nuevas.
+
+    Parametros:
+    - matriz_jugador1, matriz_jugador2: Matrices de pagos (filas x columnas).
+    - etiqueta_inicial: Etiqueta que se abandona (None para probar varias a la vez).
+    - caminos_simultaneos: Número de caminos que se avanzan por turnos.
+    - pivotes_max: Número máximo de pivotes de cada camino.
+    - semilla: Semilla para el orden de las etiquetas.
+
+    Retorna:
+    - (x, y): Estrategias mixtas de ambos jugadores.
+    """
+    matriz_j1 = np.asarray(matriz_jugador1, dtype=float)
+    matriz_j2 = np.asarray(matriz_jugador2, dtype=float)
+    # Pagos desplazados para que sean positivos (no cambia los equilibrios)
+    matriz_j1 = matriz_j1 - matriz_j1.min() + 1.0
+    matriz_j2 = matriz_j2 - matriz_j2.min() + 1.0
+    if etiqueta_inicial is not None:
+        etiquetas = [etiqueta_inicial]
+    else:
+        etiquetas = np.random.default_rng(semilla).permutation(sum(matriz_j1.shape)).tolist()
+    pendientes = iter(etiquetas)
+    caminos = [_CaminoLemkeHowson(matriz_j1, matriz_j2, e) for e in itertools.islice(pendientes, caminos_simultaneos)]
+    while caminos:
+        for indice, camino in enumerate(caminos):
+            if camino.avanzar():
+                return camino.estrategias()
+            if camino.pivotes >= pivotes_max:
+                siguiente = next(pendientes, None)
+                caminos[indice] = None if siguiente is None else _CaminoLemkeHowson(matriz_j1, matriz_j2, siguiente)
+        caminos = [camino for camino in caminos if camino is not None]
+    raise RuntimeError("Lemke-Howson no ha terminado en el número máximo de pivotes")
+
+def _pivotar(tableau, base, entrante, holguras):
+    """
+    Pivota la columna `entrante` del tableau y devuelve la etiqueta de la variable que sale.
+    Los empates de la prueba de razón se deshacen lexicográficamente con las columnas de las
+    holguras iniciales (la inversa de la base actual).
+    """
+    columna = tableau[:, entrante]
+    candidatas = np.flatnonzero(columna > 1e-12)
+    razones = tableau[candidatas, -1] / columna[candidatas]
+    minimo = razones.min()
+    candidatas = candidatas[razones <= minimo + 1e-12 * max(1.0, abs(minimo))]
+    if len(candidatas) > 1:
+        desempate = tableau[candidatas][:, holguras] / columna[candidatas, None]
+        candidatas = candidatas[np.lexsort(desempate.T[::-1])[:1]]
+    fila = candidatas[0]
+    tableau[fila] /= tableau[fila, entrante]
+    factores = tableau[:, entrante].copy()
+    factores[fila] = 0.0
+    tableau -= np.outer(factores, tableau[fila])
+    saliente = base[fila]
+    base[fila] = entrante
+    return saliente
+
+# Elección del método para el equilibrio mixto según el tamaño del juego
+def equilibrio_mixto(matriz_jugador1, matriz_jugador2, presupuesto_soportes=2000):
+    """
+    Devuelve un Equilibrio de Nash mixto (x, y): por enumeración de soportes si el número de
+    pares de soportes no supera presupuesto_soportes y por Lemke-Howson en otro caso.
+    """
+    filas, columnas = np.shape(matriz_jugador1)
+    if pares_de_soportes(filas, columnas) <= presupuesto_soportes:
+        equilibrios = equilibrios_por_soportes(matriz_jugador1, matriz_jugador2, primero=True)
+        if equilibrios:
+            return equilibrios[0]
+    return lemke_howson(matriz_jugador1, matriz_jugador2)
+
+def ganancia_por_desviacion(matriz_jugador1, matriz_jugador2, x, y):
+    """Máxima mejora que un jugador obtendría desviándose unilateralmente (0 en un equilibrio exacto)."""
+    matriz_j1 = np.asarray(matriz_jugador1, dtype=float)
+    matriz_j2 = np.asarray(matriz_jugador2, dtype=float)
+    return max((matriz_j1 @ y).max() - x @ matriz_j1 @ y, (x @ matriz_j2).max() - x @ matriz_j2 @ y)
+
+if __name__ == "__main__":
+    # Ejemplo práctico: Juego del Dilema del Prisionero
+    # En este juego, dos jugadores (Prisionero A y Prisionero B) tienen dos opciones:
+    # - Cooperar (C)
+    # - Traicionar (T)
+    # Las recompensas se representan en matrices de pagos.
+
+    # Matriz de pagos del Jugador 1 (Prisionero A)
+    # Cada celda representa la recompensa del Jugador 1 dependiendo de las decisiones de ambos jugadores.
+    matriz_jugador1 = [
+        [-1, -3],  # Si el Jugador 1 coopera (C) y el Jugador 2 coopera (C o T)
+        [0, -2]    # Si el Jugador 1 traiciona (T) y el Jugador 2 coopera (C o T)
+    ]
+
+    # Matriz de pagos del Jugador 2 (Prisionero B)
+    # Cada celda representa la recompensa del Jugador 2 dependiendo de las decisiones de ambos jugadores.
+    matriz_jugador2 = [
+        [-1, 0],   # Si el Jugador 2 coopera (C) y el Jugador 1 coopera (C o T)
+        [-3, -2]   # Si el Jugador 2 traiciona (T) y el Jugador 1 coopera (C o T)
+    ]
+
+    # Calculamos el Equilibrio de Nash para este juego
+    equilibrio = calcular_equilibrio_nash(matriz_jugador1, matriz_jugador2)
+
+    # Mostramos el resultado
+    print("El Equilibrio de Nash es:", equilibrio)
+
+    # Juego sin equilibrio puro: cara o cruz (el equilibrio mixto es 50% / 50%)
+    pagos_cara_cruz = np.array([[1, -1], [-1, 1]])
+    print("\nCara o cruz, equilibrios puros:", calcular_equilibrio_nash(pagos_cara_cruz, -pagos_cara_cruz))
+    x, y = equilibrio_mixto(pagos_cara_cruz, -pagos_cara_cruz)
+    print("Cara o cruz, equilibrio mixto:", x, y)
+
+    # Batalla de los sexos: dos equilibrios puros y uno mixto
+    pagos_1, pagos_2 = np.array([[3, 0], [0, 2]]), np.array([[2, 0], [0, 3]])
+    print("Batalla de los sexos, equilibrios puros:", calcular_equilibrio_nash(pagos_1, pagos_2))
+    for x, y in equilibrios_por_soportes(pagos_1, pagos_2):
+        print("  Equilibrio:", np.round(x, 3), np.round(y, 3))
 
-# Ejemplo práctico: Juego del Dilema del Prisionero
-# En este juego, dos jugadores (Prisionero A y Prisionero B) tienen dos opciones:
-# - Cooperar (C)
-# - Traicionar (T)
-# Las recompensas se representan en matrices de pagos.
-
-# Matriz de pagos del Jugador 1 (Prisionero A)
-# Cada celda representa la recompensa del Jugador 1 dependiendo de las decisiones de ambos jugadores.
-matriz_jugador1 = [
-    [-1, -3],  # Si el Jugador 1 coopera (C) y el Jugador 2 coopera (C o T)
-    [0, -2]    # Si el Jugador 1 traiciona (T) y el Jugador 2 coopera (C o T)
-]
-
-# Matriz de pagos del Jugador 2 (Prisionero B)
-# Cada celda representa la recompensa del Jugador 2 dependiendo de las decisiones de ambos jugadores.
-matriz_jugador2 = [
-    [-1, 0],   # Si el Jugador 2 coopera (C) y el Jugador 1 coopera (C o T)
-    [-3, -2]   # Si el Jugador 2 traiciona (T) y el Jugador 1 coopera (C o T)
-]
-
-# Calculamos el Equilibrio de Nash para este juego
-equilibrio = calcular_equilibrio_nash(matriz_jugador1, matriz_jugador2)
-
-# Mostramos el resultado
-print("El Equilibrio de Nash es:", equilibrio)
\ No newline at end of file
+    # Juegos grandes: equilibrios puros en 2000 x 2000 y Lemke-Howson en 200 x 200
+    generador = np.random.default_rng(0)
+    pagos_1, pagos_2 = generador.random((2000, 2000)), generador.random((2000, 2000))
+    inicio = time.perf_counter()
+    puros = calcular_equilibrio_nash(pagos_1, pagos_2)
+    print(f"\n2000 x 2000: {len(puros)} equilibrios puros en {time.perf_counter() - inicio:.3f} s")
+    for semilla in range(3):
+        generador = np.random.default_rng(semilla)
+        pagos_1, pagos_2 = generador.random((200, 200)), generador.random((200, 200))
+        inicio = time.perf_counter()
+        x, y = equilibrio_mixto(pagos_1, pagos_2)
+        tiempo = time.perf_counter() - inicio
+        print(f"200 x 200 (semilla {semilla}): soportes de tamaño {(x > 0).sum()} y {(y > 0).sum()} "
+              f"en {tiempo:.3f} s, ganancia por desviación {ganancia_por_desviacion(pagos_1, pagos_2, x, y):.1e}")
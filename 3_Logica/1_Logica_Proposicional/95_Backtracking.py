@@ -6,6 +6,9 @@
 # reina pueda atacar a otra. Esto significa que no pueden estar en la misma fila, columna
 # o diagonal.
 
+import multiprocessing
+import time
+
 # ------------------------------------------------------------------------------------
 # PASO 1: FUNCIÓN PARA VERIFICAR SI UNA POSICIÓN ES SEGURA
 # ------------------------------------------------------------------------------------
@@ -107,6 +110,92 @@ if resolver_n_reinas(tablero, 0, n):
 else:
     print("No se encontró solución para el problema de las 4 reinas.")
 
+# ------------------------------------------------------------------------------------
+# PASO 5: CONTAR TODAS LAS SOLUCIONES CON MÁSCARAS DE BITS
+# ------------------------------------------------------------------------------------
+# - `contar_soluciones_n_reinas` cuenta todas las soluciones, no solo la primera.
+# - En lugar de recorrer las reinas colocadas (como `es_seguro`), las columnas y las
+#   dos diagonales ocupadas se guardan como enteros usados como máscaras de bits:
+#   las casillas libres de una fila son `todos & ~(columnas | diag1 | diag2)` y, al
+#   bajar de fila, las diagonales se desplazan un bit a la izquierda o a la derecha.
+# - Simetría: el reflejo horizontal de una solución con la primera reina en la
+#   columna c es otra solución con la reina en la columna n-1-c. Basta contar la
+#   mitad izquierda de la primera fila y multiplicar por 2 (si n es impar, la
+#   columna central se trata aparte restringiendo también la segunda fila).
+# - El trabajo se reparte entre procesos: cada tarea es una columna de la primera fila.
+# - Parámetros clave:
+#   - `n`: Tamaño del tablero (NxN).
+#   - `procesos`: Número de procesos (por defecto, uno por núcleo).
+
+def _contar_desde(n, columnas, diag1, diag2, fila):
+    # Cuenta las soluciones que completan una colocación parcial de `fila` reinas
+    todos = (1 << n) - 1
+    penultima = n - 2
+    if fila > penultima:
+        return (todos & ~(columnas | diag1 | diag2)).bit_count()
+
+    def contar(columnas, diag1, diag2, fila):
+        libres = todos & ~(columnas | diag1 | diag2)
+        total = 0
+        if fila == penultima:
+            # En la penúltima fila, la última se cuenta directamente con bit_count
+            while libres:
+                bit = libres & -libres
+                libres ^= bit
+                total += (todos & ~(columnas | bit | (diag1 | bit) << 1 | (diag2 | bit) >> 1)).bit_count()
+            return total
+        fila += 1
+        while libres:
+            bit = libres & -libres  # Casilla libre más a la derecha
+            libres ^= bit
+            total += contar(columnas | bit, (diag1 | bit) << 1 & todos, (diag2 | bit) >> 1, fila)
+        return total
+
+    return contar(columnas, diag1, diag2, fila)
+
+def _contar_primera_fila(argumentos):
+    # Tarea de un proceso: soluciones con la primera reina en la columna indicada,
+    # ya multiplicadas por el factor de simetría que le corresponde
+    n, columna = argumentos
+    todos = (1 << n) - 1
+    bit = 1 << columna
+    if n % 2 == 1 and columna == n // 2:
+        # Columna central: el reflejo la deja igual, así que se aplica la simetría a la
+        # segunda fila (solo la mitad de su izquierda, multiplicada por 2)
+        total = 0
+        libres = ~(bit | bit << 1 | bit >> 1) & (bit - 1)
+        while libres:
+            bit2 = libres & -libres
+            libres ^= bit2
+            total += _contar_desde(n, bit | bit2, ((bit << 1 | bit2) << 1) & todos, (bit >> 1 | bit2) >> 1, 2)
+        return 2 * total
+    return 2 * _contar_desde(n, bit, (bit << 1) & todos, bit >> 1, 1)
+
+def contar_soluciones_n_reinas(n, procesos=None):
+    """
+    Devuelve el número total de soluciones del problema de las n reinas.
+
+    Usa la búsqueda con máscaras de bits y la simetría de la primera fila descritas
+    arriba. Con `procesos=1` se cuenta en el proceso actual; con cualquier otro valor
+    las columnas de la primera fila se reparten en un `multiprocessing.Pool`.
+    """
+    if n == 1:
+        return 1
+    tareas = [(n, columna) for columna in range((n + 1) // 2)]
+    if procesos == 1:
+        return sum(map(_contar_primera_fila, tareas))
+    with multiprocessing.Pool(procesos) as pool:
+        # Las columnas cercanas al borde generan menos trabajo; se reparten de una en una
+        return sum(pool.imap_unordered(_contar_primera_fila, tareas, chunksize=1))
+
+if __name__ == '__main__':
+    # Con un núcleo, n=14 tarda unos 5 s; cada reina más multiplica el tiempo por 6-7,
+    # así que n=16 (unos 4 minutos por núcleo) queda fuera de la demostración
+    for n_grande in (8, 10, 12, 13, 14):
+        inicio = time.perf_counter()
+        soluciones = contar_soluciones_n_reinas(n_grande)
+        print(f"{n_grande}-reinas: {soluciones} soluciones en {time.perf_counter() - inicio:.2f} s")
+
 # ------------------------------------------------------------------------------------
 # EXPLICACIÓN DETALLADA DEL ALGORITMO
 # ------------------------------------------------------------------------------------